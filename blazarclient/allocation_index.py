@@ -0,0 +1,267 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Index of the reservations allocated to hosts, networks or devices.
+
+The index is built from the result of ``list_allocations()``, where each
+resource lists its reservations with their start and end dates, and answers
+availability queries without going through every reservation.
+"""
+
+import bisect
+
+from blazarclient import base
+from blazarclient import dates
+
+# Manager attribute of the client for each resource type
+RESOURCE_MANAGERS = {
+    'host': 'host',
+    'network': 'network',
+    'device': 'device',
+}
+
+# Type of the resources allocated to each type of reservation
+RESERVATION_RESOURCE_TYPES = {
+    'physical:host': 'host',
+    'virtual:instance': 'host',
+    'network': 'network',
+    'device': 'device',
+}
+
+
+class IntervalTree(object):
+    """Static interval tree over half-open [start, end) intervals.
+
+    Intervals are sorted by start and laid out as an implicit balanced
+    binary search tree, each node keeping the latest end of its subtree, so
+    that whole subtrees ending before a query are skipped.
+    """
+
+    def __init__(self, intervals):
+        intervals = sorted(intervals, key=lambda interval: interval[0])
+        self.starts = [interval[0] for interval in intervals]
+        self.ends = [interval[1] for interval in intervals]
+        self.values = [interval[2] for interval in intervals]
+        self._max_ends = list(self.ends)
+        self._augment(0, len(intervals))
+
+    def __len__(self):
+        return len(self.starts)
+
+    def _augment(self, low, high):
+        if low >= high:
+            return None
+        mid = (low + high) // 2
+        max_end = self.ends[mid]
+        for child in (self._augment(low, mid),
+                      self._augment(mid + 1, high)):
+            if child is not None and child > max_end:
+                max_end = child
+        self._max_ends[mid] = max_end
+        return max_end
+
+    def _search(self, low, high, start, end, found, first_only):
+        while low < high:
+            mid = (low + high) // 2
+            if self._max_ends[mid] <= start:
+                return
+            self._search(low, mid, start, end, found, first_only)
+            if first_only and found:
+                return
+            if self.starts[mid] >= end:
+                return
+            if self.ends[mid] > start:
+                found.append(mid)
+                if first_only:
+                    return
+            low = mid + 1
+
+    def overlapping(self, start, end):
+        """Return the values of the intervals overlapping [start, end)."""
+        found = []
+        self._search(0, len(self.starts), start, end, found, False)
+        return [self.values[i] for i in found]
+
+    def gaps(self, start, end):
+        """Return the parts of [start, end) not covered by any interval."""
+        found = []
+        self._search(0, len(self.starts), start, end, found, False)
+        gaps = []
+        cursor = start
+        # NOTE: the search walks the tree in order, so by increasing start.
+        for i in found:
+            if self.starts[i] > cursor:
+                gaps.append((cursor, self.starts[i]))
+            cursor = max(cursor, self.ends[i])
+        if cursor < end:
+            gaps.append((cursor, end))
+        return gaps
+
+    def overlaps(self, start, end):
+        """Return whether any interval overlaps [start, end)."""
+        found = []
+        self._search(0, len(self.starts), start, end, found, True)
+        return bool(found)
+
+
+class AllocationIndex(object):
+    """Indexes of the reservations of each resource.
+
+    The resources held by each lease and reservation are indexed when the
+    index is built. The interval trees of the reservations of each resource,
+    used by time-based queries, are only built when first needed.
+
+    **Examples**
+        index = AllocationIndex.from_client(client, 'host')
+        index.free('2024-05-01 10:00', '2024-05-01 12:00')
+        index.first_window(4, datetime.timedelta(hours=2),
+                           not_before='2024-05-01 00:00')
+        index.resources_for_lease(lease_id)
+    """
+
+    def __init__(self, allocations):
+        self._allocations = {}
+        self._trees = None
+        self._ends = None
+        self.by_lease = {}
+        self.by_reservation = {}
+        for allocation in allocations:
+            resource_id = allocation['resource_id']
+            reservations = allocation.get('reservations') or []
+            self._allocations[resource_id] = reservations
+            for reservation in reservations:
+                for index, key in ((self.by_lease, 'lease_id'),
+                                   (self.by_reservation, 'id')):
+                    if key in reservation:
+                        index.setdefault(reservation[key], {}).setdefault(
+                            resource_id, []).append(reservation)
+
+    def _build_trees(self):
+        self._trees = {
+            resource_id: IntervalTree(
+                (dates.parse(r['start_date']), dates.parse(r['end_date']), r)
+                for r in reservations)
+            for resource_id, reservations in self._allocations.items()}
+        self._ends = sorted({end for tree in self._trees.values()
+                             for end in tree.ends})
+
+    @property
+    def trees(self):
+        if self._trees is None:
+            self._build_trees()
+        return self._trees
+
+    @classmethod
+    def from_client(cls, client, resource_type='host'):
+        manager = getattr(client, RESOURCE_MANAGERS[resource_type])
+        return cls(manager.list_allocations())
+
+    @property
+    def resource_ids(self):
+        return list(self._allocations)
+
+    def resources_for_lease(self, lease_id):
+        """Return the IDs of the resources allocated to a lease."""
+        return list(self.by_lease.get(lease_id, ()))
+
+    def resources_for_reservation(self, reservation_id):
+        """Return the IDs of the resources allocated to a reservation."""
+        return list(self.by_reservation.get(reservation_id, ()))
+
+    def reservations_of(self, resource_id, lease_id=None,
+                        reservation_id=None):
+        """Return the reservations of a resource, optionally filtered."""
+        if lease_id is None and reservation_id is None:
+            return list(self._allocations.get(resource_id, ()))
+        if lease_id is not None:
+            reservations = self.by_lease.get(lease_id, {}).get(
+                resource_id, [])
+            if reservation_id is not None:
+                reservations = [r for r in reservations
+                                if r.get('id') == reservation_id]
+            return list(reservations)
+        return list(self.by_reservation.get(reservation_id, {}).get(
+            resource_id, []))
+
+    def overlapping(self, start, end, resource_id=None):
+        """Return the reservations overlapping [start, end).
+
+        :returns: a list of (resource ID, reservation) tuples.
+        """
+        start, end = dates.parse(start), dates.parse(end)
+        if resource_id is not None:
+            trees = {resource_id: self.trees[resource_id]}
+        else:
+            trees = self.trees
+        return [(rid, reservation) for rid, tree in trees.items()
+                for reservation in tree.overlapping(start, end)]
+
+    def free(self, start, end, resource_ids=None):
+        """Return the resources without any reservation in [start, end)."""
+        start, end = dates.parse(start), dates.parse(end)
+        candidates = self.trees if resource_ids is None else resource_ids
+        return [rid for rid in candidates
+                if rid not in self.trees or
+                not self.trees[rid].overlaps(start, end)]
+
+    def first_window(self, count, duration, not_before, not_after=None,
+                     resource_ids=None):
+        """Find the earliest time count resources are free for duration.
+
+        A window can only start at not_before or when a reservation ends,
+        so these are the only times tried.
+
+        :returns: a (start, resource IDs) tuple, or None if there is no such
+                  window starting before not_after.
+        """
+        not_before = dates.parse(not_before)
+        not_after = dates.parse(not_after) if not_after else None
+        if self._trees is None:
+            self._build_trees()
+        candidates = [not_before]
+        candidates += self._ends[bisect.bisect_right(self._ends, not_before):]
+        for start in candidates:
+            if not_after is not None and start > not_after:
+                break
+            free = self.free(start, start + duration, resource_ids)
+            if len(free) >= count:
+                return start, free[:count]
+        return None
+
+
+def lease_resources(client, lease, deadline=None):
+    """Return the resources allocated to the reservations of a lease.
+
+    :param lease: a lease, as returned by the lease manager get()
+    :param deadline: bound of the total time of the requests, in seconds
+    :returns: a list of dicts with the resource_type, resource_id and
+              reservation_id of each allocated resource.
+    """
+    resource_types = sorted({
+        RESERVATION_RESOURCE_TYPES[r['resource_type']]
+        for r in lease.get('reservations') or ()
+        if r.get('resource_type') in RESERVATION_RESOURCE_TYPES})
+    resources = []
+    with base.deadline_scope(deadline):
+        indexes = [(resource_type,
+                    AllocationIndex.from_client(client, resource_type))
+                   for resource_type in resource_types]
+    for resource_type, index in indexes:
+        for resource_id, reservations in sorted(
+                index.by_lease.get(lease['id'], {}).items(),
+                key=lambda item: str(item[0])):
+            for reservation in reservations:
+                resources.append({'resource_type': resource_type,
+                                  'resource_id': resource_id,
+                                  'reservation_id': reservation.get('id')})
+    return resources
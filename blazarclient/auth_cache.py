@@ -0,0 +1,146 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""On-disk cache of Keystone tokens and Blazar endpoints for the CLI.
+
+Entries are keyed by the cache ID of the keystoneauth plugin, which is a hash
+of every option identifying the user, so different credentials never share a
+token. The cache file is only readable by its owner and is ignored if its
+permissions are any looser.
+"""
+
+import datetime
+import logging
+import os
+import stat
+import tempfile
+
+from oslo_serialization import jsonutils
+from oslo_utils import timeutils
+
+LOG = logging.getLogger(__name__)
+
+# Cached tokens expiring within this delay are not reused.
+EXPIRY_MARGIN = datetime.timedelta(minutes=5)
+
+
+def default_path():
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(
+        os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'blazarclient', 'auth.json')
+
+
+class AuthCache(object):
+    """Stores keystoneauth plugin state and resolved endpoints."""
+
+    def __init__(self, path=None):
+        self.path = path or default_path()
+
+    @staticmethod
+    def _cache_id(auth):
+        get_cache_id = getattr(auth, 'get_cache_id', None)
+        return get_cache_id() if get_cache_id else None
+
+    @staticmethod
+    def _endpoint_key(service_type, interface, region_name):
+        return '%s|%s|%s' % (service_type, interface or '', region_name or '')
+
+    def _read(self):
+        try:
+            fd = os.open(self.path, os.O_RDONLY)
+        except OSError:
+            return {}
+        with os.fdopen(fd) as f:
+            st = os.fstat(f.fileno())
+            if st.st_uid != os.getuid() or st.st_mode & (stat.S_IRWXG |
+                                                         stat.S_IRWXO):
+                LOG.warning('Ignoring auth cache %s: it must be owned by the '
+                            'current user with mode 0600', self.path)
+                return {}
+            try:
+                return jsonutils.loads(f.read())
+            except ValueError:
+                return {}
+
+    def _write(self, data):
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.auth-')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(jsonutils.dumps(data))
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+    def _entry(self, auth):
+        cache_id = self._cache_id(auth)
+        if cache_id is None:
+            return None
+        entry = self._read().get(cache_id)
+        if not entry:
+            return None
+        expires_at = timeutils.normalize_time(
+            timeutils.parse_isotime(entry['expires_at']))
+        if expires_at - EXPIRY_MARGIN <= timeutils.utcnow():
+            return None
+        return entry
+
+    def load(self, auth):
+        """Install the cached token into the auth plugin.
+
+        :returns: True if a valid token was found.
+        """
+        entry = self._entry(auth)
+        if entry is None:
+            return False
+        auth.set_auth_state(entry['auth_state'])
+        return True
+
+    def get_endpoint(self, auth, service_type, interface=None,
+                     region_name=None):
+        entry = self._entry(auth)
+        if entry is None:
+            return None
+        key = self._endpoint_key(service_type, interface, region_name)
+        return entry.get('endpoints', {}).get(key)
+
+    def save(self, auth, service_type=None, interface=None, region_name=None,
+             endpoint=None):
+        """Store the current token of the plugin and the resolved endpoint."""
+        cache_id = self._cache_id(auth)
+        state = auth.get_auth_state() if cache_id else None
+        if state is None or auth.auth_ref.expires is None:
+            return
+        data = self._read()
+        entry = data.get(cache_id) or {}
+        if entry.get('auth_state') != state:
+            entry = {'auth_state': state, 'endpoints': {}}
+        entry['expires_at'] = auth.auth_ref.expires.isoformat()
+        if endpoint:
+            key = self._endpoint_key(service_type, interface, region_name)
+            entry['endpoints'][key] = endpoint
+        data[cache_id] = entry
+        now = timeutils.utcnow()
+        data = {k: v for k, v in data.items()
+                if timeutils.normalize_time(
+                    timeutils.parse_isotime(v['expires_at'])) > now}
+        self._write(data)
+
+    def invalidate(self, auth):
+        cache_id = self._cache_id(auth)
+        data = self._read()
+        if data.pop(cache_id, None) is not None:
+            self._write(data)
@@ -0,0 +1,101 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Search of the periods in which enough hosts are free for a lease."""
+
+import collections
+import datetime
+
+from blazarclient import allocation_index
+from blazarclient import expressions
+
+# A lease using the hosts can start at any time from start to latest_start,
+# which is None if it is not bounded.
+Window = collections.namedtuple('Window', ['start', 'latest_start', 'hosts'])
+
+
+def find_windows(hosts, allocations, count, duration, not_before,
+                 not_after=None, resource_properties=None, limit=None):
+    """Find when count hosts are free together for duration.
+
+    Each host is free to start a lease in [a, b - duration] for every gap
+    [a, b) between its reservations. A sweep over the bounds of these
+    ranges finds the periods during which at least count hosts can start a
+    lease, in order. Each window picks the hosts free the longest, and ends
+    when one of them cannot start a lease anymore.
+
+    :param hosts: hosts, as returned by the host manager list()
+    :param allocations: host allocations, as returned by list_allocations()
+    :param not_before: earliest start of the lease
+    :param not_after: latest start of the lease, or None
+    :returns: a list of Window, the earliest first.
+    """
+    index = allocation_index.AllocationIndex(allocations)
+    trees = {str(resource_id): tree
+             for resource_id, tree in index.trees.items()}
+    horizon = not_after + duration if not_after else datetime.datetime.max
+
+    ranks = {}
+    events = []
+    for host in expressions.filter_resources(hosts, resource_properties):
+        host_id = str(host['id'])
+        ranks[host_id] = len(ranks)
+        tree = trees.get(host_id)
+        gaps = (tree.gaps(not_before, horizon) if tree is not None
+                else [(not_before, horizon)])
+        for start, end in gaps:
+            if end - start >= duration:
+                # NOTE: additions sort before removals at the same time, a
+                # host being still free to start a lease at end - duration.
+                events.append((start, 0, host_id, end - duration))
+                events.append((end - duration, 1, host_id, None))
+    events.sort(key=lambda event: event[:3])
+
+    names = {str(host['id']): host.get('hypervisor_hostname', host['id'])
+             for host in hosts}
+    windows = []
+    # Time until which each active host can start a lease
+    active = {}
+    window = None
+    i = 0
+    while i < len(events) and (limit is None or len(windows) < limit):
+        time = events[i][0]
+        while i < len(events) and events[i][:2] == (time, 0):
+            active[events[i][2]] = events[i][3]
+            i += 1
+        if (window is None and len(active) >= count and
+                (not_after is None or time <= not_after)):
+            window = (time, _choose(active, count, ranks))
+        while i < len(events) and events[i][:2] == (time, 1):
+            del active[events[i][2]]
+            i += 1
+        if window is not None and not window[1].issubset(active):
+            # NOTE: the window ends as soon as one of its hosts cannot
+            # start a lease anymore, even if other hosts are still free.
+            unbounded = not_after is None and horizon - time <= duration
+            latest = None if unbounded else time
+            windows.append(Window(window[0], latest,
+                                  [names[host_id] for host_id in
+                                   sorted(window[1], key=ranks.get)]))
+            window = None
+            if (len(active) >= count and
+                    (not_after is None or time <= not_after)):
+                window = (time, _choose(active, count, ranks))
+    return windows
+
+
+def _choose(active, count, ranks):
+    """Return the count active hosts which stay free the longest."""
+    # NOTE: the sort is stable, so hosts free as long keep their rank order.
+    by_rank = sorted(active, key=ranks.get)
+    return set(sorted(by_rank, key=active.get, reverse=True)[:count])
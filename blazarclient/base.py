@@ -13,21 +13,194 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
+import contextlib
+import functools
+import logging
+import re
+import threading
+import time
+
 from keystoneauth1 import adapter
 from oslo_serialization import jsonutils
 import requests
 
 from blazarclient import exception
 from blazarclient.i18n import _
+from blazarclient import query
+from blazarclient import tracing
+
+LOG = logging.getLogger(__name__)
+
+# Path segments that identify a single resource (integer or UUID IDs).
+_ID_SEGMENT = re.compile(r'^([0-9]+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-'
+                         r'[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12})$')
+
+RequestRecord = collections.namedtuple(
+    'RequestRecord',
+    ['method', 'url', 'url_template', 'status_code', 'bytes', 'elapsed'])
+"""Details of a single HTTP request, passed to every request hook.
+
+``status_code`` is None if no response was received and ``elapsed`` is in
+seconds.
+"""
+
+
+def url_template(url):
+    """Return the URL with query string removed and IDs replaced by {id}."""
+    path = url.split('?', 1)[0]
+    return '/'.join('{id}' if _ID_SEGMENT.match(segment) else segment
+                    for segment in path.split('/'))
+
+
+class Deadline(object):
+    """Time budget shared by all the requests of an operation."""
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.expires_at = time.monotonic() + timeout
 
+    def remaining(self):
+        return self.expires_at - time.monotonic()
 
-class RequestManager(object):
+    @property
+    def expired(self):
+        return self.remaining() <= 0
+
+    def request_timeout(self, timeout=None):
+        """Return the timeout to use for the next request.
+
+        :raises: DeadlineExceeded if the budget is already spent.
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise exception.DeadlineExceeded()
+        if timeout is not None:
+            return min(timeout, remaining)
+        return remaining
+
+
+_deadlines = threading.local()
+
+
+def current_deadline():
+    """Return the innermost deadline active on this thread, if any."""
+    stack = getattr(_deadlines, 'stack', None)
+    return stack[-1] if stack else None
+
+
+@contextlib.contextmanager
+def deadline_scope(timeout):
+    """Bound the total duration of all requests made in the block.
+
+    Each request is given the remaining budget as its timeout, and no request
+    is sent once the budget is spent. Nested scopes cannot extend the
+    deadline of an enclosing scope.
+
+    :param timeout: budget in seconds, a Deadline, or None for no deadline.
+    """
+    if timeout is None:
+        yield current_deadline()
+        return
+    deadline = (timeout if isinstance(timeout, Deadline)
+                else Deadline(timeout))
+    enclosing = current_deadline()
+    if enclosing is not None and enclosing.expires_at < deadline.expires_at:
+        deadline = enclosing
+    if not hasattr(_deadlines, 'stack'):
+        _deadlines.stack = []
+    _deadlines.stack.append(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadlines.stack.pop()
+
+
+def propagate_context(function):
+    """Wrap function to run in the context of the calling thread.
+
+    The deadline and the tracing span active when this is called are
+    re-entered by the wrapper, so that work handed to other threads is
+    bounded by the same deadline and joins the same trace.
+    """
+    deadline = current_deadline()
+    span = tracing.current_span()
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        with deadline_scope(deadline), tracing.activate(span):
+            return function(*args, **kwargs)
+    return wrapper
+
+
+def _apply_deadline(kwargs, default_timeout=None):
+    """Shorten the timeout of a request to the remaining budget, if any.
+
+    :param default_timeout: timeout used when the call does not give one,
+                            such as the timeout of the session.
+    """
+    deadline = current_deadline()
+    if deadline is not None:
+        timeout = kwargs.get('timeout')
+        if timeout is None:
+            timeout = default_timeout
+        kwargs['timeout'] = deadline.request_timeout(timeout)
+    return deadline
+
+
+class RequestHooksMixin(object):
+    """Calls the registered request hooks once a request has completed.
+
+    Also serves GET requests from the response cache, if any.
+    """
+
+    request_hooks = ()
+    cache = None
+
+    def _cached_request(self, url, method, send):
+        if self.cache is None:
+            return send()
+        if method != 'GET':
+            try:
+                return send()
+            finally:
+                self.cache.invalidate()
+        generation = self.cache.generation
+        cached = self.cache.get_response(url)
+        if cached is not None:
+            return cached
+        resp, body = send()
+        self.cache.put_response(url, resp, body, generation)
+        return resp, body
+
+    def _call_hooks(self, method, url, started, resp=None):
+        if not self.request_hooks:
+            return
+        record = RequestRecord(
+            method=method,
+            url=url,
+            url_template=url_template(url),
+            status_code=resp.status_code if resp is not None else None,
+            bytes=len(resp.content or b'') if resp is not None else 0,
+            elapsed=time.monotonic() - started)
+        for hook in self.request_hooks:
+            try:
+                hook(record)
+            except Exception:
+                # NOTE: instrumentation must never break the request itself.
+                LOG.exception('Request hook %r failed', hook)
+
+
+class RequestManager(RequestHooksMixin):
     """Manager to create request from given Blazar URL and auth token."""
 
-    def __init__(self, blazar_url, auth_token, user_agent):
+    def __init__(self, blazar_url, auth_token, user_agent,
+                 request_hooks=None, cache=None):
         self.blazar_url = blazar_url
         self.auth_token = auth_token
         self.user_agent = user_agent
+        self.request_hooks = request_hooks or ()
+        self.cache = cache
 
     def get(self, url):
         """Sends get request to Blazar.
@@ -56,7 +229,7 @@ class RequestManager(object):
         """
         return self.request(url, 'DELETE')
 
-    def put(self, url, body):
+    def put(self, url, body, headers=None):
         """Sends update request to Blazar.
 
         :param url: URL to the wanted Blazar resource.
@@ -64,7 +237,12 @@ class RequestManager(object):
 
         :param body: Values resource to be updated from.
         :type body: dict
+
+        :param headers: Additional headers, such as If-Match.
+        :type headers: dict
         """
+        if headers:
+            return self.request(url, 'PUT', body=body, headers=dict(headers))
         return self.request(url, 'PUT', body=body)
 
     def patch(self, url, body):
@@ -89,6 +267,10 @@ class RequestManager(object):
         :returns: Response and body.
         :rtype: tuple
         """
+        return self._cached_request(
+            url, method, lambda: self._send_request(url, method, **kwargs))
+
+    def _send_request(self, url, method, **kwargs):
         kwargs.setdefault('headers', kwargs.get('headers', {}))
         kwargs['headers']['User-Agent'] = self.user_agent
         kwargs['headers']['Accept'] = 'application/json'
@@ -99,7 +281,19 @@ class RequestManager(object):
             kwargs['data'] = jsonutils.dump_as_bytes(kwargs['body'])
             del kwargs['body']
 
-        resp = requests.request(method, self.blazar_url + url, **kwargs)
+        deadline = _apply_deadline(kwargs)
+        started = time.monotonic()
+        with tracing.span('HTTP %s' % method, url=url_template(url)) as span:
+            try:
+                resp = requests.request(method, self.blazar_url + url,
+                                        **kwargs)
+            except Exception as e:
+                self._call_hooks(method, url, started)
+                if deadline is not None and deadline.expired:
+                    raise exception.DeadlineExceeded() from e
+                raise
+            span.set_attribute('status_code', resp.status_code)
+        self._call_hooks(method, url, started, resp)
 
         try:
             body = jsonutils.loads(resp.text)
@@ -118,12 +312,32 @@ class RequestManager(object):
         return resp, body
 
 
-class SessionClient(adapter.LegacyJsonAdapter):
+class SessionClient(RequestHooksMixin, adapter.LegacyJsonAdapter):
     """Manager to create request with keystoneauth1 session."""
 
+    def __init__(self, *args, **kwargs):
+        self.request_hooks = kwargs.pop('request_hooks', None) or ()
+        self.cache = kwargs.pop('cache', None)
+        super(SessionClient, self).__init__(*args, **kwargs)
+
     def request(self, url, method, **kwargs):
-        resp, body = super(SessionClient, self).request(
-            url, method, raise_exc=False, **kwargs)
+        return self._cached_request(
+            url, method, lambda: self._send_request(url, method, **kwargs))
+
+    def _send_request(self, url, method, **kwargs):
+        deadline = _apply_deadline(kwargs, self.session.timeout)
+        started = time.monotonic()
+        with tracing.span('HTTP %s' % method, url=url_template(url)) as span:
+            try:
+                resp, body = super(SessionClient, self).request(
+                    url, method, raise_exc=False, **kwargs)
+            except Exception as e:
+                self._call_hooks(method, url, started)
+                if deadline is not None and deadline.expired:
+                    raise exception.DeadlineExceeded() from e
+                raise
+            span.set_attribute('status_code', resp.status_code)
+        self._call_hooks(method, url, started, resp)
 
         if resp.status_code >= 400:
             if body is not None:
@@ -141,8 +355,11 @@ class BaseClientManager(object):
     """Base class for managing resources of Blazar."""
 
     user_agent = 'python-blazarclient'
+    # Fields the list() method can filter on with query parameters
+    query_filters = ()
 
-    def __init__(self, blazar_url, auth_token, session, **kwargs):
+    def __init__(self, blazar_url, auth_token, session, request_hooks=None,
+                 cache=None, **kwargs):
         self.blazar_url = blazar_url
         self.auth_token = auth_token
         self.session = session
@@ -151,11 +368,19 @@ class BaseClientManager(object):
             self.request_manager = SessionClient(
                 session=self.session,
                 user_agent=self.user_agent,
+                request_hooks=request_hooks,
+                cache=cache,
                 **kwargs
             )
         elif self.blazar_url and self.auth_token:
             self.request_manager = RequestManager(blazar_url=self.blazar_url,
                                                   auth_token=self.auth_token,
-                                                  user_agent=self.user_agent)
+                                                  user_agent=self.user_agent,
+                                                  request_hooks=request_hooks,
+                                                  cache=cache)
         else:
             raise exception.InsufficientAuthInformation
+
+    def query(self):
+        """Return a query over the resources listed by list()."""
+        return query.Query(self)
@@ -0,0 +1,80 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Concurrent submission of many requests of the same kind."""
+
+import collections
+from concurrent import futures
+import logging
+import threading
+import time
+
+from blazarclient import base
+
+LOG = logging.getLogger(__name__)
+
+Result = collections.namedtuple('Result', ['item', 'value', 'error'])
+"""Outcome of one call: the value returned, or the exception raised."""
+
+
+class RateLimiter(object):
+    """Spaces calls so that at most rate of them start each second.
+
+    Calls are given successive time slots, in the order they ask for one,
+    and wait for their slot outside of the lock.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def run_many(function, items, max_workers=4, rate=None, deadline=None):
+    """Call function on each item concurrently.
+
+    The calls are bounded by the deadline of the calling thread, if any,
+    and belong to its current tracing span. A failed call does not stop the
+    others.
+
+    :param max_workers: maximum number of concurrent calls
+    :param rate: maximum number of calls started per second, if any
+    :param deadline: bound of the total time of all calls, in seconds
+    :returns: a list of Result, in the order of the items.
+    """
+    limiter = RateLimiter(rate) if rate else None
+    items = list(items)
+    if not items:
+        return []
+    with base.deadline_scope(deadline):
+        @base.propagate_context
+        def call(item):
+            if limiter is not None:
+                limiter.wait()
+            try:
+                return Result(item, function(item), None)
+            except Exception as e:
+                LOG.debug('Call on %r failed: %s', item, e)
+                return Result(item, None, e)
+
+        with futures.ThreadPoolExecutor(
+                max_workers=min(max_workers, len(items))) as pool:
+            return list(pool.map(call, items))
@@ -0,0 +1,134 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+import copy
+import threading
+import time
+
+
+class ResponseCache(object):
+    """Client-side cache of GET responses with a time to live.
+
+    Besides responses, the cache holds values derived from them, such as
+    name-to-ID indexes. Any request other than a GET clears the whole cache,
+    so a client never reads back stale data after its own writes.
+
+    **Examples**
+        cache = ResponseCache(ttl=30)
+        client = Client(session=sess, cache=cache)
+        client.lease.list()  # sent to Blazar
+        client.lease.list()  # served from the cache
+    """
+
+    def __init__(self, ttl=30, max_entries=512, metrics=None,
+                 name='responses'):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.metrics = metrics
+        self.name = name
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # NOTE: bumped by every invalidation, so that a response read before
+        # a concurrent write is never stored after it.
+        self.generation = 0
+
+    def _count(self, hit):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        if self.metrics is not None:
+            self.metrics.record_cache(self.name, hit)
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, key, value):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_response(self, url):
+        """Return the cached response and a copy of its body, or None."""
+        with self._lock:
+            entry = self._lookup(url)
+            self._count(entry is not None)
+        if entry is None:
+            return None
+        resp, body = entry[1]
+        # NOTE: managers modify response bodies in place, so callers must
+        # never be handed the cached body itself.
+        return resp, copy.deepcopy(body)
+
+    def put_response(self, url, resp, body, generation=None):
+        """Store a response, unless the cache was invalidated meanwhile.
+
+        :param generation: value of ``generation`` before the request was
+                           sent, if the request may race with writes.
+        """
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._store(url, (resp, copy.deepcopy(body)))
+
+    def get_or_build(self, key, builder):
+        """Return the cached value derived under key, building it if needed.
+
+        Unlike get_response(), the cached object is returned as is and must
+        not be modified by the caller.
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            self._count(entry is not None)
+            generation = self.generation
+        if entry is not None:
+            return entry[1]
+        value = builder()
+        with self._lock:
+            if generation == self.generation:
+                self._store(key, value)
+        return value
+
+    def invalidate(self):
+        with self._lock:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self.generation += 1
+
+    clear = invalidate
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else None,
+                'invalidations': self.invalidations,
+            }
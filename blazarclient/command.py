@@ -21,6 +21,7 @@ from cliff import lister
 from cliff import show
 
 from blazarclient import exception
+from blazarclient import mirror
 from blazarclient import utils
 
 HEX_ELEM = '[0-9A-Fa-f]'
@@ -152,6 +153,7 @@ class UpdateCommand(BlazarCommand):
     api = 'reservation'
     resource = None
     log = None
+    id_optional = False
 
     def get_parser(self, prog_name):
         parser = super(UpdateCommand, self).get_parser(prog_name)
@@ -161,6 +163,7 @@ class UpdateCommand(BlazarCommand):
             help_str = 'ID of %s to update'
         parser.add_argument(
             'id', metavar=self.resource.upper(),
+            nargs='?' if self.id_optional else None,
             help=help_str % self.resource
         )
         self.add_known_arguments(parser)
@@ -230,6 +233,8 @@ class ListCommand(BlazarCommand, lister.Lister):
     _formatters = {}
     list_columns = []
     unknown_parts_flag = True
+    # Name of the collection in the local mirror, if it is mirrored
+    mirror_collection = None
 
     def args2body(self, parsed_args):
         params = {}
@@ -243,10 +248,27 @@ class ListCommand(BlazarCommand, lister.Lister):
 
     def get_parser(self, prog_name):
         parser = super(ListCommand, self).get_parser(prog_name)
+        if self.mirror_collection:
+            parser.add_argument(
+                '--from-mirror',
+                action='store_true',
+                default=False,
+                help='Read the %s from the local mirror updated by '
+                     'mirror-sync instead of the API' %
+                     self.mirror_collection.replace('_', ' ')
+            )
         return parser
 
+    def retrieve_from_mirror(self, parsed_args):
+        """Retrieve a list of resources from the local mirror."""
+        body = self.args2body(parsed_args)
+        with mirror.Mirror() as local_mirror:
+            return local_mirror.list(self.mirror_collection, **body)
+
     def retrieve_list(self, parsed_args):
         """Retrieve a list of resources from Blazar server."""
+        if getattr(parsed_args, 'from_mirror', False):
+            return self.retrieve_from_mirror(parsed_args)
         blazar_client = self.get_client()
         body = self.args2body(parsed_args)
         resource_manager = getattr(blazar_client, self.resource)
@@ -290,6 +312,8 @@ class ListAllocationCommand(ListCommand, lister.Lister):
 
     def retrieve_list(self, parsed_args):
         """Retrieve a list of resources from Blazar server."""
+        if getattr(parsed_args, 'from_mirror', False):
+            return self.retrieve_from_mirror(parsed_args)
         blazar_client = self.get_client()
         body = self.args2body(parsed_args)
         resource_manager = getattr(blazar_client, self.resource)
@@ -321,11 +345,14 @@ class ShowCommand(BlazarCommand, show.ShowOne):
         else:
             res_id = parsed_args.id
 
-        resource_manager = getattr(blazar_client, self.resource)
-        data = resource_manager.get(res_id)
+        data = self.retrieve_data(blazar_client, res_id, parsed_args)
         self.format_output_data(data)
         return list(zip(*sorted(data.items())))
 
+    def retrieve_data(self, blazar_client, res_id, parsed_args):
+        resource_manager = getattr(blazar_client, self.resource)
+        return resource_manager.get(res_id)
+
 
 class ShowAllocationCommand(ShowCommand, show.ShowOne):
     """Show allocations for a given resource."""
@@ -0,0 +1,247 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Local daemon running blazar commands in a warm process.
+
+The daemon listens on a unix socket only accessible to the user running it.
+It keeps its imports, keystoneauth sessions and their connection pools
+between commands, so a command forwarded by the ``blazar`` front-end (see
+:mod:`blazarclient.daemon_client`) skips interpreter startup and
+authentication. Commands are run one at a time, each with the ``OS_*`` and
+``BLAZAR_*`` variables, working directory and arguments of the front-end that
+sent it.
+"""
+
+import argparse
+import contextlib
+import io
+import logging
+import os
+import socket
+import sys
+
+from keystoneauth1 import loading
+
+from blazarclient import daemon_client
+from blazarclient import exception
+from blazarclient import profiling
+from blazarclient import shell
+from blazarclient import tracing
+
+LOG = logging.getLogger(__name__)
+
+
+class FrameWriter(object):
+    """File-like object streaming everything written to the front-end."""
+
+    encoding = daemon_client.ENCODING
+
+    def __init__(self, sock_file, stream):
+        self.sock_file = sock_file
+        self.stream = stream
+
+    def write(self, data):
+        if data:
+            daemon_client.send_frame(self.sock_file,
+                                     {'stream': self.stream, 'data': data})
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return False
+
+
+class WarmShell(shell.BlazarShell):
+    """Shell reusing the clients created by previous commands.
+
+    Clients are shared between commands authenticating with the same
+    credentials and selecting the same endpoint.
+    """
+
+    def __init__(self, clients, **kwargs):
+        super(WarmShell, self).__init__(**kwargs)
+        self.clients = clients
+
+    def _client_key(self):
+        auth = loading.load_auth_from_argparse_arguments(self.options)
+        get_cache_id = getattr(auth, 'get_cache_id', None)
+        cache_id = get_cache_id() if get_cache_id else None
+        if cache_id is None:
+            return None
+        return (cache_id, str(self.options.os_reservation_api_version),
+                bool(self.options.timing), self.response_cache is not None,
+                tuple(sorted(self._endpoint_filter().items())))
+
+    def authenticate_user(self):
+        key = self._client_key()
+        if key is not None and key in self.clients:
+            self.client, self.timing, self.response_cache = self.clients[key]
+            # NOTE: responses cached by a previous batch may be stale.
+            if self.response_cache is not None:
+                self.response_cache.clear()
+            return
+        super(WarmShell, self).authenticate_user()
+        if key is not None:
+            self.clients[key] = (self.client, self.timing,
+                                 self.response_cache)
+
+
+class Daemon(object):
+    """Serves commands sent by the blazar front-end on a unix socket."""
+
+    def __init__(self, path, idle_timeout=None):
+        self.path = path
+        self.idle_timeout = idle_timeout
+        self.clients = {}
+
+    def _listen(self):
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        os.chmod(directory, 0o700)
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.path)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            sock.bind(self.path)
+        finally:
+            os.umask(old_umask)
+        sock.listen(8)
+        sock.settimeout(self.idle_timeout)
+        return sock
+
+    @staticmethod
+    def _peer_allowed(conn):
+        uid = daemon_client.peer_uid(conn)
+        return uid is None or uid == os.getuid()
+
+    def serve_forever(self):
+        sock = self._listen()
+        LOG.info('Listening on %s', self.path)
+        try:
+            while True:
+                try:
+                    conn, _addr = sock.accept()
+                except socket.timeout:
+                    LOG.info('Exiting after %s seconds without commands',
+                             self.idle_timeout)
+                    return
+                with conn:
+                    conn.settimeout(None)
+                    if not self._peer_allowed(conn):
+                        LOG.warning('Rejected connection from another user')
+                        continue
+                    try:
+                        self.handle(conn)
+                    except Exception:
+                        LOG.exception('Failed to handle a command')
+        finally:
+            sock.close()
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self.path)
+
+    def handle(self, conn):
+        with conn.makefile('rwb') as sock_file:
+            request = next(daemon_client.read_frames(sock_file), None)
+            if request is None:
+                return
+            code = self.run_command(request['argv'], request.get('env', {}),
+                                    request.get('cwd'),
+                                    FrameWriter(sock_file, 'stdout'),
+                                    FrameWriter(sock_file, 'stderr'))
+            daemon_client.send_frame(sock_file, {'exit': code})
+
+    @contextlib.contextmanager
+    def _command_context(self, env, cwd, stdout, stderr):
+        saved_env = dict(os.environ)
+        saved_cwd = os.getcwd()
+        saved_stdin = sys.stdin
+        root_logger = logging.getLogger('')
+        saved_handlers = list(root_logger.handlers)
+        saved_level = root_logger.level
+        # NOTE: the front-end only sends the variables read by the shell,
+        # which replace those of the daemon.
+        own_env = daemon_client.forwarded_env(saved_env)
+        os.environ.clear()
+        os.environ.update((key, value) for key, value in saved_env.items()
+                          if key not in own_env)
+        os.environ.update(daemon_client.forwarded_env(env))
+        # NOTE: commands must never wait for the standard input of the
+        # daemon, which would block every other front-end.
+        sys.stdin = io.StringIO()
+        try:
+            if cwd:
+                os.chdir(cwd)
+            with contextlib.redirect_stdout(stdout), \
+                    contextlib.redirect_stderr(stderr):
+                yield
+        finally:
+            # NOTE: each command configures logging and may enable tracing,
+            # which must not leak into the next command.
+            root_logger.handlers[:] = saved_handlers
+            root_logger.setLevel(saved_level)
+            tracing.set_tracer(None)
+            sys.stdin = saved_stdin
+            os.chdir(saved_cwd)
+            os.environ.clear()
+            os.environ.update(saved_env)
+
+    def run_command(self, argv, env, cwd, stdout, stderr):
+        with self._command_context(env, cwd, stdout, stderr):
+            try:
+                app = WarmShell(self.clients, stdin=sys.stdin,
+                                stdout=stdout, stderr=stderr)
+                app.register_arguments(argv)
+                profiler = profiling.Profiler.from_options(
+                    profiling.parse_args(argv, app.parser,
+                                         app.command_names()),
+                    'run', stream=stderr)
+                if profiler is None:
+                    result = app.run(argv)
+                else:
+                    with profiler.profile():
+                        result = app.run(argv)
+            except SystemExit as e:
+                result = e.code
+            except exception.BlazarClientException:
+                result = 1
+            except Exception as e:
+                stdout.write('%s\n' % e)
+                result = 1
+        return result or 0
+
+
+def main(argv=sys.argv[1:]):
+    parser = argparse.ArgumentParser(
+        description='Run blazar commands forwarded by the blazar front-end '
+                    'when BLAZAR_DAEMON is set.')
+    parser.add_argument(
+        '--socket',
+        default=daemon_client.socket_path_from_env() or
+        daemon_client.default_socket_path(),
+        help='Path of the unix socket to listen on.')
+    parser.add_argument(
+        '--idle-timeout',
+        type=float,
+        default=None,
+        help='Exit after this many seconds without commands.')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    Daemon(args.socket, idle_timeout=args.idle_timeout).serve_forever()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
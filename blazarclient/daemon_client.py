@@ -0,0 +1,167 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Thin front-end of the blazar command-line client.
+
+If ``BLAZAR_DAEMON`` is set and a ``blazar-daemon`` is listening, the command
+line is forwarded to the daemon, which runs it in an already warm process.
+Otherwise the command runs in this process as usual.
+
+This module only imports the standard library so that forwarding a command
+does not pay for importing cliff and keystoneauth.
+"""
+
+import json
+import os
+import socket
+import stat
+import struct
+import sys
+
+# NOTE: the protocol is one JSON document per line. The front-end sends the
+# request and the daemon answers with output frames followed by an exit frame.
+ENCODING = 'utf-8'
+
+# Only the variables read by the shell are sent to the daemon, so that
+# unrelated secrets of the front-end never leave its process.
+FORWARDED_ENV_PREFIXES = ('OS_', 'BLAZAR_')
+
+
+def default_socket_path():
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        directory = os.path.join(runtime_dir, 'blazarclient')
+    else:
+        directory = '/tmp/blazarclient-%d' % os.getuid()
+    return os.path.join(directory, 'daemon.sock')
+
+
+def socket_path_from_env():
+    """Return the daemon socket selected by BLAZAR_DAEMON, if any.
+
+    ``BLAZAR_DAEMON`` is either the path of the socket or a true value to use
+    the default socket.
+    """
+    value = os.environ.get('BLAZAR_DAEMON', '')
+    if value.startswith('/'):
+        return value
+    if value.lower() in ('1', 'true', 'yes', 'on'):
+        return default_socket_path()
+    return None
+
+
+def forwarded_env(environ):
+    """Return the variables of environ that are sent to the daemon."""
+    return dict((key, value) for key, value in environ.items()
+                if key.startswith(FORWARDED_ENV_PREFIXES))
+
+
+def peer_uid(sock):
+    """Return the user ID of the other end of a unix socket, if known."""
+    if not hasattr(socket, 'SO_PEERCRED'):
+        return None
+    creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED,
+                            struct.calcsize('3i'))
+    _pid, uid, _gid = struct.unpack('3i', creds)
+    return uid
+
+
+def _private(path):
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return (st.st_uid == os.getuid() and
+            not st.st_mode & (stat.S_IRWXG | stat.S_IRWXO))
+
+
+def server_trusted(sock, path):
+    """Return whether the daemon behind sock is run by the current user.
+
+    The socket and its directory must be private to the current user, as
+    created by the daemon, and so must the listening process when the
+    platform reports it.
+    """
+    if not (_private(path) and _private(os.path.dirname(path))):
+        return False
+    uid = peer_uid(sock)
+    return uid is None or uid == os.getuid()
+
+
+def send_frame(sock_file, frame):
+    sock_file.write((json.dumps(frame) + '\n').encode(ENCODING))
+    sock_file.flush()
+
+
+def read_frames(sock_file):
+    for line in sock_file:
+        yield json.loads(line.decode(ENCODING))
+
+
+def forward(path, argv, stdout=None, stderr=None):
+    """Run a command through the daemon listening on path.
+
+    :returns: the exit code of the command, or None if no daemon of the
+              current user is listening, in which case nothing has been run.
+    """
+    stdout = stdout or sys.stdout
+    stderr = stderr or sys.stderr
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+    # NOTE: the request carries credentials, so it is only sent to a daemon
+    # of the same user, never to a socket planted by someone else.
+    if not server_trusted(sock, path):
+        sock.close()
+        return None
+    with sock, sock.makefile('rwb') as sock_file:
+        send_frame(sock_file, {'argv': list(argv),
+                               'env': forwarded_env(os.environ),
+                               'cwd': os.getcwd()})
+        for frame in read_frames(sock_file):
+            if 'exit' in frame:
+                return frame['exit']
+            stream = stdout if frame['stream'] == 'stdout' else stderr
+            stream.write(frame['data'])
+            stream.flush()
+    stderr.write('Connection to the blazar daemon was lost\n')
+    return 1
+
+
+def reads_stdin(argv):
+    """Return whether the command reads its standard input.
+
+    The daemon does not receive the standard input of the front-end, so
+    such commands, like ``batch -``, run locally.
+    """
+    return '-' in argv
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    path = socket_path_from_env()
+    # NOTE: interactive mode needs the terminal, so it always runs locally.
+    if path and argv and not reads_stdin(argv):
+        result = forward(path, argv)
+        if result is not None:
+            return result
+
+    from blazarclient import shell
+    return shell.main(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Parsing and formatting of the dates exchanged with Blazar.
+
+Blazar dates use two fixed formats: utils.API_DATE_FORMAT, e.g.
+'2030-06-08 10:00', for the dates sent to the API, and
+utils.LEASE_DATE_FORMAT, e.g. '2030-06-08T10:00:00.000000', for the dates
+of the leases it returns. Dates in these formats are parsed by matching
+their fixed fields instead of going through strptime, and the results are
+memoized since the same dates come up repeatedly. parse_api() and
+parse_lease() fall back to strptime for other inputs, so that they accept
+the same inputs and raise the same errors as strptime.
+"""
+
+import datetime
+import functools
+import re
+
+from oslo_utils import timeutils
+
+from blazarclient import utils
+
+CACHE_SIZE = 4096
+
+_API_DATE = re.compile(r'(\d{4})-(\d\d)-(\d\d) (\d\d):(\d\d)', re.ASCII)
+_LEASE_DATE = re.compile(
+    r'(\d{4})-(\d\d)-(\d\d)T(\d\d):(\d\d):(\d\d)\.(\d{6})', re.ASCII)
+_ISO_DATE = re.compile(
+    r'(\d{4})-(\d\d)-(\d\d)T(\d\d):(\d\d):(\d\d)', re.ASCII)
+
+
+def _build(match):
+    return datetime.datetime(*map(int, match.groups()))
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def parse_api(value):
+    """Parse a date in the API format, 'YYYY-MM-DD HH:MM'.
+
+    :raises: ValueError if the date is not in this format.
+    """
+    match = _API_DATE.fullmatch(value)
+    if match:
+        return _build(match)
+    return datetime.datetime.strptime(value, utils.API_DATE_FORMAT)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def parse_lease(value):
+    """Parse a lease date, 'YYYY-MM-DDTHH:MM:SS.ffffff'.
+
+    :raises: ValueError if the date is not in this format.
+    """
+    match = _LEASE_DATE.fullmatch(value)
+    if match:
+        return _build(match)
+    return datetime.datetime.strptime(value, utils.LEASE_DATE_FORMAT)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _parse_string(value):
+    for pattern in (_LEASE_DATE, _API_DATE, _ISO_DATE):
+        match = pattern.fullmatch(value)
+        if match:
+            return _build(match)
+    return timeutils.normalize_time(timeutils.parse_isotime(value))
+
+
+def parse(value):
+    """Parse a date in any ISO 8601 format into a naive UTC datetime.
+
+    Datetimes are returned as naive UTC datetimes too.
+    """
+    if isinstance(value, datetime.datetime):
+        return timeutils.normalize_time(value)
+    return _parse_string(value)
+
+
+def format_api(date):
+    """Format a datetime in the API format, 'YYYY-MM-DD HH:MM'."""
+    return '%04d-%02d-%02d %02d:%02d' % (date.year, date.month, date.day,
+                                         date.hour, date.minute)
+
+
+def column(items, field):
+    """Return the dates of a field of a list of dicts, parsed once each.
+
+    **Examples**
+        ends = dates.column(client.lease.list(), 'end_date')
+    """
+    return [parse(item[field]) for item in items]
+
+
+def clear_cache():
+    for function in (parse_api, parse_lease, _parse_string):
+        function.cache_clear()
@@ -102,3 +102,16 @@ class ResourcePropertyNotFound(BlazarClientException):
     """Occurs if the resource property specified does not exist"""
     message = _("The resource property does not exist.")
     code = 404
+
+
+class DeadlineExceeded(BlazarClientException):
+    """Occurs if an operation did not complete within its deadline."""
+    message = _("The operation did not complete within its deadline.")
+    code = 408
+
+
+class InvalidExpression(BlazarClientException):
+    """Occurs if a resource properties expression cannot be parsed."""
+    message = _("Invalid resource properties expression %(expression)s: "
+                "%(reason)s")
+    code = 400
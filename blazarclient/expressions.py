@@ -0,0 +1,195 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Evaluation of resource_properties expressions on the client side.
+
+Reservations select resources with JSON expressions such as::
+
+    ["and", [">=", "$vcpus", "8"], ["==", "$node_type", "gpu"]]
+
+where ``$name`` is a property of the resource. An expression is parsed and
+compiled once into a predicate, which can then be applied to the resources
+returned by the list() method of their manager. Values are compared as
+numbers when both sides are numbers, and as strings otherwise.
+"""
+
+import operator
+
+from oslo_serialization import jsonutils
+
+from blazarclient import exception
+
+COMPARISONS = {
+    '=': operator.eq,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+LOGICAL = ('and', 'or', 'not')
+
+
+def _number(value):
+    if isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _always(resource):
+    return True
+
+
+def parse(expression):
+    """Parse and validate an expression given as a JSON string or a list."""
+    source = expression
+    if not expression:
+        return []
+    if isinstance(expression, str):
+        try:
+            expression = jsonutils.loads(expression)
+        except ValueError as e:
+            raise exception.InvalidExpression(expression=source, reason=e)
+
+    def validate(node):
+        if not isinstance(node, list) or not node:
+            raise exception.InvalidExpression(
+                expression=source, reason='%r is not an operation' % (node,))
+        op, operands = node[0], node[1:]
+        if op in ('and', 'or'):
+            for operand in operands:
+                validate(operand)
+        elif op == 'not':
+            if len(operands) != 1:
+                raise exception.InvalidExpression(
+                    expression=source, reason='"not" takes one operand')
+            validate(operands[0])
+        elif op in COMPARISONS:
+            if len(operands) != 2:
+                raise exception.InvalidExpression(
+                    expression=source,
+                    reason='"%s" takes two operands' % op)
+        elif op == 'in':
+            if not operands:
+                raise exception.InvalidExpression(
+                    expression=source, reason='"in" takes operands')
+        else:
+            raise exception.InvalidExpression(
+                expression=source, reason='unknown operator %r' % (op,))
+
+    validate(expression)
+    return expression
+
+
+def _operand(operand):
+    """Return a getter of the operand, and its value if it is constant."""
+    if isinstance(operand, str) and operand.startswith('$'):
+        name = operand[1:]
+        return (lambda resource: resource.get(name)), None, False
+    return (lambda resource: operand), operand, True
+
+
+def _compile_comparison(op, left, right):
+    compare = COMPARISONS[op]
+    get_left, left_value, left_constant = _operand(left)
+    get_right, right_value, right_constant = _operand(right)
+
+    if right_constant and not left_constant and right_value is not None:
+        # NOTE: the usual case, a property compared to a constant, only
+        # converts the property of each resource.
+        name = left[1:]
+        number = _number(right_value)
+        text = str(right_value)
+        if number is None:
+            def predicate(resource):
+                value = resource.get(name)
+                return value is not None and compare(str(value), text)
+        else:
+            def predicate(resource):
+                value = resource.get(name)
+                if value is None:
+                    return False
+                value_number = _number(value)
+                if value_number is None:
+                    return compare(str(value), text)
+                return compare(value_number, number)
+        return predicate
+
+    def predicate(resource):
+        a, b = get_left(resource), get_right(resource)
+        if a is None or b is None:
+            return False
+        a_number, b_number = _number(a), _number(b)
+        if a_number is None or b_number is None:
+            return compare(str(a), str(b))
+        return compare(a_number, b_number)
+    return predicate
+
+
+def _compile_in(operands):
+    get_value = _operand(operands[0])[0]
+    texts = frozenset(str(o) for o in operands[1:])
+    numbers = frozenset(n for n in map(_number, operands[1:])
+                        if n is not None)
+
+    def predicate(resource):
+        value = get_value(resource)
+        if value is None:
+            return False
+        number = _number(value)
+        if number is not None and number in numbers:
+            return True
+        return str(value) in texts
+    return predicate
+
+
+def _compile(node):
+    op, operands = node[0], node[1:]
+    if op in COMPARISONS:
+        return _compile_comparison(op, *operands)
+    if op == 'in':
+        return _compile_in(operands)
+    if op == 'not':
+        inner = _compile(operands[0])
+        return lambda resource: not inner(resource)
+    predicates = [_compile(operand) for operand in operands]
+    if op == 'and':
+        if len(predicates) == 2:
+            first, second = predicates
+            return lambda resource: first(resource) and second(resource)
+        return lambda resource: all(p(resource) for p in predicates)
+    if len(predicates) == 2:
+        first, second = predicates
+        return lambda resource: first(resource) or second(resource)
+    return lambda resource: any(p(resource) for p in predicates)
+
+
+def compile_expression(expression):
+    """Compile an expression into a predicate taking a resource dict.
+
+    An empty expression matches every resource.
+    """
+    expression = parse(expression)
+    if not expression:
+        return _always
+    return _compile(expression)
+
+
+def filter_resources(resources, expression):
+    """Return the resources matching an expression."""
+    predicate = compile_expression(expression)
+    return [resource for resource in resources if predicate(resource)]
@@ -0,0 +1,108 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Joins of leases with the resources allocated to them.
+
+The leases, the allocations and the resources are each listed with a single
+request, sent concurrently, and joined in memory through hash indexes
+instead of getting every allocated resource one by one.
+"""
+
+from concurrent import futures
+
+from blazarclient import allocation_index
+from blazarclient import base
+
+
+def fetch_concurrently(calls, max_workers=None):
+    """Call each function of a dict in its own thread.
+
+    The requests made by the functions are bounded by the deadline of the
+    calling thread, if any, and belong to its current tracing span.
+
+    :param calls: a dict mapping names to functions taking no argument
+    :returns: a dict mapping the same names to the results of the functions
+    """
+    with futures.ThreadPoolExecutor(
+            max_workers=max_workers or len(calls) or 1) as pool:
+        pending = {name: pool.submit(base.propagate_context(function))
+                   for name, function in calls.items()}
+        return {name: future.result() for name, future in pending.items()}
+
+
+def hash_index(items, key='id'):
+    """Return a dict mapping the key of each item to the item."""
+    return {str(item[key]): item for item in items}
+
+
+def join_lease_resources(leases, allocations, resources,
+                         resource_type='host'):
+    """Add the resources allocated to each lease to a copy of the lease.
+
+    :param leases: leases, as returned by the lease manager
+    :param allocations: allocations of the resources, as returned by the
+                        list_allocations() method of their manager
+    :param resources: resources, as returned by the list() method of their
+                      manager
+    :returns: a list of copies of the leases, each with a 'resources' list
+              holding, for each resource allocated to one of its
+              reservations, the reservation_id, resource_type and
+              resource_id, followed by the fields of the resource.
+    """
+    by_id = hash_index(resources)
+    by_lease = allocation_index.AllocationIndex(allocations).by_lease
+    joined = []
+    for lease in leases:
+        lease = dict(lease)
+        lease['resources'] = []
+        for resource_id, reservations in sorted(
+                by_lease.get(lease['id'], {}).items(),
+                key=lambda item: str(item[0])):
+            resource = by_id.get(str(resource_id), {})
+            for reservation in reservations:
+                record = {'reservation_id': reservation.get('id'),
+                          'resource_type': resource_type,
+                          'resource_id': resource_id}
+                record.update((key, value) for key, value in resource.items()
+                              if key != 'id')
+                lease['resources'].append(record)
+        joined.append(lease)
+    return joined
+
+
+def leases_with_resources(client, lease_id=None, resource_type='host',
+                          deadline=None):
+    """Return leases joined with their allocated resources.
+
+    The leases, or the given lease, the allocations and the resources are
+    fetched concurrently, with one request each. ``deadline`` bounds the
+    total time of the requests, in seconds.
+
+    **Examples**
+        leases_with_resources(client)
+        leases_with_resources(client, lease_id, resource_type='network')
+    """
+    manager = getattr(client, allocation_index.RESOURCE_MANAGERS[
+        resource_type])
+    if lease_id is None:
+        get_leases = client.lease.list
+    else:
+        def get_leases():
+            return [client.lease.get(lease_id)]
+    with base.deadline_scope(deadline):
+        results = fetch_concurrently({
+            'leases': get_leases,
+            'allocations': manager.list_allocations,
+            'resources': manager.list})
+    return join_lease_resources(results['leases'], results['allocations'],
+                                results['resources'], resource_type)
@@ -0,0 +1,82 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Index of leases by start and end date.
+
+The dates of the leases are parsed once, when the index is built. Leases
+active at a given time or overlapping a window are found in an interval
+tree, and leases ending within a period by binary search over their sorted
+end dates, so that queries do not compare every lease.
+"""
+
+import bisect
+import datetime
+
+from blazarclient import allocation_index
+from blazarclient import dates
+
+_RESOLUTION = datetime.timedelta(microseconds=1)
+
+
+class LeaseDateIndex(object):
+    """Leases indexed by their start and end dates.
+
+    Leases are considered active from their start date, included, to their
+    end date, excluded. Queries return the leases in their original order.
+
+    **Examples**
+        index = LeaseDateIndex.from_manager(client.lease)
+        index.active_at('2024-05-01 10:00')
+        index.overlapping('2024-05-01 10:00', '2024-05-02 10:00')
+        index.ending_within(timeutils.utcnow(), datetime.timedelta(hours=2))
+    """
+
+    def __init__(self, leases):
+        self.leases = list(leases)
+        ends = dates.column(self.leases, 'end_date')
+        self._tree = allocation_index.IntervalTree(
+            zip(dates.column(self.leases, 'start_date'), ends,
+                range(len(self.leases))))
+        by_end = sorted((date, position)
+                        for position, date in enumerate(ends))
+        self._ends = [date for date, _position in by_end]
+        self._end_positions = [position for _date, position in by_end]
+
+    @classmethod
+    def from_manager(cls, manager):
+        return cls(manager.list())
+
+    def __len__(self):
+        return len(self.leases)
+
+    def _select(self, positions):
+        return [self.leases[position] for position in sorted(positions)]
+
+    def overlapping(self, start, end):
+        """Return the leases overlapping [start, end)."""
+        return self._select(self._tree.overlapping(dates.parse(start),
+                                                   dates.parse(end)))
+
+    def active_at(self, date):
+        """Return the leases active at the given date."""
+        date = dates.parse(date)
+        # NOTE: a lease is active at date if it overlaps the shortest
+        # period starting at date.
+        return self._select(self._tree.overlapping(date, date + _RESOLUTION))
+
+    def ending_within(self, date, delta):
+        """Return the leases ending in [date, date + delta)."""
+        date = dates.parse(date)
+        low = bisect.bisect_left(self._ends, date)
+        high = bisect.bisect_left(self._ends, date + delta)
+        return self._select(self._end_positions[low:high])
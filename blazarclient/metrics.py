@@ -0,0 +1,195 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+import threading
+
+# Upper bounds, in seconds, of the buckets exported to Prometheus.
+PROMETHEUS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+                      5.0, 10.0, 30.0, 60.0)
+
+
+class LatencyHistogram(object):
+    """Log-linear latency histogram in the style of HdrHistogram.
+
+    Values are recorded in microseconds into buckets whose width grows with
+    the magnitude of the value, so the relative error of every recorded value
+    is bounded by ``2 ** -sub_bucket_bits`` while memory stays proportional to
+    the number of distinct magnitudes seen.
+    """
+
+    def __init__(self, sub_bucket_bits=7):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.counts = collections.Counter()
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def _bucket(self, micros):
+        shift = max(0, micros.bit_length() - self.sub_bucket_bits)
+        return shift, micros >> shift
+
+    @staticmethod
+    def _upper_bound(bucket):
+        shift, sub_bucket = bucket
+        return ((sub_bucket + 1) << shift) - 1
+
+    def record(self, seconds):
+        self.counts[self._bucket(int(seconds * 1e6))] += 1
+        self.count += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if self.max is None or seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, percent):
+        """Return the latency, in seconds, at the given percentile."""
+        if not self.count:
+            return None
+        threshold = self.count * percent / 100.0
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= threshold:
+                return min(self._upper_bound(bucket) / 1e6, self.max)
+        return self.max
+
+    def cumulative_counts(self, bounds):
+        """Return the number of values lower or equal to each bound."""
+        result = [0] * len(bounds)
+        for bucket, count in self.counts.items():
+            value = self._upper_bound(bucket) / 1e6
+            for i, bound in enumerate(bounds):
+                if value <= bound:
+                    result[i] += count
+        return result
+
+
+class MetricsRegistry(object):
+    """In-process registry of request and cache metrics.
+
+    The registry is a request hook, so it is enabled by passing it to the
+    client. Metrics are kept per method and URL template.
+
+    **Examples**
+        registry = MetricsRegistry()
+        client = Client(session=sess, request_hooks=[registry])
+        client.lease.list()
+        registry.snapshot()
+        registry.to_prometheus()
+    """
+
+    def __init__(self, prefix='blazarclient'):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._errors = collections.Counter()
+        self._caches = collections.defaultdict(collections.Counter)
+
+    def __call__(self, record):
+        key = (record.method, record.url_template)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = LatencyHistogram()
+            histogram.record(record.elapsed)
+            if record.status_code is None or record.status_code >= 400:
+                status = (str(record.status_code)
+                          if record.status_code is not None else 'none')
+                self._errors[key + (status,)] += 1
+
+    def record_cache(self, name, hit):
+        """Count a hit or a miss of the named cache."""
+        with self._lock:
+            self._caches[name]['hits' if hit else 'misses'] += 1
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._errors.clear()
+            self._caches.clear()
+
+    def snapshot(self):
+        """Return a point-in-time copy of all metrics as plain data."""
+        with self._lock:
+            requests = []
+            for (method, endpoint), hist in sorted(self._histograms.items()):
+                errors = {status: count for (m, e, status), count
+                          in self._errors.items()
+                          if (m, e) == (method, endpoint)}
+                requests.append({
+                    'method': method,
+                    'endpoint': endpoint,
+                    'count': hist.count,
+                    'errors': errors,
+                    'sum': hist.total,
+                    'min': hist.min,
+                    'max': hist.max,
+                    'p50': hist.percentile(50),
+                    'p90': hist.percentile(90),
+                    'p99': hist.percentile(99),
+                })
+            caches = {}
+            for name, counts in sorted(self._caches.items()):
+                lookups = counts['hits'] + counts['misses']
+                caches[name] = {
+                    'hits': counts['hits'],
+                    'misses': counts['misses'],
+                    'hit_rate': counts['hits'] / lookups if lookups else None,
+                }
+        return {'requests': requests, 'caches': caches}
+
+    def to_prometheus(self):
+        """Return all metrics in the Prometheus text exposition format."""
+        lines = []
+        name = '%s_request_duration_seconds' % self.prefix
+        lines.append('# HELP %s Latency of Blazar API requests.' % name)
+        lines.append('# TYPE %s histogram' % name)
+        with self._lock:
+            for (method, endpoint), hist in sorted(self._histograms.items()):
+                labels = _labels(method=method, endpoint=endpoint)
+                counts = hist.cumulative_counts(PROMETHEUS_BUCKETS)
+                for bound, count in zip(PROMETHEUS_BUCKETS, counts):
+                    lines.append('%s_bucket{%s,le="%s"} %d'
+                                 % (name, labels, bound, count))
+                lines.append('%s_bucket{%s,le="+Inf"} %d'
+                             % (name, labels, hist.count))
+                lines.append('%s_sum{%s} %r' % (name, labels, hist.total))
+                lines.append('%s_count{%s} %d' % (name, labels, hist.count))
+
+            name = '%s_request_errors_total' % self.prefix
+            lines.append('# HELP %s Failed Blazar API requests.' % name)
+            lines.append('# TYPE %s counter' % name)
+            for (method, endpoint, status), count in sorted(
+                    self._errors.items()):
+                lines.append('%s{%s} %d' % (name, _labels(
+                    method=method, endpoint=endpoint, status=status), count))
+
+            for kind in ('hits', 'misses'):
+                name = '%s_cache_%s_total' % (self.prefix, kind)
+                lines.append('# HELP %s Client-side cache %s.' % (name, kind))
+                lines.append('# TYPE %s counter' % name)
+                for cache, counts in sorted(self._caches.items()):
+                    lines.append('%s{%s} %d'
+                                 % (name, _labels(cache=cache), counts[kind]))
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(**labels):
+    def escape(value):
+        return (str(value).replace('\\', '\\\\').replace('"', '\\"')
+                .replace('\n', '\\n'))
+    return ','.join('%s="%s"' % (k, escape(v))
+                    for k, v in sorted(labels.items()))
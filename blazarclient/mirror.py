@@ -0,0 +1,196 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Local SQLite mirror of the Blazar inventory.
+
+Hosts, leases and host allocations are copied into a SQLite file so that
+read-only queries and list commands can run without calling the API. Each
+collection is stored as JSON documents keyed by ID, which SQLite can query
+with its JSON functions, e.g.::
+
+    SELECT json_extract(body, '$.name') FROM resources
+    WHERE collection = 'leases'
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+
+from oslo_serialization import jsonutils
+from oslo_utils import timeutils
+
+from blazarclient import exception
+from blazarclient import tracing
+
+LOG = logging.getLogger(__name__)
+
+# Mirrored collections: manager attribute of the client, manager method
+# listing the collection and key identifying its items.
+COLLECTIONS = {
+    'hosts': ('host', 'list', 'id'),
+    'leases': ('lease', 'list', 'id'),
+    'host_allocations': ('host', 'list_allocations', 'resource_id'),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS resources (
+    collection TEXT NOT NULL,
+    id TEXT NOT NULL,
+    version TEXT NOT NULL,
+    body TEXT NOT NULL,
+    PRIMARY KEY (collection, id)
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    collection TEXT PRIMARY KEY,
+    synced_at TEXT NOT NULL
+);
+"""
+
+
+def default_path():
+    path = os.environ.get('BLAZAR_MIRROR')
+    if path:
+        return path
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(
+        os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'blazarclient', 'mirror.sqlite')
+
+
+def _version(item):
+    """Return a value changing whenever the item changes.
+
+    The whole content is hashed, since updated_at is not bumped by every
+    change, e.g. to the extra capabilities of a host.
+    """
+    body = jsonutils.dumps(item, sort_keys=True)
+    return 'sha256:%s' % hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+
+class Mirror(object):
+    """SQLite file holding a copy of the Blazar inventory.
+
+    **Examples**
+        with Mirror() as mirror:
+            mirror.sync(client)
+            hosts = mirror.list('hosts', sort_by='hypervisor_hostname')
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_path()
+        self._connection = None
+
+    def _connect(self):
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, mode=0o700, exist_ok=True)
+            # NOTE: leases may be private to the user, so the mirror is only
+            # readable by its owner.
+            os.close(os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600))
+            self._connection = sqlite3.connect(self.path)
+            self._connection.executescript(SCHEMA)
+        return self._connection
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @staticmethod
+    def _check_collection(collection):
+        if collection not in COLLECTIONS:
+            raise exception.BlazarClientException(
+                'Unknown mirror collection %s, must be one of: %s' %
+                (collection, ', '.join(sorted(COLLECTIONS))))
+
+    @tracing.traced
+    def sync(self, client, collections=None):
+        """Refresh the given collections, or all of them, from the API.
+
+        Only the items added, changed or removed since the previous
+        synchronization are written.
+
+        :returns: a dict mapping each collection to the number of items
+                  added, updated, deleted and unchanged.
+        """
+        results = {}
+        for collection in collections or sorted(COLLECTIONS):
+            self._check_collection(collection)
+            resource, method, key = COLLECTIONS[collection]
+            items = getattr(getattr(client, resource), method)()
+            results[collection] = self._store(collection, items, key)
+        return results
+
+    def _store(self, collection, items, key):
+        connection = self._connect()
+        stats = dict.fromkeys(('added', 'updated', 'deleted', 'unchanged'), 0)
+        with connection:
+            known = dict(connection.execute(
+                'SELECT id, version FROM resources WHERE collection = ?',
+                (collection,)))
+            for item in items:
+                item_id = str(item[key])
+                version = _version(item)
+                old_version = known.pop(item_id, None)
+                if old_version == version:
+                    stats['unchanged'] += 1
+                    continue
+                stats['added' if old_version is None else 'updated'] += 1
+                connection.execute(
+                    'INSERT OR REPLACE INTO resources '
+                    '(collection, id, version, body) VALUES (?, ?, ?, ?)',
+                    (collection, item_id, version, jsonutils.dumps(item)))
+            connection.executemany(
+                'DELETE FROM resources WHERE collection = ? AND id = ?',
+                [(collection, item_id) for item_id in known])
+            stats['deleted'] = len(known)
+            connection.execute(
+                'INSERT OR REPLACE INTO sync_state (collection, synced_at) '
+                'VALUES (?, ?)',
+                (collection, timeutils.utcnow().isoformat()))
+        LOG.debug('Synchronized %s: %s', collection, stats)
+        return stats
+
+    def synced_at(self, collection):
+        """Return when the collection was last synchronized, or None."""
+        self._check_collection(collection)
+        row = self._connect().execute(
+            'SELECT synced_at FROM sync_state WHERE collection = ?',
+            (collection,)).fetchone()
+        return timeutils.parse_isotime(row[0]) if row else None
+
+    @tracing.traced
+    def list(self, collection, sort_by=None):
+        """Return the mirrored items of a collection, like the API would."""
+        if self.synced_at(collection) is None:
+            raise exception.BlazarClientException(
+                'The %s collection has not been mirrored yet, run '
+                'mirror-sync first' % collection)
+        rows = self._connect().execute(
+            'SELECT body FROM resources WHERE collection = ? ORDER BY rowid',
+            (collection,))
+        items = [jsonutils.loads(body) for body, in rows]
+        if sort_by:
+            items = sorted(items, key=lambda item: item[sort_by])
+        return items
+
+    def execute(self, sql, parameters=()):
+        """Run a SQL query against the mirror and return its rows."""
+        return self._connect().execute(sql, parameters).fetchall()
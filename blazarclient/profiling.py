@@ -0,0 +1,160 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import contextlib
+import cProfile
+import pstats
+import sys
+
+DEFAULT_PROFILE_PATH = 'blazar.pstats'
+SCOPES = ('run', 'command')
+
+
+def add_arguments(parser):
+    """Add the profiling options to an argparse parser."""
+    parser.add_argument(
+        '--profile',
+        metavar='<path>',
+        default=None,
+        help='Profile the command with cProfile, save the statistics to '
+             '<path> and print the top entries. Use --profile alone to '
+             'save to %s.' % DEFAULT_PROFILE_PATH)
+    parser.add_argument(
+        '--profile-scope',
+        choices=SCOPES,
+        default='run',
+        help='Profile the whole run, including authentication and output '
+             'formatting (run, the default), or only the execution of the '
+             'subcommand (command).')
+    parser.add_argument(
+        '--profile-top',
+        metavar='<count>',
+        type=int,
+        default=20,
+        help='Number of entries to print, sorted by cumulative time '
+             '(default: 20).')
+
+
+def _parser():
+    parser = argparse.ArgumentParser(add_help=False)
+    add_arguments(parser)
+    return parser
+
+
+def _bare_profile(argv, index, commands):
+    """Return whether the --profile option at index is given no path.
+
+    It is when it is followed by nothing, by another option or by the
+    command name.
+    """
+    if argv[index] != '--profile':
+        return False
+    if index + 1 == len(argv):
+        return True
+    following = argv[index + 1]
+    return following.startswith('-') or following in commands
+
+
+def _scan_global_options(argv, parser=None, commands=()):
+    """Return the positions of the global options and of the command name.
+
+    The parser of the global options tells which of them take a value, so
+    that a value is never taken for an option or for the command name.
+    Without it, only the profiling options are known.
+    """
+    if parser is None:
+        parser = _parser()
+    actions = parser._option_string_actions
+    options = []
+    index = 0
+    while index < len(argv):
+        arg = argv[index]
+        if arg == '--' or not arg.startswith('-'):
+            break
+        options.append(index)
+        action = actions.get(arg)
+        if (action is not None and action.nargs != 0 and
+                not _bare_profile(argv, index, commands)):
+            # NOTE: the next argument is the value of this option.
+            index += 1
+        index += 1
+    return options, min(index, len(argv))
+
+
+def normalize_argv(argv, parser=None, commands=()):
+    """Give a bare global --profile option its default path.
+
+    This allows ``--profile`` to be followed by the command name without the
+    command name being taken as the path, while ``--profile <path>`` keeps
+    its path. The values of other options and the arguments of the command
+    are left unchanged.
+
+    :param parser: parser of all the global options, if available
+    :param commands: names of the commands of the shell
+    """
+    argv = list(argv)
+    options, _command = _scan_global_options(argv, parser, commands)
+    for index in options:
+        if _bare_profile(argv, index, commands):
+            argv[index] = '--profile=%s' % DEFAULT_PROFILE_PATH
+    return argv
+
+
+def parse_args(argv, parser=None, commands=()):
+    """Parse only the profiling options out of the global options of argv.
+
+    :param parser: parser of all the global options, if available
+    :param commands: names of the commands of the shell
+    """
+    argv = normalize_argv(argv, parser, commands)
+    _options, command = _scan_global_options(argv, parser)
+    options, _remainder = _parser().parse_known_args(argv[:command])
+    return options
+
+
+class Profiler(object):
+    """Runs a block of code under cProfile and reports the statistics."""
+
+    def __init__(self, path, scope='run', top=20, stream=None):
+        self.path = path
+        self.scope = scope
+        self.top = top
+        self.stream = stream
+
+    @classmethod
+    def from_options(cls, options, scope, stream=None):
+        """Return a profiler if options request profiling of this scope."""
+        if not getattr(options, 'profile', None):
+            return None
+        if options.profile_scope != scope:
+            return None
+        return cls(options.profile, scope=scope, top=options.profile_top,
+                   stream=stream)
+
+    @contextlib.contextmanager
+    def profile(self):
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            self.report(profile)
+
+    def report(self, profile):
+        stream = self.stream or sys.stderr
+        profile.dump_stats(self.path)
+        stats = pstats.Stats(profile, stream=stream)
+        stats.sort_stats('cumulative').print_stats(self.top)
+        stream.write('Profile saved to %s\n' % self.path)
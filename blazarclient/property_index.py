@@ -0,0 +1,117 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Inverted index of the properties of hosts, devices and networks."""
+
+import time
+
+EMPTY = frozenset()
+
+
+class PropertyIndex(object):
+    """Maps each resource property to its values and their resources.
+
+    The properties come from list_properties(detail=True). The resources,
+    needed to know which resource has which value, are only listed by
+    resource_loader the first time they are needed.
+
+    **Examples**
+        index = PropertyIndex.from_manager(client.host)
+        index.get_property('node_type')
+        index.resources_with('node_type', 'gpu')
+        index.match(node_type='gpu', gpu_model='A100')
+    """
+
+    def __init__(self, properties, resources=None, resource_loader=None):
+        self.properties = {}
+        for resource_property in properties:
+            resource_property = dict(resource_property)
+            if 'values' in resource_property:
+                resource_property['property_values'] = resource_property.pop(
+                    'values')
+            self.properties[resource_property['property']] = (
+                resource_property)
+        self._resource_loader = resource_loader
+        self._values = None
+        if resources is not None:
+            self._index(resources)
+
+    @classmethod
+    def from_manager(cls, manager):
+        return cls(manager.list_properties(detail=True),
+                   resource_loader=manager.list)
+
+    def _index(self, resources):
+        values = {name: {} for name in self.properties}
+        for resource in resources:
+            resource_id = str(resource['id'])
+            for name, by_value in values.items():
+                value = resource.get(name)
+                if value is not None:
+                    by_value.setdefault(str(value), set()).add(resource_id)
+        self._values = {
+            name: {value: frozenset(ids) for value, ids in by_value.items()}
+            for name, by_value in values.items()}
+
+    @property
+    def values(self):
+        """Return {property: {value: resource IDs}}."""
+        if self._values is None:
+            self._index(self._resource_loader()
+                        if self._resource_loader else [])
+        return self._values
+
+    def get_property(self, name):
+        """Return the details of a property, or None if it does not exist."""
+        return self.properties.get(name)
+
+    def values_of(self, name):
+        """Return the values taken by a property."""
+        return sorted(self.values.get(name, {}))
+
+    def resources_with(self, name, value):
+        """Return the IDs of the resources having a property value."""
+        return self.values.get(name, {}).get(str(value), EMPTY)
+
+    def match(self, **criteria):
+        """Return the IDs of the resources having all the property values."""
+        if not criteria:
+            return EMPTY
+        sets = sorted((self.resources_with(name, value)
+                       for name, value in criteria.items()), key=len)
+        return sets[0].intersection(*sets[1:])
+
+
+class PropertyIndexMixin(object):
+    """Keeps a PropertyIndex of the resources of a manager.
+
+    The index is rebuilt once older than property_index_ttl seconds, and
+    whenever a resource or a property is changed through the manager, so
+    that it is only stale after changes made by other clients.
+    """
+
+    property_index_ttl = 60
+    _property_index = None
+    _property_index_built_at = None
+
+    def property_index(self, refresh=False):
+        now = time.monotonic()
+        if (refresh or self._property_index is None or
+                now - self._property_index_built_at >=
+                self.property_index_ttl):
+            self._property_index = PropertyIndex.from_manager(self)
+            self._property_index_built_at = now
+        return self._property_index
+
+    def invalidate_property_index(self):
+        self._property_index = None
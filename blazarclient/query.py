@@ -0,0 +1,141 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Fluent queries over the resources listed by a manager.
+
+Equality filters on the fields a manager declares in ``query_filters`` are
+sent to the API as query parameters. Every other condition, the ordering
+and the limit are applied on the client side, lazily, so that iteration
+stops as soon as enough results were produced.
+"""
+
+import functools
+import heapq
+import itertools
+
+from blazarclient import expressions
+
+
+class _Descending(object):
+    """Sort key wrapper reversing the order of the wrapped value."""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+def _equals(field, value, item):
+    return item.get(field) == value
+
+
+class Query(object):
+    """Query builder, each method returning a new query.
+
+    **Examples**
+        query = client.lease.query().where(status='ACTIVE')
+        for lease in query.order_by('end_date').limit(10):
+            ...
+        query.where('["==", "$project_id", "%s"]' % project_id).first()
+    """
+
+    def __init__(self, manager, params=None):
+        self._manager = manager
+        # NOTE: arguments always passed to the list() method of the manager.
+        self._params = dict(params or {})
+        self._predicates = ()
+        self._order = ()
+        self._limit = None
+
+    def _copy(self, **changes):
+        query = Query.__new__(Query)
+        query.__dict__.update(self.__dict__)
+        query.__dict__.update(changes)
+        return query
+
+    def where(self, *conditions, **equals):
+        """Keep the items matching all the conditions.
+
+        :param conditions: functions taking an item and returning whether
+                           it matches, or resource_properties expressions
+                           such as '["==", "$status", "ACTIVE"]'
+        :param equals: fields the items must be equal to; those supported by
+                       the API are filtered by the server.
+        """
+        params = dict(self._params)
+        predicates = list(self._predicates)
+        pushdown = getattr(self._manager, 'query_filters', ())
+        for field, value in sorted(equals.items()):
+            if field in pushdown and field not in params:
+                params[field] = value
+            # NOTE: pushed down filters are checked again, in case the
+            # server ignores them.
+            predicates.append(functools.partial(_equals, field, value))
+        for condition in conditions:
+            if isinstance(condition, str):
+                condition = expressions.compile_expression(condition)
+            predicates.append(condition)
+        return self._copy(_params=params, _predicates=tuple(predicates))
+
+    def order_by(self, *fields):
+        """Sort the items by the fields, prefixed by '-' for descending.
+
+        Items without a field, or with None, come after the others.
+        """
+        return self._copy(_order=tuple(
+            (field[1:], True) if field.startswith('-') else (field, False)
+            for field in fields))
+
+    def limit(self, count):
+        """Return at most count items."""
+        return self._copy(_limit=count)
+
+    def _sort_key(self, item):
+        key = []
+        for field, descending in self._order:
+            value = item.get(field)
+            # NOTE: items missing the field sort last, in both orders.
+            key.append((value is None,
+                        _Descending(value) if descending else value))
+        return tuple(key)
+
+    def __iter__(self):
+        items = iter(self._manager.list(**self._params))
+        for predicate in self._predicates:
+            items = filter(predicate, items)
+        if self._order:
+            if self._limit is not None:
+                # NOTE: only the first items are kept while sorting.
+                items = heapq.nsmallest(self._limit, items,
+                                        key=self._sort_key)
+            else:
+                items = sorted(items, key=self._sort_key)
+        if self._limit is not None:
+            items = itertools.islice(items, self._limit)
+        return iter(items)
+
+    def all(self):
+        return list(self)
+
+    def first(self):
+        """Return the first item, or None if no item matches."""
+        return next(iter(self.limit(1)), None)
+
+    def count(self):
+        return sum(1 for _item in self)
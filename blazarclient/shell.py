@@ -17,6 +17,7 @@
 Command-line interface to the Blazar APIs
 """
 import argparse
+import contextlib
 import logging
 import os
 import sys
@@ -25,14 +26,24 @@ from cliff import app
 from cliff import commandmanager
 from keystoneauth1 import loading
 from oslo_utils import encodeutils
+from oslo_utils import strutils
 
+from blazarclient import auth_cache
+from blazarclient import cache
+from blazarclient import base
 from blazarclient import client as blazar_client
 from blazarclient import exception
+from blazarclient import profiling
+from blazarclient import timing
+from blazarclient import tracing
 from blazarclient.v1.shell_commands import devices
 from blazarclient.v1.shell_commands import allocations
+from blazarclient.v1.shell_commands import batch
+from blazarclient.v1.shell_commands import cache as cache_commands
 from blazarclient.v1.shell_commands import floatingips
 from blazarclient.v1.shell_commands import hosts
 from blazarclient.v1.shell_commands import leases
+from blazarclient.v1.shell_commands import mirror
 from blazarclient.v1.shell_commands import networks
 from blazarclient import version as base_version
 
@@ -40,8 +51,10 @@ COMMANDS_V1 = {
     'lease-list': leases.ListLeases,
     'lease-show': leases.ShowLease,
     'lease-create': leases.CreateLease,
+    'lease-create-bulk': leases.CreateLeasesBulk,
     'lease-update': leases.UpdateLease,
     'lease-delete': leases.DeleteLease,
+    'lease-resources': leases.ListLeaseResources,
     'host-list': hosts.ListHosts,
     'host-show': hosts.ShowHost,
     'host-create': hosts.CreateHost,
@@ -54,6 +67,7 @@ COMMANDS_V1 = {
     'host-property-list': hosts.ListHostProperties,
     'host-property-show': hosts.ShowHostProperty,
     'host-property-set': hosts.UpdateHostProperty,
+    'host-availability': hosts.ListHostAvailability,
     'network-list': networks.ListNetworks,
     'network-show': networks.ShowNetwork,
     'network-create': networks.CreateNetwork,
@@ -83,6 +97,10 @@ COMMANDS_V1 = {
     'device-property-set': devices.UpdateDeviceProperty,
     'allocation-list': allocations.ListAllocations,
     'allocation-show': allocations.ShowAllocations,
+    'batch': batch.RunBatch,
+    'cache-stats': cache_commands.ShowCacheStats,
+    'cache-clear': cache_commands.ClearCache,
+    'mirror-sync': mirror.SyncMirror,
 }
 
 VERSION = 1
@@ -100,7 +118,8 @@ def run_command(cmd, cmd_parser, sub_argv):
         values_specs = sub_argv[index:]
     known_args, _values_specs = cmd_parser.parse_known_args(_argv)
     cmd.values_specs = (index == -1 and _values_specs or values_specs)
-    return cmd.run(known_args)
+    with tracing.span('command %s' % cmd.__class__.__name__):
+        return cmd.run(known_args)
 
 
 def env(*_vars, **kwargs):
@@ -148,12 +167,16 @@ class BlazarShell(app.App):
     DEBUG_MESSAGE_FORMAT = '%(levelname)s: %(name)s %(message)s'
     log = logging.getLogger(__name__)
 
-    def __init__(self):
+    def __init__(self, stdin=None, stdout=None, stderr=None):
         super(BlazarShell, self).__init__(
             description=__doc__.strip(),
             version=VERSION,
-            command_manager=commandmanager.CommandManager('blazar.cli'), )
+            command_manager=commandmanager.CommandManager('blazar.cli'),
+            stdin=stdin, stdout=stdout, stderr=stderr)
         self.commands = COMMANDS
+        self.timing = None
+        self.auth_cache = None
+        self.response_cache = None
 
     def build_option_parser(self, description, version, argparse_kwargs=None):
         """Return an argparse option parser for this application.
@@ -191,6 +214,36 @@ class BlazarShell(app.App):
             default=False,
             action='store_true',
             help='Print debugging output')
+        parser.add_argument(
+            '--timing',
+            default=False,
+            action='store_true',
+            help='Print a table of the API requests made by the command and '
+                 'the time they took')
+        parser.add_argument(
+            '--trace-file',
+            metavar='<path>',
+            default=env('BLAZAR_TRACE_FILE'),
+            help='Append tracing spans of the command, its manager calls and '
+                 'its API requests to this file as JSON lines. '
+                 'Defaults to env[BLAZAR_TRACE_FILE].')
+        parser.add_argument(
+            '--deadline',
+            metavar='<seconds>',
+            type=float,
+            default=env('BLAZAR_DEADLINE') or None,
+            help='Maximum total time, in seconds, for all the API requests '
+                 'made by the command. Defaults to env[BLAZAR_DEADLINE].')
+        parser.add_argument(
+            '--cache-ttl',
+            metavar='<seconds>',
+            type=float,
+            default=env('BLAZAR_CACHE_TTL') or 30,
+            help='In interactive mode and in batch commands, reuse API '
+                 'responses for this many seconds unless a command modifies '
+                 'resources. 0 disables the cache. '
+                 'Defaults to env[BLAZAR_CACHE_TTL] or 30.')
+        profiling.add_arguments(parser)
 
         # Removes help action to defer its execution
         self.deferred_help_action = help_action
@@ -215,6 +268,14 @@ class BlazarShell(app.App):
             '--os_reservation_api_version',
             help=argparse.SUPPRESS)
 
+        parser.add_argument(
+            '--os-auth-cache',
+            default=strutils.bool_from_string(env('BLAZAR_AUTH_CACHE')),
+            action='store_true',
+            help='Reuse the Keystone token and reservation endpoint of '
+                 'previous invocations, cached in a file only readable by '
+                 'the current user. Defaults to env[BLAZAR_AUTH_CACHE].')
+
         # Deprecated arguments
         parser.add_argument(
             '--service-type', metavar='<service-type>',
@@ -247,16 +308,32 @@ class BlazarShell(app.App):
 
         print(' '.join(commands | options))
 
+    def command_names(self):
+        """Return the names of all the commands of the shell."""
+        names = set(name for name, _command in self.command_manager)
+        for commands in self.commands.values():
+            names.update(commands)
+        return names
+
+    def register_arguments(self, argv):
+        """Add the authentication, session and adapter options, once."""
+        if getattr(self, '_arguments_registered', False):
+            return
+        loading.register_auth_argparse_arguments(self.parser, argv)
+        loading.session.register_argparse_arguments(self.parser)
+        loading.adapter.register_argparse_arguments(
+            self.parser, service_type='reservation')
+        self._arguments_registered = True
+
     def run(self, argv):
         """Equivalent to the main program for the application.
 
         :param argv: input arguments and options
         :paramtype argv: list of str
         """
-        loading.register_auth_argparse_arguments(self.parser, argv)
-        loading.session.register_argparse_arguments(self.parser)
-        loading.adapter.register_argparse_arguments(
-            self.parser, service_type='reservation')
+        self.register_arguments(argv)
+        argv = profiling.normalize_argv(argv, self.parser,
+                                        self.command_names())
 
         try:
             self.options, remainder = self.parser.parse_known_args(argv)
@@ -294,6 +371,9 @@ class BlazarShell(app.App):
                 self.deferred_help_action(self.parser, self.parser, None, None)
 
             self.configure_logging()
+            if self.options.trace_file:
+                tracing.set_tracer(tracing.Tracer(
+                    tracing.JSONFileExporter(self.options.trace_file)))
             self.interactive_mode = not remainder
             self.initialize_app(remainder)
 
@@ -310,9 +390,25 @@ class BlazarShell(app.App):
             result = self.interact()
         else:
             result = self.run_subcommand(remainder)
+        self._save_auth_cache()
         return result
 
     def run_subcommand(self, argv):
+        with contextlib.ExitStack() as stack:
+            profiler = profiling.Profiler.from_options(
+                self.options, 'command', stream=self.stderr)
+            if profiler is not None:
+                stack.enter_context(profiler.profile())
+            if self.timing is not None:
+                self.timing.reset()
+                stack.callback(self._print_timing)
+            stack.enter_context(base.deadline_scope(self.options.deadline))
+            return self._run_subcommand(argv)
+
+    def _print_timing(self):
+        self.stdout.write(self.timing.format_table() + '\n')
+
+    def _run_subcommand(self, argv):
         subcommand = self.command_manager.find_command(argv)
         cmd_factory, cmd_name, sub_argv = subcommand
         cmd = cmd_factory(self, self.options)
@@ -349,20 +445,57 @@ class BlazarShell(app.App):
                                        str(err3))
         return result
 
+    def _endpoint_filter(self):
+        return dict(
+            service_type=(self.options.service_type or
+                          self.options.os_service_type),
+            interface=self.options.endpoint_type or self.options.os_interface,
+            region_name=self.options.os_region_name,
+        )
+
     def authenticate_user(self):
         """Authenticate user and set client by using passed params."""
         auth = loading.load_auth_from_argparse_arguments(self.options)
         sess = loading.load_session_from_argparse_arguments(
             self.options, auth=auth)
+        request_hooks = []
+        if self.options.timing:
+            self.timing = timing.TimingCollector()
+            request_hooks.append(self.timing)
+        endpoint_filter = self._endpoint_filter()
+        kwargs = {}
+        if self.options.os_auth_cache:
+            # NOTE: an expired or revoked cached token is rejected with a 401,
+            # on which keystoneauth fetches a new token and retries.
+            self.auth_cache = auth_cache.AuthCache()
+            if self.auth_cache.load(auth):
+                endpoint = self.auth_cache.get_endpoint(auth,
+                                                        **endpoint_filter)
+                if endpoint:
+                    kwargs['endpoint_override'] = endpoint
         self.client = blazar_client.Client(
             self.options.os_reservation_api_version,
             session=sess,
-            service_type=self.options.service_type or self.options.os_service_type,
-            interface=self.options.endpoint_type or self.options.os_interface,
-            region_name=self.options.os_region_name,
+            request_hooks=request_hooks,
+            cache=self.response_cache,
+            **dict(endpoint_filter, **kwargs)
         )
         return
 
+    def _save_auth_cache(self):
+        if self.auth_cache is None:
+            return
+        adapter = self.client.lease.request_manager
+        auth = adapter.session.auth
+        try:
+            if auth.get_auth_state() is None:
+                return
+            self.auth_cache.save(auth,
+                                 endpoint=adapter.get_endpoint(),
+                                 **self._endpoint_filter())
+        except Exception as e:
+            self.log.debug('Could not save the auth cache: %s', e)
+
     def initialize_app(self, argv):
         """Global app init bits:
 
@@ -376,6 +509,12 @@ class BlazarShell(app.App):
         if argv:
             cmd_info = self.command_manager.find_command(argv)
             cmd_factory, cmd_name, sub_argv = cmd_info
+        # NOTE: one-shot commands never read the same resource twice, so the
+        # response cache only pays off when several commands share a client.
+        if ((self.interactive_mode or cmd_name == 'batch') and
+                float(self.options.cache_ttl) > 0):
+            self.response_cache = cache.ResponseCache(
+                ttl=float(self.options.cache_ttl))
         if self.interactive_mode or cmd_name != 'help':
             self.authenticate_user()
 
@@ -411,8 +550,17 @@ class BlazarShell(app.App):
 
 
 def main(argv=sys.argv[1:]):
+    argv = list(map(encodeutils.safe_decode, argv))
     try:
-        return BlazarShell().run(list(map(encodeutils.safe_decode, argv)))
+        blazar_shell = BlazarShell()
+        blazar_shell.register_arguments(argv)
+        profiler = profiling.Profiler.from_options(
+            profiling.parse_args(argv, blazar_shell.parser,
+                                 blazar_shell.command_names()), 'run')
+        if profiler is None:
+            return blazar_shell.run(argv)
+        with profiler.profile():
+            return blazar_shell.run(argv)
     except exception.BlazarClientException:
         return 1
     except Exception as e:
@@ -0,0 +1,286 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Columnar binary snapshots of manager list results.
+
+A snapshot stores a list of dicts, such as the result of
+``client.host.list_allocations()``, so that it can be memory-mapped and
+opened without reading its rows. Values are only decoded when a row or a
+column is accessed.
+
+Layout, all integers being little-endian::
+
+    header     magic (8 bytes), format version (uint16), row count
+               (uint64), column count (uint32)
+    directory  for each column: name length (uint16), UTF-8 name, offset
+               of its offsets array (uint64), offset of its data (uint64)
+    columns    for each column, 8-byte aligned: row count + 1 uint64
+               offsets relative to the column data, then the data
+
+Each cell of the data starts with a type tag byte followed by its payload.
+Nested lists and dicts are stored as JSON and parsed when accessed.
+"""
+
+import collections.abc
+import mmap
+import os
+import struct
+import tempfile
+
+from oslo_serialization import jsonutils
+
+from blazarclient import exception
+
+MAGIC = b'BLZSNAP\x00'
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct('<8sHQI')
+_NAME_LENGTH = struct.Struct('<H')
+_COLUMN = struct.Struct('<QQ')
+_OFFSET = struct.Struct('<Q')
+_OFFSET_PAIR = struct.Struct('<QQ')
+_INT = struct.Struct('<q')
+_FLOAT = struct.Struct('<d')
+
+# Cell type tags
+_MISSING = b'-'
+_NONE = b'N'
+_TRUE = b'T'
+_FALSE = b'F'
+_INT_TAG = b'i'
+_FLOAT_TAG = b'd'
+_STR = b's'
+_JSON = b'j'
+
+_INT_MIN = -2 ** 63
+_INT_MAX = 2 ** 63 - 1
+
+
+def _encode(value):
+    if value is None:
+        return _NONE
+    if value is True:
+        return _TRUE
+    if value is False:
+        return _FALSE
+    if isinstance(value, int) and _INT_MIN <= value <= _INT_MAX:
+        return _INT_TAG + _INT.pack(value)
+    if isinstance(value, float):
+        return _FLOAT_TAG + _FLOAT.pack(value)
+    if isinstance(value, str):
+        return _STR + value.encode('utf-8')
+    return _JSON + jsonutils.dump_as_bytes(value)
+
+
+def _decode(cell):
+    tag = cell[:1]
+    if tag == _STR:
+        return cell[1:].decode('utf-8')
+    if tag == _INT_TAG:
+        return _INT.unpack_from(cell, 1)[0]
+    if tag == _NONE:
+        return None
+    if tag == _TRUE:
+        return True
+    if tag == _FALSE:
+        return False
+    if tag == _FLOAT_TAG:
+        return _FLOAT.unpack_from(cell, 1)[0]
+    if tag == _JSON:
+        return jsonutils.loads(cell[1:])
+    raise exception.BlazarClientException(
+        'Corrupted snapshot: unknown cell type %r' % tag)
+
+
+def _padding(size):
+    return b'\x00' * (-size % 8)
+
+
+def write(path, rows):
+    """Write a list of dicts to a snapshot file.
+
+    Columns are the union of the keys of all rows. Keys missing from a row
+    are also missing from it once read back.
+    """
+    rows = list(rows)
+    names = list(dict.fromkeys(key for row in rows for key in row))
+    columns = []
+    for name in names:
+        offsets = [0]
+        data = bytearray()
+        for row in rows:
+            data += _encode(row[name]) if name in row else _MISSING
+            offsets.append(len(data))
+        columns.append((name, offsets, data))
+
+    directory = bytearray()
+    for name, _offsets, _data in columns:
+        encoded_name = name.encode('utf-8')
+        directory += _NAME_LENGTH.pack(len(encoded_name)) + encoded_name
+        directory += bytes(_COLUMN.size)
+    position = _HEADER.size + len(directory)
+    position += len(_padding(position))
+
+    body = bytearray()
+    entry = _HEADER.size
+    for name, offsets, data in columns:
+        entry += _NAME_LENGTH.size + len(name.encode('utf-8'))
+        offsets_position = position + len(body)
+        body += struct.pack('<%dQ' % len(offsets), *offsets)
+        data_position = position + len(body)
+        body += data + _padding(len(data))
+        _COLUMN.pack_into(directory, entry - _HEADER.size, offsets_position,
+                          data_position)
+        entry += _COLUMN.size
+
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, len(rows), len(columns))
+    target_directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=target_directory, prefix='.snapshot-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(header)
+            f.write(directory)
+            f.write(_padding(_HEADER.size + len(directory)))
+            f.write(body)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+class Row(collections.abc.Mapping):
+    """Read-only mapping decoding the values of a snapshot row on access."""
+
+    __slots__ = ('_snapshot', '_index')
+
+    def __init__(self, snapshot, index):
+        self._snapshot = snapshot
+        self._index = index
+
+    def __getitem__(self, key):
+        column = self._snapshot._columns.get(key)
+        if column is None:
+            raise KeyError(key)
+        cell = column.cell(self._index)
+        if cell == _MISSING:
+            raise KeyError(key)
+        return _decode(cell)
+
+    def __iter__(self):
+        for name, column in self._snapshot._columns.items():
+            if column.cell(self._index) != _MISSING:
+                yield name
+
+    def __len__(self):
+        return sum(1 for _name in self)
+
+    def __repr__(self):
+        return 'Row(%r)' % dict(self)
+
+
+class _Column(object):
+
+    __slots__ = ('_mmap', '_offsets', '_data')
+
+    def __init__(self, mmap_, offsets_position, data_position):
+        self._mmap = mmap_
+        self._offsets = offsets_position
+        self._data = data_position
+
+    def cell(self, index):
+        start, end = _OFFSET_PAIR.unpack_from(
+            self._mmap, self._offsets + index * _OFFSET.size)
+        # NOTE: cells are copied out of the map, as views on it would
+        # prevent closing the snapshot for as long as they are referenced.
+        return self._mmap[self._data + start:self._data + end]
+
+
+class Snapshot(collections.abc.Sequence):
+    """Memory-mapped snapshot, behaving as a sequence of rows.
+
+    Opening a snapshot only reads its header and column directory. Rows
+    and column values must not be used once the snapshot is closed.
+
+    **Examples**
+        snapshot.write('allocations.snap', client.host.list_allocations())
+        with snapshot.Snapshot('allocations.snap') as allocations:
+            for resource_id in allocations.column('resource_id'):
+                ...
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._columns = {}
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _HEADER.size:
+                raise exception.BlazarClientException(
+                    '%s is not a blazarclient snapshot' % path)
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self._length, column_count = _HEADER.unpack_from(
+            self._mmap)
+        if magic != MAGIC:
+            self.close()
+            raise exception.BlazarClientException(
+                '%s is not a blazarclient snapshot' % path)
+        if version != FORMAT_VERSION:
+            self.close()
+            raise exception.BlazarClientException(
+                'Unsupported snapshot format version %d' % version)
+        position = _HEADER.size
+        for _i in range(column_count):
+            length, = _NAME_LENGTH.unpack_from(self._mmap, position)
+            position += _NAME_LENGTH.size
+            name = self._mmap[position:position + length].decode('utf-8')
+            position += length
+            offsets_position, data_position = _COLUMN.unpack_from(
+                self._mmap, position)
+            position += _COLUMN.size
+            self._columns[name] = _Column(self._mmap, offsets_position,
+                                          data_position)
+
+    @property
+    def columns(self):
+        return list(self._columns)
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError('snapshot row index out of range')
+        return Row(self, index)
+
+    def column(self, name, default=None):
+        """Yield the values of a column, default being used where missing."""
+        column = self._columns.get(name)
+        for index in range(self._length):
+            cell = column.cell(index) if column is not None else _MISSING
+            yield default if cell == _MISSING else _decode(cell)
+
+    def close(self):
+        if self._mmap is None:
+            return
+        self._columns = {}
+        self._mmap.close()
+        self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
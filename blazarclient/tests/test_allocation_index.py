@@ -0,0 +1,115 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+import random
+from unittest import mock
+
+from blazarclient import allocation_index
+from blazarclient import tests
+
+ALLOCATIONS = [
+    {'resource_id': 1, 'reservations': [
+        {'id': 'r1', 'lease_id': 'l1',
+         'start_date': '2024-05-01T10:00:00.000000',
+         'end_date': '2024-05-01T12:00:00.000000'},
+        {'id': 'r2', 'lease_id': 'l2',
+         'start_date': '2024-05-01T14:00:00.000000',
+         'end_date': '2024-05-01T16:00:00.000000'}]},
+    {'resource_id': 2, 'reservations': [
+        {'id': 'r3', 'lease_id': 'l3',
+         'start_date': '2024-05-01T09:00:00.000000',
+         'end_date': '2024-05-01T13:00:00.000000'}]},
+    {'resource_id': 3, 'reservations': []},
+]
+
+
+class IntervalTreeTestCase(tests.TestCase):
+
+    def test_matches_linear_scan(self):
+        rand = random.Random(42)
+        for _trial in range(50):
+            intervals = []
+            for value in range(rand.randint(0, 30)):
+                start = rand.randint(0, 100)
+                intervals.append((start, start + rand.randint(1, 30), value))
+            tree = allocation_index.IntervalTree(intervals)
+            for _query in range(20):
+                start = rand.randint(0, 130)
+                end = start + rand.randint(1, 20)
+                expected = sorted(v for s, e, v in intervals
+                                  if s < end and e > start)
+                self.assertEqual(expected,
+                                 sorted(tree.overlapping(start, end)))
+                self.assertEqual(bool(expected), tree.overlaps(start, end))
+
+
+class AllocationIndexTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(AllocationIndexTestCase, self).setUp()
+        self.index = allocation_index.AllocationIndex(ALLOCATIONS)
+
+    def test_free(self):
+        self.assertEqual([3], self.index.free('2024-05-01 10:00',
+                                              '2024-05-01 11:00'))
+        self.assertEqual([1, 3], self.index.free('2024-05-01 12:00',
+                                                 '2024-05-01 14:00'))
+        self.assertEqual([4], self.index.free('2024-05-01 10:00',
+                                              '2024-05-01 11:00', [1, 4]))
+
+    def test_overlapping(self):
+        found = self.index.overlapping('2024-05-01 11:00', '2024-05-01 15:00')
+        self.assertEqual([(1, 'r1'), (1, 'r2'), (2, 'r3')],
+                         sorted((rid, r['id']) for rid, r in found))
+        found = self.index.overlapping('2024-05-01 11:00', '2024-05-01 15:00',
+                                       resource_id=2)
+        self.assertEqual(['r3'], [r['id'] for _rid, r in found])
+
+    def test_first_window(self):
+        start, resources = self.index.first_window(
+            3, datetime.timedelta(hours=2), '2024-05-01 08:00')
+        self.assertEqual(datetime.datetime(2024, 5, 1, 16), start)
+        self.assertEqual([1, 2, 3], resources)
+        start, resources = self.index.first_window(
+            2, datetime.timedelta(hours=1), '2024-05-01 10:00')
+        self.assertEqual(datetime.datetime(2024, 5, 1, 12), start)
+        self.assertEqual([1, 3], resources)
+
+    def test_first_window_not_found(self):
+        self.assertIsNone(self.index.first_window(
+            3, datetime.timedelta(hours=2), '2024-05-01 08:00',
+            not_after='2024-05-01 15:00'))
+
+    def test_resources_for_lease(self):
+        self.assertEqual([1], self.index.resources_for_lease('l2'))
+        self.assertEqual([2], self.index.resources_for_reservation('r3'))
+        self.assertEqual([], self.index.resources_for_lease('unknown'))
+
+    def test_reservations_of(self):
+        self.assertEqual(['r1', 'r2'], [
+            r['id'] for r in self.index.reservations_of(1)])
+        self.assertEqual(['r2'], [
+            r['id'] for r in self.index.reservations_of(1, lease_id='l2')])
+        self.assertEqual([], self.index.reservations_of(
+            1, lease_id='l2', reservation_id='r1'))
+        self.assertEqual(['r3'], [
+            r['id'] for r in self.index.reservations_of(
+                2, reservation_id='r3')])
+
+    def test_from_client(self):
+        client = mock.Mock()
+        client.network.list_allocations.return_value = ALLOCATIONS
+        index = allocation_index.AllocationIndex.from_client(client,
+                                                             'network')
+        self.assertEqual([1, 2, 3], index.resource_ids)
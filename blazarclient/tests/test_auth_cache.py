@@ -0,0 +1,86 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+import os
+import stat
+from unittest import mock
+
+import fixtures
+from oslo_utils import timeutils
+
+from blazarclient import auth_cache
+from blazarclient import tests
+
+
+def _auth(cache_id='user-a', state='{"token": "t1"}', expires_in=3600):
+    auth = mock.Mock()
+    auth.get_cache_id.return_value = cache_id
+    auth.get_auth_state.return_value = state
+    auth.auth_ref.expires = (timeutils.utcnow(with_timezone=True) +
+                             datetime.timedelta(seconds=expires_in))
+    return auth
+
+
+class AuthCacheTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(AuthCacheTestCase, self).setUp()
+        self.path = os.path.join(
+            self.useFixture(fixtures.TempDir()).path, 'cache', 'auth.json')
+        self.cache = auth_cache.AuthCache(self.path)
+
+    def test_save_and_load(self):
+        self.cache.save(_auth(), service_type='reservation',
+                        interface='public', endpoint='http://blazar/v1')
+        self.assertEqual(0o600, stat.S_IMODE(os.stat(self.path).st_mode))
+        self.assertEqual(0o700, stat.S_IMODE(
+            os.stat(os.path.dirname(self.path)).st_mode))
+
+        auth = _auth(state=None)
+        self.assertTrue(self.cache.load(auth))
+        auth.set_auth_state.assert_called_once_with('{"token": "t1"}')
+        self.assertEqual('http://blazar/v1', self.cache.get_endpoint(
+            auth, 'reservation', interface='public'))
+        self.assertIsNone(self.cache.get_endpoint(
+            auth, 'reservation', interface='internal'))
+
+    def test_load_other_user(self):
+        self.cache.save(_auth())
+        auth = _auth(cache_id='user-b')
+        self.assertFalse(self.cache.load(auth))
+        auth.set_auth_state.assert_not_called()
+
+    def test_load_expiring_token(self):
+        self.cache.save(_auth(expires_in=60))
+        self.assertFalse(self.cache.load(_auth()))
+
+    def test_load_ignores_insecure_file(self):
+        self.cache.save(_auth())
+        os.chmod(self.path, 0o644)
+        self.assertFalse(self.cache.load(_auth()))
+
+    def test_save_new_token_drops_endpoints(self):
+        self.cache.save(_auth(), service_type='reservation',
+                        endpoint='http://blazar/v1')
+        self.cache.save(_auth(state='{"token": "t2"}'))
+        self.assertIsNone(self.cache.get_endpoint(_auth(), 'reservation'))
+
+    def test_save_without_state(self):
+        self.cache.save(_auth(state=None))
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_invalidate(self):
+        self.cache.save(_auth())
+        self.cache.invalidate(_auth())
+        self.assertFalse(self.cache.load(_auth()))
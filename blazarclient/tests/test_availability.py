@@ -0,0 +1,87 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+
+from blazarclient import availability
+from blazarclient import tests
+
+HOSTS = [
+    {'id': '1', 'hypervisor_hostname': 'host-1', 'vcpus': '8', 'gpu': 'yes'},
+    {'id': '2', 'hypervisor_hostname': 'host-2', 'vcpus': '16'},
+    {'id': '3', 'hypervisor_hostname': 'host-3', 'vcpus': '32'},
+]
+ALLOCATIONS = [
+    {'resource_id': 1, 'reservations': [
+        {'start_date': '2024-05-01T10:00:00.000000',
+         'end_date': '2024-05-01T12:00:00.000000'}]},
+    {'resource_id': 2, 'reservations': [
+        {'start_date': '2024-05-01T09:00:00.000000',
+         'end_date': '2024-05-01T13:00:00.000000'}]},
+]
+HOUR = datetime.timedelta(hours=1)
+
+
+def _date(hour):
+    return datetime.datetime(2024, 5, 1, hour)
+
+
+class FindWindowsTestCase(tests.TestCase):
+
+    def test_find_windows(self):
+        windows = availability.find_windows(HOSTS, ALLOCATIONS, 2, HOUR,
+                                            _date(8))
+        self.assertEqual(
+            [availability.Window(_date(8), _date(9), ['host-1', 'host-3']),
+             availability.Window(_date(12), None, ['host-1', 'host-3'])],
+            windows)
+
+    def test_window_ends_with_its_hosts(self):
+        hosts = [{'id': 'a', 'hypervisor_hostname': 'host-a'},
+                 {'id': 'b', 'hypervisor_hostname': 'host-b'}]
+        allocations = [
+            {'resource_id': 'a', 'reservations': [
+                {'start_date': '2024-05-01T06:00:00.000000',
+                 'end_date': '2024-05-01T23:00:00.000000'}]},
+            {'resource_id': 'b', 'reservations': [
+                {'start_date': '2024-04-30T23:00:00.000000',
+                 'end_date': '2024-05-01T03:00:00.000000'},
+                {'start_date': '2024-05-01T12:00:00.000000',
+                 'end_date': '2024-05-01T23:00:00.000000'}]},
+        ]
+        windows = availability.find_windows(hosts, allocations, 1, HOUR,
+                                            _date(0), limit=2)
+        self.assertEqual(
+            [availability.Window(_date(0), _date(5), ['host-a']),
+             availability.Window(_date(5), _date(11), ['host-b'])],
+            windows)
+
+    def test_find_windows_until(self):
+        windows = availability.find_windows(HOSTS, ALLOCATIONS, 3, 2 * HOUR,
+                                            _date(6), not_after=_date(20),
+                                            limit=1)
+        self.assertEqual(
+            [availability.Window(_date(6), _date(7),
+                                 ['host-1', 'host-2', 'host-3'])],
+            windows)
+
+    def test_find_windows_with_resource_properties(self):
+        windows = availability.find_windows(
+            HOSTS, ALLOCATIONS, 2, HOUR, _date(8),
+            resource_properties='[">=", "$vcpus", "16"]')
+        self.assertEqual([['host-2', 'host-3'], ['host-2', 'host-3']],
+                         [window.hosts for window in windows])
+
+    def test_no_window(self):
+        self.assertEqual([], availability.find_windows(
+            HOSTS, ALLOCATIONS, 4, HOUR, _date(8)))
@@ -16,9 +16,15 @@
 
 from unittest import mock
 
+from keystoneauth1 import session
+from oslo_serialization import jsonutils
+import requests
+
 from blazarclient import base
+from blazarclient import cache
 from blazarclient import exception
 from blazarclient import tests
+from blazarclient.v1 import leases
 
 
 class RequestManagerTestCase(tests.TestCase):
@@ -91,6 +97,15 @@ class RequestManagerTestCase(tests.TestCase):
         self.assertDictEqual(body, {"fake": "FAKE"})
         m.assert_called_once_with(url, "PUT", body=req_body)
 
+    @mock.patch('blazarclient.base.RequestManager.request',
+                return_value=(200, {"fake": "FAKE"}))
+    def test_put_with_headers(self, m):
+        url = '/leases/aaa-bbb-ccc'
+        req_body = {'name': 'lease-test'}
+        self.manager.put(url, req_body, headers={'If-Match': '"v1"'})
+        m.assert_called_once_with(url, "PUT", body=req_body,
+                                  headers={'If-Match': '"v1"'})
+
     @mock.patch('requests.request')
     def test_request_ok_with_body(self, m):
         m.return_value.status_code = 200
@@ -127,6 +142,99 @@ class RequestManagerTestCase(tests.TestCase):
         self.assertRaises(exception.BlazarClientException,
                           self.manager.request, url, "POST", **kwargs)
 
+    @mock.patch('requests.request')
+    def test_request_calls_hooks(self, m):
+        m.return_value.status_code = 200
+        m.return_value.text = '{"lease": {}}'
+        m.return_value.content = b'{"lease": {}}'
+        hook = mock.Mock()
+        self.manager.request_hooks = [hook]
+        self.manager.request('/leases/%s' % ('a' * 8 + '-aaaa' * 3 +
+                                             '-' + 'a' * 12), 'GET')
+        record = hook.call_args[0][0]
+        self.assertEqual('GET', record.method)
+        self.assertEqual('/leases/{id}', record.url_template)
+        self.assertEqual(200, record.status_code)
+        self.assertEqual(13, record.bytes)
+
+    @mock.patch('requests.request')
+    def test_request_calls_hooks_on_failure(self, m):
+        m.side_effect = ValueError('connection refused')
+        hook = mock.Mock()
+        self.manager.request_hooks = [hook]
+        self.assertRaises(ValueError, self.manager.request, '/leases', 'GET')
+        self.assertIsNone(hook.call_args[0][0].status_code)
+
+    @mock.patch('requests.request')
+    def test_request_ignores_failing_hook(self, m):
+        m.return_value.status_code = 200
+        m.return_value.text = '{}'
+        m.return_value.content = b'{}'
+        self.manager.request_hooks = [mock.Mock(side_effect=KeyError)]
+        self.assertEqual((m(), {}), self.manager.request('/leases', 'GET'))
+
+    @mock.patch('requests.request')
+    def test_request_with_deadline(self, m):
+        m.return_value.status_code = 200
+        m.return_value.text = '{}'
+        with base.deadline_scope(30):
+            self.manager.request('/leases', 'GET', timeout=60)
+        self.assertLessEqual(m.call_args[1]['timeout'], 30)
+
+    @mock.patch('requests.request')
+    def test_request_with_expired_deadline(self, m):
+        with base.deadline_scope(30) as deadline:
+            deadline.expires_at = 0
+            self.assertRaises(exception.DeadlineExceeded,
+                              self.manager.request, '/leases', 'GET')
+        m.assert_not_called()
+
+    @mock.patch('requests.request')
+    def test_request_timeout_after_deadline(self, m):
+        def timeout(*args, **kwargs):
+            deadline.expires_at = 0
+            raise ValueError('read timeout')
+        m.side_effect = timeout
+        with base.deadline_scope(30) as deadline:
+            self.assertRaises(exception.DeadlineExceeded,
+                              self.manager.request, '/leases', 'GET')
+
+
+class DeadlineTestCase(tests.TestCase):
+
+    def test_no_deadline(self):
+        with base.deadline_scope(None) as deadline:
+            self.assertIsNone(deadline)
+            self.assertIsNone(base.current_deadline())
+
+    def test_nested_scopes_keep_earliest_deadline(self):
+        with base.deadline_scope(10) as outer:
+            with base.deadline_scope(60) as inner:
+                self.assertIs(outer, inner)
+            with base.deadline_scope(5) as inner:
+                self.assertIsNot(outer, inner)
+                self.assertIs(inner, base.current_deadline())
+            self.assertIs(outer, base.current_deadline())
+        self.assertIsNone(base.current_deadline())
+
+    def test_request_timeout(self):
+        deadline = base.Deadline(10)
+        self.assertLessEqual(deadline.request_timeout(), 10)
+        self.assertEqual(2, deadline.request_timeout(2))
+        deadline.expires_at = 0
+        self.assertTrue(deadline.expired)
+        self.assertRaises(exception.DeadlineExceeded,
+                          deadline.request_timeout)
+
+
+class URLTemplateTestCase(tests.TestCase):
+
+    def test_url_template(self):
+        self.assertEqual('/os-hosts/{id}/allocation',
+                         base.url_template('/os-hosts/12/allocation'))
+        self.assertEqual('/os-hosts/properties',
+                         base.url_template('/os-hosts/properties?detail=True'))
+
 
 class SessionClientTestCase(tests.TestCase):
 
@@ -157,6 +265,89 @@ class SessionClientTestCase(tests.TestCase):
         self.assertRaises(exception.BlazarClientException,
                           self.manager.request, url, "POST", **kwargs)
 
+    @mock.patch('blazarclient.base.adapter.LegacyJsonAdapter.request')
+    def test_request_calls_hooks(self, m):
+        resp = mock.Mock(status_code=404, content=b'{}')
+        m.return_value = (resp, {})
+        hook = mock.Mock()
+        self.manager.request_hooks = [hook]
+        self.assertRaises(exception.BlazarClientException,
+                          self.manager.request, '/leases/1', 'DELETE')
+        record = hook.call_args[0][0]
+        self.assertEqual(('DELETE', '/leases/{id}', 404),
+                         (record.method, record.url_template,
+                          record.status_code))
+
+    @mock.patch('blazarclient.base.adapter.LegacyJsonAdapter.request')
+    def test_request_served_from_cache(self, m):
+        resp = mock.Mock(status_code=200, content=b'{}')
+        m.return_value = (resp, {'leases': []})
+        self.manager.cache = cache.ResponseCache()
+        self.manager.request('/leases', 'GET')
+        _resp, body = self.manager.request('/leases', 'GET')
+        self.assertEqual({'leases': []}, body)
+        self.assertEqual(1, m.call_count)
+
+    @mock.patch('blazarclient.base.adapter.LegacyJsonAdapter.request')
+    def test_write_request_invalidates_cache(self, m):
+        resp = mock.Mock(status_code=200, content=b'{}')
+        m.return_value = (resp, {})
+        self.manager.cache = cache.ResponseCache()
+        self.manager.request('/leases', 'GET')
+        self.manager.request('/leases/1', 'DELETE')
+        self.manager.request('/leases', 'GET')
+        self.assertEqual(3, m.call_count)
+
+    @mock.patch('blazarclient.base.adapter.LegacyJsonAdapter.request')
+    def test_request_deadline_keeps_session_timeout(self, m):
+        m.return_value = (mock.Mock(status_code=200), {})
+        self.manager.session.timeout = 5
+        with base.deadline_scope(60):
+            self.manager.request('/leases', 'GET')
+        self.assertEqual(5, m.call_args[1]['timeout'])
+
+    @mock.patch('blazarclient.base.adapter.LegacyJsonAdapter.request')
+    def test_request_deadline_shortens_session_timeout(self, m):
+        m.return_value = (mock.Mock(status_code=200), {})
+        self.manager.session.timeout = 60
+        with base.deadline_scope(5):
+            self.manager.request('/leases', 'GET')
+        self.assertLessEqual(m.call_args[1]['timeout'], 5)
+
+
+class KeystoneSessionTestCase(tests.TestCase):
+    """Requests sent through a real keystoneauth session."""
+
+    def setUp(self):
+        super(KeystoneSessionTestCase, self).setUp()
+        self.manager = leases.LeaseClientManager(
+            blazar_url=None, auth_token=None,
+            session=session.Session(timeout=5),
+            endpoint_override='http://blazar.example.com/v1')
+        self.send = self.patch(requests.Session, 'request')
+
+    def _respond(self, status_code, body):
+        resp = requests.Response()
+        resp.status_code = status_code
+        resp._content = jsonutils.dump_as_bytes(body)
+        resp.headers['Content-Type'] = 'application/json'
+        self.send.return_value = resp
+
+    def test_request(self):
+        self._respond(200, {'leases': [{'id': '1'}]})
+        self.assertEqual([{'id': '1'}], self.manager.list())
+        method, url = self.send.call_args[0]
+        self.assertEqual(('GET', 'http://blazar.example.com/v1/leases'),
+                         (method, url))
+        self.assertEqual(5, self.send.call_args[1]['timeout'])
+
+    def test_request_error(self):
+        self._respond(404, {'error_message': 'Lease 1 not found'})
+        error = self.assertRaises(exception.BlazarClientException,
+                                  self.manager.get, '1')
+        self.assertEqual(404, error.kwargs['code'])
+        self.assertIn('Lease 1 not found', str(error))
+
 
 class BaseClientManagerTestCase(tests.TestCase):
 
@@ -182,6 +373,22 @@ class BaseClientManagerTestCase(tests.TestCase):
         self.assertIsInstance(manager.request_manager,
                               base.RequestManager)
 
+    def test_init_with_request_hooks(self):
+        hooks = [mock.Mock()]
+        manager = base.BaseClientManager(blazar_url=None,
+                                         auth_token=None,
+                                         session=self.session,
+                                         request_hooks=hooks)
+        self.assertEqual(hooks, manager.request_manager.request_hooks)
+
+    def test_init_with_cache(self):
+        response_cache = cache.ResponseCache()
+        manager = base.BaseClientManager(blazar_url=None,
+                                         auth_token=None,
+                                         session=self.session,
+                                         cache=response_cache)
+        self.assertIs(response_cache, manager.request_manager.cache)
+
     def test_init_with_insufficient_info(self):
         self.assertRaises(exception.InsufficientAuthInformation,
                           base.BaseClientManager,
@@ -0,0 +1,99 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+from unittest import mock
+
+from blazarclient import base
+from blazarclient import bulk
+from blazarclient import exception
+from blazarclient import tests
+from blazarclient import tracing
+
+
+class RunManyTestCase(tests.TestCase):
+
+    def test_results_in_order(self):
+        def square(item):
+            time.sleep(0.01 * (3 - item))
+            return item * item
+
+        results = bulk.run_many(square, [1, 2, 3], max_workers=3)
+        self.assertEqual([1, 4, 9], [result.value for result in results])
+        self.assertEqual([1, 2, 3], [result.item for result in results])
+
+    def test_failures_do_not_stop_others(self):
+        def check(item):
+            if item == 2:
+                raise exception.BlazarClientException('boom')
+            return item
+
+        results = bulk.run_many(check, [1, 2, 3])
+        self.assertEqual([1, None, 3], [result.value for result in results])
+        self.assertIsNone(results[0].error)
+        self.assertEqual('boom', str(results[1].error))
+
+    def test_bounded_parallelism(self):
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def call(item):
+            with lock:
+                running.append(item)
+                peak.append(len(running))
+            time.sleep(0.01)
+            with lock:
+                running.remove(item)
+
+        bulk.run_many(call, range(8), max_workers=2)
+        self.assertEqual(2, max(peak))
+
+    def test_propagates_deadline(self):
+        with base.deadline_scope(60) as deadline:
+            results = bulk.run_many(lambda item: base.current_deadline(),
+                                    [1, 2])
+        self.assertEqual([deadline, deadline],
+                         [result.value for result in results])
+
+    def test_deadline(self):
+        results = bulk.run_many(
+            lambda item: base.current_deadline().timeout, [1, 2],
+            deadline=30)
+        self.assertEqual([30, 30], [result.value for result in results])
+        self.assertIsNone(base.current_deadline())
+
+    def test_propagates_span(self):
+        tracing.set_tracer(tracing.Tracer(mock.Mock()))
+        self.addCleanup(tracing.set_tracer, None)
+        with tracing.span('command') as parent:
+            results = bulk.run_many(lambda item: tracing.current_span(),
+                                    [1, 2])
+        self.assertEqual([parent, parent],
+                         [result.value for result in results])
+
+    def test_empty(self):
+        self.assertEqual([], bulk.run_many(lambda item: item, []))
+
+
+class RateLimiterTestCase(tests.TestCase):
+
+    @mock.patch('time.sleep')
+    @mock.patch('time.monotonic', return_value=100.0)
+    def test_spaces_calls(self, monotonic, sleep):
+        limiter = bulk.RateLimiter(4)
+        for _i in range(3):
+            limiter.wait()
+        self.assertEqual([mock.call(0.25), mock.call(0.5)],
+                         sleep.call_args_list)
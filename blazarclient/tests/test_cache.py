@@ -0,0 +1,103 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from unittest import mock
+
+from blazarclient import base
+from blazarclient import cache
+from blazarclient import tests
+from blazarclient import utils
+
+
+class ResponseCacheTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(ResponseCacheTestCase, self).setUp()
+        self.cache = cache.ResponseCache(ttl=30, max_entries=2)
+
+    def test_get_response_returns_copy(self):
+        self.cache.put_response('/leases', 'resp', {'leases': [{'id': '1'}]})
+        _resp, body = self.cache.get_response('/leases')
+        body['leases'].append({'id': '2'})
+        self.assertEqual(('resp', {'leases': [{'id': '1'}]}),
+                         self.cache.get_response('/leases'))
+
+    @mock.patch('time.monotonic')
+    def test_entries_expire(self, monotonic):
+        monotonic.return_value = 100
+        self.cache.put_response('/leases', 'resp', {})
+        monotonic.return_value = 131
+        self.assertIsNone(self.cache.get_response('/leases'))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.cache.put_response('/a', 'resp', {})
+        self.cache.put_response('/b', 'resp', {})
+        self.cache.get_response('/a')
+        self.cache.put_response('/c', 'resp', {})
+        self.assertIsNone(self.cache.get_response('/b'))
+        self.assertIsNotNone(self.cache.get_response('/a'))
+
+    def test_get_or_build(self):
+        builder = mock.Mock(return_value={'name': ['id']})
+        self.cache.get_or_build('index', builder)
+        self.assertEqual({'name': ['id']},
+                         self.cache.get_or_build('index', builder))
+        builder.assert_called_once_with()
+
+    def test_get_or_build_racing_invalidation(self):
+        def build():
+            # NOTE: a write completing while the value is being built.
+            self.cache.invalidate()
+            return {'name': ['id']}
+        self.assertEqual({'name': ['id']},
+                         self.cache.get_or_build('index', build))
+        builder = mock.Mock(return_value={})
+        self.cache.get_or_build('index', builder)
+        builder.assert_called_once_with()
+
+    def test_get_racing_write_is_not_cached(self):
+        requests = base.RequestHooksMixin()
+        requests.cache = self.cache
+
+        def send():
+            # NOTE: a concurrent PUT completing while the GET is in flight.
+            requests._cached_request('/leases/1', 'PUT',
+                                     lambda: ('resp', {}))
+            return 'resp', {'leases': []}
+        self.assertEqual(('resp', {'leases': []}),
+                         requests._cached_request('/leases', 'GET', send))
+        self.assertIsNone(self.cache.get_response('/leases'))
+
+    def test_invalidate_and_stats(self):
+        metrics = mock.Mock()
+        self.cache.metrics = metrics
+        self.cache.put_response('/leases', 'resp', {})
+        self.cache.get_response('/leases')
+        self.cache.invalidate()
+        self.cache.get_response('/leases')
+        self.assertEqual({'entries': 0, 'ttl': 30, 'hits': 1, 'misses': 1,
+                          'hit_rate': 0.5, 'invalidations': 1},
+                         self.cache.stats())
+        metrics.record_cache.assert_called_with('responses', False)
+
+    def test_name_index_is_cached(self):
+        manager = mock.Mock()
+        manager.request_manager.cache = self.cache
+        manager.list.return_value = [{'id': '1', 'name': 'lease-1'},
+                                     {'id': '2', 'name': 'lease-2'}]
+        client = mock.Mock(lease=manager)
+        self.assertEqual('1', utils._find_resource_id_by_name(
+            client, 'lease', 'lease-1', None))
+        self.assertEqual('2', utils._find_resource_id_by_name(
+            client, 'lease', 'lease-2', None))
+        manager.list.assert_called_once_with()
@@ -0,0 +1,173 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import os
+import stat
+import sys
+import threading
+import time
+from unittest import mock
+
+import fixtures
+
+from blazarclient import daemon
+from blazarclient import daemon_client
+from blazarclient import profiling
+from blazarclient import tests
+
+
+class DaemonClientTestCase(tests.TestCase):
+
+    def test_socket_path_from_env(self):
+        self.useFixture(fixtures.EnvironmentVariable('BLAZAR_DAEMON',
+                                                     '/run/blazar.sock'))
+        self.assertEqual('/run/blazar.sock',
+                         daemon_client.socket_path_from_env())
+
+    def test_socket_path_from_env_default(self):
+        self.useFixture(fixtures.EnvironmentVariable('BLAZAR_DAEMON', '1'))
+        self.assertEqual(daemon_client.default_socket_path(),
+                         daemon_client.socket_path_from_env())
+
+    def test_socket_path_from_env_unset(self):
+        self.useFixture(fixtures.EnvironmentVariable('BLAZAR_DAEMON'))
+        self.assertIsNone(daemon_client.socket_path_from_env())
+
+    def test_forward_without_daemon(self):
+        self.assertIsNone(daemon_client.forward('/nonexistent/sock', ['x']))
+
+    @mock.patch('blazarclient.shell.main', return_value=3)
+    def test_main_falls_back_to_local_shell(self, shell_main):
+        self.useFixture(fixtures.EnvironmentVariable('BLAZAR_DAEMON',
+                                                     '/nonexistent/sock'))
+        self.assertEqual(3, daemon_client.main(['lease-list']))
+        shell_main.assert_called_once_with(['lease-list'])
+
+    @mock.patch('blazarclient.daemon_client.forward')
+    @mock.patch('blazarclient.shell.main', return_value=0)
+    def test_main_runs_stdin_commands_locally(self, shell_main, forward):
+        self.useFixture(fixtures.EnvironmentVariable('BLAZAR_DAEMON',
+                                                     '/nonexistent/sock'))
+        self.assertEqual(0, daemon_client.main(['batch', '-']))
+        forward.assert_not_called()
+        shell_main.assert_called_once_with(['batch', '-'])
+
+
+class DaemonTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(DaemonTestCase, self).setUp()
+        directory = self.useFixture(fixtures.TempDir()).path
+        self.path = os.path.join(directory, 'run', 'daemon.sock')
+        self.daemon = daemon.Daemon(self.path, idle_timeout=5)
+        self.thread = threading.Thread(target=self.daemon.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        for _ in range(100):
+            if os.path.exists(self.path):
+                break
+            time.sleep(0.01)
+
+    def test_socket_permissions(self):
+        self.assertEqual(0o600, stat.S_IMODE(os.stat(self.path).st_mode))
+        self.assertEqual(0o700, stat.S_IMODE(
+            os.stat(os.path.dirname(self.path)).st_mode))
+
+    @mock.patch.object(daemon.WarmShell, 'run')
+    def test_forward(self, run):
+        def fake_run(argv):
+            print('stdout of %s' % argv[0])
+            self.assertEqual('on', os.environ.get('BLAZAR_TEST_VAR'))
+            return 2
+        run.side_effect = fake_run
+        self.useFixture(fixtures.EnvironmentVariable('BLAZAR_TEST_VAR', 'on'))
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        code = daemon_client.forward(self.path, ['lease-list'],
+                                     stdout=stdout, stderr=stderr)
+        self.assertEqual(2, code)
+        self.assertEqual('stdout of lease-list\n', stdout.getvalue())
+
+    @mock.patch.object(daemon.Daemon, 'run_command', return_value=0)
+    def test_forward_only_sends_shell_variables(self, run_command):
+        self.useFixture(fixtures.EnvironmentVariable('OS_TEST_VAR', 'on'))
+        self.useFixture(fixtures.EnvironmentVariable('SECRET_TEST_VAR', 'x'))
+        self.assertEqual(0, daemon_client.forward(
+            self.path, ['lease-list'], stdout=io.StringIO(),
+            stderr=io.StringIO()))
+        env = run_command.call_args[0][1]
+        self.assertEqual('on', env['OS_TEST_VAR'])
+        self.assertNotIn('SECRET_TEST_VAR', env)
+
+    @mock.patch.object(daemon.WarmShell, 'run')
+    def test_forward_to_shared_socket(self, run):
+        os.chmod(os.path.dirname(self.path), 0o755)
+        self.assertIsNone(daemon_client.forward(self.path, ['lease-list']))
+        run.assert_not_called()
+
+    @mock.patch.object(daemon.WarmShell, 'run')
+    @mock.patch.object(daemon_client, 'peer_uid',
+                       return_value=os.getuid() + 1)
+    def test_forward_to_other_user(self, peer_uid, run):
+        self.assertIsNone(daemon_client.forward(self.path, ['lease-list']))
+        run.assert_not_called()
+
+    @mock.patch.object(daemon.WarmShell, 'run')
+    def test_forward_gives_empty_stdin(self, run):
+        run.side_effect = lambda argv: print(repr(sys.stdin.read()))
+        stdout = io.StringIO()
+        daemon_client.forward(self.path, ['lease-list'], stdout=stdout,
+                              stderr=io.StringIO())
+        self.assertEqual("''\n", stdout.getvalue())
+
+    def test_forward_version(self):
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        code = daemon_client.forward(self.path, ['--version'],
+                                     stdout=stdout, stderr=stderr)
+        self.assertEqual(0, code)
+        self.assertTrue(stdout.getvalue() or stderr.getvalue())
+
+
+class WarmShellTestCase(tests.TestCase):
+
+    @mock.patch('blazarclient.shell.BlazarShell.authenticate_user')
+    def test_authenticate_user_reuses_client(self, authenticate_user):
+        clients = {}
+        key = ('cache-id', '1', False, ())
+
+        def authenticate(shell_self):
+            shell_self.client = mock.sentinel.client
+        authenticate_user.side_effect = lambda: authenticate(first)
+
+        first = daemon.WarmShell(clients)
+        with mock.patch.object(first, '_client_key', return_value=key):
+            first.authenticate_user()
+        second = daemon.WarmShell(clients)
+        with mock.patch.object(second, '_client_key', return_value=key):
+            second.authenticate_user()
+        self.assertEqual(1, authenticate_user.call_count)
+        self.assertIs(mock.sentinel.client, second.client)
+
+    @mock.patch.object(profiling.Profiler, 'profile')
+    @mock.patch.object(daemon.WarmShell, 'run', return_value=0)
+    def test_run_command_profiles_after_global_options(self, run, profile):
+        stderr = io.StringIO()
+        code = daemon.Daemon('/nonexistent/sock').run_command(
+            ['--os-region-name', 'x', '--profile', 'lease-list'], {}, None,
+            io.StringIO(), stderr)
+        self.assertEqual(0, code)
+        profile.assert_called_once_with()
+        run.assert_called_once_with(
+            ['--os-region-name', 'x', '--profile', 'lease-list'])
@@ -0,0 +1,68 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+
+from blazarclient import dates
+from blazarclient import tests
+from blazarclient import utils
+
+
+class DatesTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(DatesTestCase, self).setUp()
+        dates.clear_cache()
+
+    def test_parse_api(self):
+        self.assertEqual(datetime.datetime(2030, 6, 8, 10, 5),
+                         dates.parse_api('2030-06-08 10:05'))
+
+    def test_parse_api_matches_strptime(self):
+        # NOTE: strptime also accepts fields without their leading zeros.
+        for value in ('2030-06-08 10:05', '2030-6-8 1:05'):
+            self.assertEqual(
+                datetime.datetime.strptime(value, utils.API_DATE_FORMAT),
+                dates.parse_api(value))
+
+    def test_parse_api_invalid(self):
+        for value in ('2030-06-08', '2030-13-08 10:00', '2030-06-08T10:00'):
+            self.assertRaises(ValueError, dates.parse_api, value)
+
+    def test_parse_lease(self):
+        self.assertEqual(datetime.datetime(2030, 6, 8, 10, 5, 3, 42),
+                         dates.parse_lease('2030-06-08T10:05:03.000042'))
+        self.assertRaises(ValueError, dates.parse_lease, '2030-06-08 10:05')
+
+    def test_parse(self):
+        expected = datetime.datetime(2030, 6, 8, 10, 0)
+        for value in ('2030-06-08T10:00:00.000000', '2030-06-08 10:00',
+                      '2030-06-08T10:00:00', '2030-06-08T12:00:00+02:00',
+                      datetime.datetime(2030, 6, 8, 10, 0)):
+            self.assertEqual(expected, dates.parse(value))
+
+    def test_parse_is_memoized(self):
+        dates.parse('2030-06-08 10:00')
+        dates.parse('2030-06-08 10:00')
+        self.assertEqual(1, dates._parse_string.cache_info().hits)
+
+    def test_format_api(self):
+        self.assertEqual('2030-06-08 01:05', dates.format_api(
+            datetime.datetime(2030, 6, 8, 1, 5, 59)))
+
+    def test_column(self):
+        self.assertEqual(
+            [datetime.datetime(2030, 6, 8, 10, 0),
+             datetime.datetime(2030, 6, 9, 10, 0)],
+            dates.column([{'end_date': '2030-06-08T10:00:00.000000'},
+                          {'end_date': '2030-06-09 10:00'}], 'end_date'))
@@ -0,0 +1,74 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from blazarclient import exception
+from blazarclient import expressions
+from blazarclient import tests
+
+HOST = {'id': '1', 'vcpus': '8', 'gpu': 'yes', 'cpu_ratio': 1.5}
+
+
+class CompileExpressionTestCase(tests.TestCase):
+
+    def assertMatches(self, expected, expression, resource=HOST):
+        predicate = expressions.compile_expression(expression)
+        self.assertEqual(expected, predicate(resource))
+
+    def test_empty(self):
+        self.assertMatches(True, '')
+        self.assertMatches(True, [])
+
+    def test_comparisons(self):
+        self.assertMatches(True, '["=", "$gpu", "yes"]')
+        self.assertMatches(False, '["==", "$gpu", "no"]')
+        self.assertMatches(True, '["!=", "$gpu", "no"]')
+        self.assertMatches(True, '[">=", "$vcpus", "8"]')
+        self.assertMatches(False, '["<", "$vcpus", 8]')
+        self.assertMatches(True, '[">", 10, "$vcpus"]')
+        self.assertMatches(True, '["<=", "$cpu_ratio", "$vcpus"]')
+
+    def test_numbers_compared_as_numbers(self):
+        self.assertMatches(True, '[">", "$vcpus", "16"]', {'vcpus': '32'})
+        self.assertMatches(True, '["=", "$vcpus", "8.0"]')
+
+    def test_missing_property(self):
+        self.assertMatches(False, '["=", "$node_type", "gpu"]')
+        self.assertMatches(True, '["not", ["=", "$node_type", "gpu"]]')
+
+    def test_logical(self):
+        self.assertMatches(True, ['and', ['>', '$vcpus', '4'],
+                                  ['=', '$gpu', 'yes']])
+        self.assertMatches(False, ['and', ['>', '$vcpus', '4'],
+                                   ['=', '$gpu', 'yes'],
+                                   ['=', '$id', '2']])
+        self.assertMatches(True, ['or', ['<', '$vcpus', '4'],
+                                  ['=', '$gpu', 'yes']])
+        self.assertMatches(False, ['or', ['<', '$vcpus', '4']])
+
+    def test_in(self):
+        self.assertMatches(True, ['in', '$gpu', 'y', 'yes'])
+        self.assertMatches(True, ['in', '$vcpus', 4, 8])
+        self.assertMatches(False, ['in', '$gpu', 'no'])
+
+    def test_filter_resources(self):
+        hosts = [{'id': '1', 'node_type': 'gpu'},
+                 {'id': '2', 'node_type': 'compute'}]
+        self.assertEqual([hosts[1]], expressions.filter_resources(
+            hosts, '["=", "$node_type", "compute"]'))
+
+    def test_invalid(self):
+        for expression in ('["=", "$gpu"', '"gpu"', '["~", "$gpu", 1]',
+                           '["=", "$gpu"]', '["not"]',
+                           '["and", ["=", "$gpu", "yes"], "no"]'):
+            self.assertRaises(exception.InvalidExpression,
+                              expressions.compile_expression, expression)
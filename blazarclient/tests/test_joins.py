@@ -0,0 +1,104 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from unittest import mock
+
+from blazarclient import base
+from blazarclient import joins
+from blazarclient import tests
+from blazarclient import tracing
+
+LEASES = [{'id': 'lease-1', 'name': 'first'},
+          {'id': 'lease-2', 'name': 'second'}]
+ALLOCATIONS = [
+    {'resource_id': 2, 'reservations': [
+        {'id': 'r1', 'lease_id': 'lease-1'}]},
+    {'resource_id': 1, 'reservations': [
+        {'id': 'r1', 'lease_id': 'lease-1'},
+        {'id': 'r3', 'lease_id': 'lease-3'}]},
+]
+HOSTS = [
+    {'id': '1', 'hypervisor_hostname': 'node-1', 'node_type': 'gpu'},
+    {'id': '2', 'hypervisor_hostname': 'node-2', 'node_type': 'compute'},
+]
+
+
+class JoinsTestCase(tests.TestCase):
+
+    def test_fetch_concurrently(self):
+        results = joins.fetch_concurrently({'a': lambda: 1, 'b': lambda: 2})
+        self.assertEqual({'a': 1, 'b': 2}, results)
+
+    def test_fetch_concurrently_propagates_deadline(self):
+        with base.deadline_scope(60) as deadline:
+            results = joins.fetch_concurrently(
+                {'deadline': base.current_deadline})
+        self.assertIs(deadline, results['deadline'])
+
+    def test_fetch_concurrently_propagates_span(self):
+        tracing.set_tracer(tracing.Tracer(mock.Mock()))
+        self.addCleanup(tracing.set_tracer, None)
+
+        def fetch():
+            with tracing.span('HTTP GET') as span:
+                return span
+        with tracing.span('command') as parent:
+            results = joins.fetch_concurrently({'a': fetch, 'b': fetch})
+        for span in results.values():
+            self.assertEqual((parent.trace_id, parent.span_id),
+                             (span.trace_id, span.parent_id))
+
+    def test_join_lease_resources(self):
+        joined = joins.join_lease_resources(LEASES, ALLOCATIONS, HOSTS)
+
+        self.assertEqual([
+            {'reservation_id': 'r1', 'resource_type': 'host',
+             'resource_id': 1, 'hypervisor_hostname': 'node-1',
+             'node_type': 'gpu'},
+            {'reservation_id': 'r1', 'resource_type': 'host',
+             'resource_id': 2, 'hypervisor_hostname': 'node-2',
+             'node_type': 'compute'},
+        ], joined[0]['resources'])
+        self.assertEqual([], joined[1]['resources'])
+        self.assertNotIn('resources', LEASES[0])
+
+    def test_leases_with_resources(self):
+        client = mock.Mock()
+        client.lease.get.return_value = LEASES[0]
+        client.host.list_allocations.return_value = ALLOCATIONS
+        client.host.list.return_value = HOSTS
+
+        joined = joins.leases_with_resources(client, 'lease-1')
+
+        self.assertEqual(1, len(joined))
+        self.assertEqual(['node-1', 'node-2'],
+                         [r['hypervisor_hostname']
+                          for r in joined[0]['resources']])
+        client.lease.get.assert_called_once_with('lease-1')
+        client.lease.list.assert_not_called()
+        client.host.get.assert_not_called()
+
+    def test_leases_with_resources_deadline(self):
+        client = mock.Mock()
+        timeouts = []
+
+        def list_allocations():
+            timeouts.append(base.current_deadline().timeout)
+            return ALLOCATIONS
+        client.lease.list.return_value = LEASES
+        client.host.list_allocations.side_effect = list_allocations
+        client.host.list.return_value = HOSTS
+
+        joins.leases_with_resources(client, deadline=30)
+
+        self.assertEqual([30], timeouts)
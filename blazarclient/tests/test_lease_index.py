@@ -0,0 +1,79 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+
+from blazarclient import lease_index
+from blazarclient import tests
+
+LEASES = [
+    {'id': 'a', 'start_date': '2030-01-01T00:00:00.000000',
+     'end_date': '2030-01-05T00:00:00.000000'},
+    {'id': 'b', 'start_date': '2030-01-03T00:00:00.000000',
+     'end_date': '2030-01-04T00:00:00.000000'},
+    {'id': 'c', 'start_date': '2030-01-04T00:00:00.000000',
+     'end_date': '2030-01-10T00:00:00.000000'},
+    {'id': 'd', 'start_date': '2029-12-01T00:00:00.000000',
+     'end_date': '2029-12-02T00:00:00.000000'},
+]
+
+
+def _ids(leases):
+    return [lease['id'] for lease in leases]
+
+
+class LeaseDateIndexTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(LeaseDateIndexTestCase, self).setUp()
+        self.index = lease_index.LeaseDateIndex(LEASES)
+
+    def test_active_at(self):
+        self.assertEqual(['a', 'b'],
+                         _ids(self.index.active_at('2030-01-03 12:00')))
+        # NOTE: end dates are excluded and start dates included.
+        self.assertEqual(['a', 'c'],
+                         _ids(self.index.active_at('2030-01-04 00:00')))
+        self.assertEqual([], _ids(self.index.active_at('2031-01-01 00:00')))
+
+    def test_overlapping(self):
+        self.assertEqual(['a', 'b', 'c'], _ids(self.index.overlapping(
+            '2030-01-03 12:00', '2030-01-06 00:00')))
+        self.assertEqual(['d'], _ids(self.index.overlapping(
+            '2029-01-01 00:00', '2030-01-01 00:00')))
+
+    def test_ending_within(self):
+        self.assertEqual(['b'], _ids(self.index.ending_within(
+            datetime.datetime(2030, 1, 3), datetime.timedelta(days=2))))
+        self.assertEqual([], _ids(self.index.ending_within(
+            datetime.datetime(2030, 1, 3), datetime.timedelta(hours=1))))
+
+    def test_matches_linear_scan(self):
+        dates = ['2029-12-01 12:00', '2030-01-01 00:00', '2030-01-04 00:00',
+                 '2030-01-09 23:59', '2030-01-10 00:00']
+        for start in dates:
+            for end in dates:
+                if start >= end:
+                    continue
+                expected = [
+                    lease['id'] for lease in LEASES
+                    if lease['start_date'].replace('T', ' ')[:16] < end and
+                    lease['end_date'].replace('T', ' ')[:16] > start]
+                self.assertEqual(expected, _ids(
+                    self.index.overlapping(start, end)))
+        for date in dates:
+            expected = [
+                lease['id'] for lease in LEASES
+                if lease['start_date'].replace('T', ' ')[:16] <= date <
+                lease['end_date'].replace('T', ' ')[:16]]
+            self.assertEqual(expected, _ids(self.index.active_at(date)))
@@ -0,0 +1,87 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from blazarclient import base
+from blazarclient import metrics
+from blazarclient import tests
+
+
+def _record(method='GET', template='/leases', status=200, elapsed=0.1):
+    return base.RequestRecord(method, template, template, status, 10,
+                              elapsed)
+
+
+class LatencyHistogramTestCase(tests.TestCase):
+
+    def test_percentiles(self):
+        hist = metrics.LatencyHistogram()
+        for i in range(1, 101):
+            hist.record(i / 1000.0)
+        self.assertEqual(100, hist.count)
+        self.assertAlmostEqual(0.05, hist.percentile(50), delta=0.001)
+        self.assertAlmostEqual(0.099, hist.percentile(99), delta=0.001)
+        self.assertEqual(0.1, hist.percentile(100))
+        self.assertEqual(0.001, hist.min)
+
+    def test_empty(self):
+        self.assertIsNone(metrics.LatencyHistogram().percentile(50))
+
+    def test_cumulative_counts(self):
+        hist = metrics.LatencyHistogram()
+        for value in (0.002, 0.02, 0.2, 2.0):
+            hist.record(value)
+        self.assertEqual([1, 2, 3, 4],
+                         hist.cumulative_counts((0.005, 0.05, 0.5, 5.0)))
+
+
+class MetricsRegistryTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(MetricsRegistryTestCase, self).setUp()
+        self.registry = metrics.MetricsRegistry()
+        self.registry(_record(elapsed=0.1))
+        self.registry(_record(elapsed=0.3))
+        self.registry(_record('PUT', '/leases/{id}', 409, 0.2))
+        self.registry.record_cache('lease-list', True)
+        self.registry.record_cache('lease-list', False)
+        self.registry.record_cache('lease-list', True)
+
+    def test_snapshot(self):
+        snapshot = self.registry.snapshot()
+        get, put = snapshot['requests']
+        self.assertEqual(('GET', '/leases', 2, {}),
+                         (get['method'], get['endpoint'], get['count'],
+                          get['errors']))
+        self.assertEqual({'409': 1}, put['errors'])
+        cache = snapshot['caches']['lease-list']
+        self.assertEqual((2, 1), (cache['hits'], cache['misses']))
+        self.assertAlmostEqual(2 / 3.0, cache['hit_rate'])
+
+    def test_to_prometheus(self):
+        text = self.registry.to_prometheus()
+        self.assertIn('# TYPE blazarclient_request_duration_seconds '
+                      'histogram', text)
+        self.assertIn('blazarclient_request_duration_seconds_count'
+                      '{endpoint="/leases",method="GET"} 2', text)
+        self.assertIn('blazarclient_request_duration_seconds_bucket'
+                      '{endpoint="/leases",method="GET",le="+Inf"} 2', text)
+        self.assertIn('blazarclient_request_errors_total'
+                      '{endpoint="/leases/{id}",method="PUT",status="409"} 1',
+                      text)
+        self.assertIn('blazarclient_cache_hits_total{cache="lease-list"} 2',
+                      text)
+
+    def test_reset(self):
+        self.registry.reset()
+        self.assertEqual({'requests': [], 'caches': {}},
+                         self.registry.snapshot())
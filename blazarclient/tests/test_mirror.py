@@ -0,0 +1,106 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import os
+import stat
+from unittest import mock
+
+import fixtures
+
+from blazarclient import exception
+from blazarclient import mirror
+from blazarclient import shell
+from blazarclient import tests
+from blazarclient.v1.shell_commands import leases
+
+
+class MirrorTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(MirrorTestCase, self).setUp()
+        self.path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 'mirror', 'mirror.sqlite')
+        self.mirror = mirror.Mirror(self.path)
+        self.addCleanup(self.mirror.close)
+        self.client = mock.Mock()
+        self.client.lease.list.return_value = [
+            {'id': '1', 'name': 'b', 'updated_at': '2024-01-01T00:00:00'},
+            {'id': '2', 'name': 'a', 'updated_at': None,
+             'created_at': '2024-01-01T00:00:00'},
+        ]
+        self.client.host.list_allocations.return_value = [
+            {'resource_id': 1, 'reservations': []},
+        ]
+
+    def test_sync_and_list(self):
+        results = self.mirror.sync(self.client, ['leases'])
+        self.assertEqual({'added': 2, 'updated': 0, 'deleted': 0,
+                          'unchanged': 0}, results['leases'])
+        self.assertEqual(['a', 'b'], [lease['name'] for lease in
+                                      self.mirror.list('leases', 'name')])
+        self.assertEqual(0o600, stat.S_IMODE(os.stat(self.path).st_mode))
+
+    def test_incremental_sync(self):
+        self.mirror.sync(self.client, ['leases', 'host_allocations'])
+        self.client.lease.list.return_value = [
+            {'id': '1', 'name': 'c', 'updated_at': '2024-02-01T00:00:00'},
+            {'id': '3', 'name': 'd', 'updated_at': None},
+        ]
+        self.client.host.list_allocations.return_value = [
+            {'resource_id': 1, 'reservations': [{'id': 'r1'}]},
+        ]
+        results = self.mirror.sync(self.client,
+                                   ['leases', 'host_allocations'])
+        self.assertEqual({'added': 1, 'updated': 1, 'deleted': 1,
+                          'unchanged': 0}, results['leases'])
+        self.assertEqual({'added': 0, 'updated': 1, 'deleted': 0,
+                          'unchanged': 0}, results['host_allocations'])
+        self.assertEqual([[{'id': 'r1'}]], [
+            a['reservations']
+            for a in self.mirror.list('host_allocations')])
+
+    def test_unchanged_items_are_not_rewritten(self):
+        self.mirror.sync(self.client, ['leases'])
+        results = self.mirror.sync(self.client, ['leases'])
+        self.assertEqual(2, results['leases']['unchanged'])
+
+    def test_change_without_new_timestamp(self):
+        self.mirror.sync(self.client, ['leases'])
+        self.client.lease.list.return_value[0] = dict(
+            self.client.lease.list.return_value[0], name='c')
+        results = self.mirror.sync(self.client, ['leases'])
+        self.assertEqual({'added': 0, 'updated': 1, 'deleted': 0,
+                          'unchanged': 1}, results['leases'])
+        self.assertIn('c', [lease['name']
+                            for lease in self.mirror.list('leases')])
+
+    def test_list_before_sync(self):
+        self.assertRaises(exception.BlazarClientException,
+                          self.mirror.list, 'hosts')
+
+    def test_unknown_collection(self):
+        self.assertRaises(exception.BlazarClientException,
+                          self.mirror.sync, self.client, ['events'])
+
+    def test_list_leases_from_mirror(self):
+        self.mirror.sync(self.client, ['leases'])
+        self.useFixture(fixtures.EnvironmentVariable('BLAZAR_MIRROR',
+                                                     self.path))
+        blazar_shell = shell.BlazarShell()
+        blazar_shell.client = mock.Mock()
+        list_leases = leases.ListLeases(blazar_shell, mock.Mock())
+        args = argparse.Namespace(sort_by='name', from_mirror=True)
+        data = list_leases.retrieve_list(args)
+        self.assertEqual(['2', '1'], [lease['id'] for lease in data])
+        blazar_shell.client.lease.list.assert_not_called()
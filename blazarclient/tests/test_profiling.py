@@ -0,0 +1,92 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import io
+import os
+import pstats
+import tempfile
+
+from blazarclient import profiling
+from blazarclient import tests
+
+
+class ProfilingTestCase(tests.TestCase):
+
+    def test_parse_args_bare_profile(self):
+        options = profiling.parse_args(['--profile', 'lease-list'],
+                                       commands=['lease-list'])
+        self.assertEqual(profiling.DEFAULT_PROFILE_PATH, options.profile)
+        self.assertEqual('run', options.profile_scope)
+        options = profiling.parse_args(['--profile'])
+        self.assertEqual(profiling.DEFAULT_PROFILE_PATH, options.profile)
+
+    def test_parse_args_profile_path(self):
+        argv = ['--profile', '/tmp/x.pstats', 'lease-list']
+        self.assertEqual(argv, profiling.normalize_argv(
+            argv, commands=['lease-list']))
+        options = profiling.parse_args(argv, commands=['lease-list'])
+        self.assertEqual('/tmp/x.pstats', options.profile)
+
+    def test_parse_args_with_path(self):
+        options = profiling.parse_args(['--profile=out.pstats',
+                                        '--profile-scope', 'command',
+                                        '--profile-top', '5', 'lease-list'])
+        self.assertEqual(('out.pstats', 'command', 5),
+                         (options.profile, options.profile_scope,
+                          options.profile_top))
+
+    def test_normalize_argv_global_option_only(self):
+        parser = argparse.ArgumentParser(add_help=False)
+        profiling.add_arguments(parser)
+        parser.add_argument('--os-project-name')
+        parser.add_argument('--debug', action='store_true')
+        self.assertEqual(
+            ['--debug', '--profile=%s' % profiling.DEFAULT_PROFILE_PATH,
+             'lease-show', '--profile', 'lease-1'],
+            profiling.normalize_argv(['--debug', '--profile', 'lease-show',
+                                      '--profile', 'lease-1'], parser,
+                                     ['lease-show']))
+        self.assertEqual(
+            ['--os-project-name', '--profile', 'lease-list'],
+            profiling.normalize_argv(['--os-project-name', '--profile',
+                                      'lease-list'], parser, ['lease-list']))
+
+    def test_parse_args_ignores_command_arguments(self):
+        parser = argparse.ArgumentParser(add_help=False)
+        profiling.add_arguments(parser)
+        parser.add_argument('--os-project-name')
+        self.assertIsNone(profiling.parse_args(
+            ['--os-project-name', 'p1', 'lease-show', '--profile=x'],
+            parser).profile)
+
+    def test_from_options(self):
+        options = profiling.parse_args(['--profile=out.pstats'])
+        self.assertIsNone(profiling.Profiler.from_options(options,
+                                                          'command'))
+        profiler = profiling.Profiler.from_options(options, 'run')
+        self.assertEqual('out.pstats', profiler.path)
+        self.assertIsNone(profiling.Profiler.from_options(
+            profiling.parse_args([]), 'run'))
+
+    def test_profile(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        stream = io.StringIO()
+        profiler = profiling.Profiler(path, top=3, stream=stream)
+        with profiler.profile():
+            sorted(range(1000), reverse=True)
+        self.assertIn('cumulative', stream.getvalue())
+        self.assertIn('Profile saved to %s' % path, stream.getvalue())
+        self.assertTrue(pstats.Stats(path).total_calls)
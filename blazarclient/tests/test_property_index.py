@@ -0,0 +1,113 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from unittest import mock
+
+from blazarclient import exception
+from blazarclient import property_index
+from blazarclient import tests
+from blazarclient.v1 import hosts
+
+PROPERTIES = [
+    {'property': 'node_type', 'private': False,
+     'values': ['compute', 'gpu']},
+    {'property': 'gpu_model', 'private': False, 'values': ['A100', 'V100']},
+]
+HOSTS = [
+    {'id': '1', 'node_type': 'gpu', 'gpu_model': 'A100'},
+    {'id': '2', 'node_type': 'gpu', 'gpu_model': 'V100'},
+    {'id': '3', 'node_type': 'compute'},
+]
+
+
+class PropertyIndexTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(PropertyIndexTestCase, self).setUp()
+        self.loader = mock.Mock(return_value=HOSTS)
+        self.index = property_index.PropertyIndex(
+            PROPERTIES, resource_loader=self.loader)
+
+    def test_get_property(self):
+        self.assertEqual({'property': 'node_type', 'private': False,
+                          'property_values': ['compute', 'gpu']},
+                         self.index.get_property('node_type'))
+        self.assertIsNone(self.index.get_property('unknown'))
+        self.loader.assert_not_called()
+
+    def test_resources_with(self):
+        self.assertEqual({'1', '2'},
+                         self.index.resources_with('node_type', 'gpu'))
+        self.assertEqual(set(), self.index.resources_with('node_type', 'x'))
+        self.assertEqual(['A100', 'V100'], self.index.values_of('gpu_model'))
+        self.loader.assert_called_once_with()
+
+    def test_match(self):
+        self.assertEqual({'2'}, self.index.match(node_type='gpu',
+                                                 gpu_model='V100'))
+        self.assertEqual(set(), self.index.match(node_type='compute',
+                                                 gpu_model='V100'))
+
+
+class PropertyIndexMixinTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(PropertyIndexMixinTestCase, self).setUp()
+        self.manager = hosts.ComputeHostClientManager(
+            blazar_url=None, auth_token=None, session=mock.MagicMock())
+        self.get = self.patch(self.manager.request_manager, 'get')
+        self.get.side_effect = lambda url: (None, {'resource_properties': [
+            dict(p) for p in PROPERTIES]})
+        self.patch(self.manager.request_manager, 'patch').return_value = (
+            None, {'resource_property': {}})
+
+    def patch(self, obj, attribute):
+        patcher = mock.patch.object(obj, attribute)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def test_get_property_uses_index(self):
+        self.assertEqual('node_type',
+                         self.manager.get_property('node_type')['property'])
+        self.manager.get_property('gpu_model')
+        self.assertEqual(1, self.get.call_count)
+        self.assertRaises(exception.ResourcePropertyNotFound,
+                          self.manager.get_property, 'unknown')
+
+    def test_set_property_invalidates_index(self):
+        self.manager.get_property('node_type')
+        self.manager.set_property('node_type', True)
+        self.manager.get_property('node_type')
+        self.assertEqual(2, self.get.call_count)
+
+    def test_resource_changes_invalidate_index(self):
+        for method in ('post', 'put', 'delete'):
+            self.patch(self.manager.request_manager, method).return_value = (
+                None, {'host': {}, 'allocation': {}})
+        changes = [lambda: self.manager.create('host-1'),
+                   lambda: self.manager.update('1', {'gpu_model': 'A100'}),
+                   lambda: self.manager.reallocate('1', {'lease_id': '2'}),
+                   lambda: self.manager.delete('1')]
+        self.manager.get_property('node_type')
+        for count, change in enumerate(changes, 2):
+            change()
+            self.manager.get_property('node_type')
+            self.assertEqual(count, self.get.call_count)
+
+    @mock.patch('time.monotonic')
+    def test_index_expires(self, monotonic):
+        monotonic.return_value = 100
+        self.manager.get_property('node_type')
+        monotonic.return_value = 100 + self.manager.property_index_ttl
+        self.manager.get_property('node_type')
+        self.assertEqual(2, self.get.call_count)
@@ -0,0 +1,117 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from unittest import mock
+
+from blazarclient import query
+from blazarclient import tests
+from blazarclient.v1 import allocations
+
+LEASES = [
+    {'id': '1', 'status': 'ACTIVE', 'project_id': 'p1',
+     'end_date': '2030-01-03'},
+    {'id': '2', 'status': 'PENDING', 'project_id': 'p1',
+     'end_date': '2030-01-01'},
+    {'id': '3', 'status': 'ACTIVE', 'project_id': 'p2',
+     'end_date': '2030-01-02'},
+    {'id': '4', 'status': 'ACTIVE', 'project_id': 'p1',
+     'end_date': '2030-01-01'},
+]
+
+
+class QueryTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(QueryTestCase, self).setUp()
+        self.manager = mock.Mock(query_filters=('project_id',))
+        self.manager.list.side_effect = lambda **params: iter(LEASES)
+
+    def ids(self, q):
+        return [lease['id'] for lease in q]
+
+    def test_where_local(self):
+        q = query.Query(self.manager).where(status='ACTIVE')
+        self.assertEqual(['1', '3', '4'], self.ids(q))
+        self.manager.list.assert_called_once_with()
+
+    def test_where_pushdown(self):
+        q = query.Query(self.manager).where(project_id='p1', status='ACTIVE')
+        # NOTE: the mock ignores the filter, which is applied again locally.
+        self.assertEqual(['1', '4'], self.ids(q))
+        self.manager.list.assert_called_once_with(project_id='p1')
+
+    def test_where_predicate_and_expression(self):
+        q = query.Query(self.manager).where(
+            lambda lease: lease['id'] != '1',
+            '["==", "$status", "ACTIVE"]')
+        self.assertEqual(['3', '4'], self.ids(q))
+
+    def test_params(self):
+        q = query.Query(self.manager, {'resource': 'os-hosts'}).where(
+            project_id='p1')
+        self.assertEqual(['1', '2', '4'], self.ids(q))
+        self.manager.list.assert_called_once_with(resource='os-hosts',
+                                                  project_id='p1')
+
+    def test_allocation_query(self):
+        manager = allocations.AllocationClientManager(
+            blazar_url=None, auth_token=None, session=mock.Mock())
+        request_manager = self.patch(manager, 'request_manager')
+        request_manager.get.return_value = (
+            None, {'allocations': [{'resource_id': 1}, {'resource_id': 2}]})
+        q = manager.query('os-hosts').where(resource_id=2)
+        self.assertEqual({'resource_id': 2}, q.first())
+        request_manager.get.assert_called_once_with('/os-hosts/allocations')
+
+    def test_order_by(self):
+        q = query.Query(self.manager).order_by('end_date', '-id')
+        self.assertEqual(['4', '2', '3', '1'], self.ids(q))
+
+    def test_order_by_with_limit(self):
+        q = query.Query(self.manager).order_by('-end_date').limit(2)
+        self.assertEqual(['1', '3'], self.ids(q))
+
+    def test_order_by_missing_field(self):
+        leases = [{'id': '1', 'end_date': '2030-01-02'},
+                  {'id': '2'},
+                  {'id': '3', 'end_date': None},
+                  {'id': '4', 'end_date': '2030-01-01'}]
+        self.manager.list.side_effect = lambda **params: iter(leases)
+        q = query.Query(self.manager)
+        self.assertEqual(['4', '1', '2', '3'],
+                         self.ids(q.order_by('end_date')))
+        self.assertEqual(['1', '4', '3', '2'],
+                         self.ids(q.order_by('-end_date', '-id')))
+        self.assertEqual(['4', '1'],
+                         self.ids(q.order_by('end_date').limit(2)))
+
+    def test_limit_short_circuits(self):
+        seen = []
+
+        def predicate(lease):
+            seen.append(lease['id'])
+            return lease['status'] == 'ACTIVE'
+
+        q = query.Query(self.manager).where(predicate).limit(1)
+        self.assertEqual(['1'], self.ids(q))
+        self.assertEqual(['1'], seen)
+
+    def test_builder_is_immutable(self):
+        q = query.Query(self.manager)
+        q.where(status='PENDING').limit(1)
+        self.assertEqual(4, q.count())
+
+    def test_first(self):
+        q = query.Query(self.manager)
+        self.assertEqual('2', q.where(status='PENDING').first()['id'])
+        self.assertIsNone(q.where(status='DELETED').first())
@@ -69,6 +69,17 @@ class BlazarShellTestCase(tests.TestCase):
             sys.stderr = orig_stderr
         return (stdout, stderr)
 
+    def test_get_parser_of_every_command(self):
+        for name, command_class in shell.COMMANDS_V1.items():
+            command = command_class(self.blazar_shell, None)
+            parser = command.get_parser(name)
+            self.assertIsNotNone(parser, name)
+
+    def test_command_names(self):
+        names = self.blazar_shell.command_names()
+        self.assertIn('lease-list', names)
+        self.assertIn('help', names)
+
     def test_help_unknown_command(self):
         self.assertRaises(ValueError, self.shell, 'bash-completion')
 
@@ -0,0 +1,75 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+import fixtures
+
+from blazarclient import exception
+from blazarclient import snapshot
+from blazarclient import tests
+
+ALLOCATIONS = [
+    {'resource_id': 1, 'hypervisor_hostname': 'compute-1',
+     'reservations': [{'id': 'r1', 'lease_id': 'l1',
+                       'start_date': '2024-01-01T00:00:00.000000',
+                       'end_date': '2024-01-02T00:00:00.000000'}]},
+    {'resource_id': 2, 'hypervisor_hostname': None, 'reservations': [],
+     'cpu_ratio': 1.5, 'enabled': False},
+    {'resource_id': 2 ** 64, 'hypervisor_hostname': u'cömpute-3'},
+]
+
+
+class SnapshotTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(SnapshotTestCase, self).setUp()
+        self.path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 'allocations.snap')
+        snapshot.write(self.path, ALLOCATIONS)
+        self.snapshot = snapshot.Snapshot(self.path)
+        self.addCleanup(self.snapshot.close)
+
+    def test_rows(self):
+        self.assertEqual(3, len(self.snapshot))
+        self.assertEqual(ALLOCATIONS, [dict(row) for row in self.snapshot])
+        self.assertEqual(ALLOCATIONS[2], dict(self.snapshot[-1]))
+
+    def test_missing_keys(self):
+        row = self.snapshot[0]
+        self.assertNotIn('cpu_ratio', row)
+        self.assertRaises(KeyError, row.__getitem__, 'cpu_ratio')
+        self.assertEqual(3, len(row))
+
+    def test_column(self):
+        self.assertEqual(['resource_id', 'hypervisor_hostname',
+                          'reservations', 'cpu_ratio', 'enabled'],
+                         self.snapshot.columns)
+        self.assertEqual([None, 1.5, None],
+                         list(self.snapshot.column('cpu_ratio')))
+        self.assertEqual([0, 0, 0],
+                         list(self.snapshot.column('unknown', default=0)))
+
+    def test_index_out_of_range(self):
+        self.assertRaises(IndexError, self.snapshot.__getitem__, 3)
+
+    def test_empty_snapshot(self):
+        snapshot.write(self.path, [])
+        with snapshot.Snapshot(self.path) as empty:
+            self.assertEqual([], list(empty))
+
+    def test_not_a_snapshot(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'{"allocations": []}')
+        self.assertRaises(exception.BlazarClientException,
+                          snapshot.Snapshot, self.path)
@@ -0,0 +1,41 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from blazarclient import base
+from blazarclient import tests
+from blazarclient import timing
+
+
+class TimingCollectorTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(TimingCollectorTestCase, self).setUp()
+        self.collector = timing.TimingCollector()
+        self.collector(base.RequestRecord('GET', '/leases', '/leases', 200,
+                                          120, 0.25))
+        self.collector(base.RequestRecord('PUT', '/leases/1', '/leases/{id}',
+                                          409, 30, 0.5))
+
+    def test_totals(self):
+        self.assertEqual(0.75, self.collector.total_elapsed)
+        self.assertEqual(150, self.collector.total_bytes)
+
+    def test_format_table(self):
+        table = self.collector.format_table()
+        self.assertIn('/leases/{id}', table)
+        self.assertIn('2 request(s)', table)
+        self.assertIn('0.750', table)
+
+    def test_reset(self):
+        self.collector.reset()
+        self.assertEqual([], self.collector.records)
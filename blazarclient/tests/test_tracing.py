@@ -0,0 +1,109 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import tempfile
+from unittest import mock
+
+from oslo_serialization import jsonutils
+
+from blazarclient import tests
+from blazarclient import tracing
+from blazarclient.v1 import leases
+
+
+class _ListExporter(object):
+
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+
+class TracerTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(TracerTestCase, self).setUp()
+        self.exporter = _ListExporter()
+        tracing.set_tracer(tracing.Tracer(self.exporter))
+        self.addCleanup(tracing.set_tracer, None)
+
+    def test_nested_spans(self):
+        with tracing.span('command', kind='cli') as outer:
+            with tracing.span('HTTP GET') as inner:
+                inner.set_attribute('status_code', 200)
+        self.assertEqual([inner, outer], self.exporter.spans)
+        self.assertEqual(outer.span_id, inner.parent_id)
+        self.assertEqual(outer.trace_id, inner.trace_id)
+        self.assertIsNone(outer.parent_id)
+        self.assertEqual({'status_code': 200}, inner.attributes)
+        self.assertEqual({'kind': 'cli'}, outer.attributes)
+
+    def test_activate(self):
+        with tracing.span('command') as outer:
+            pass
+        with tracing.activate(outer):
+            self.assertIs(outer, tracing.current_span())
+            with tracing.span('HTTP GET') as inner:
+                pass
+        self.assertIsNone(tracing.current_span())
+        self.assertEqual(outer.span_id, inner.parent_id)
+        self.assertEqual([outer, inner], self.exporter.spans)
+
+    def test_span_records_error(self):
+        def fail():
+            with tracing.span('failing'):
+                raise ValueError('boom')
+        self.assertRaises(ValueError, fail)
+        self.assertEqual('ValueError: boom', self.exporter.spans[0].error)
+        self.assertIsNotNone(self.exporter.spans[0].duration)
+
+    def test_traced_manager_method(self):
+        manager = leases.LeaseClientManager(
+            blazar_url=None, auth_token=None, session=mock.MagicMock())
+        request_manager = self.patch(manager, 'request_manager')
+        request_manager.get.return_value = (None, {'leases': []})
+        manager.list()
+        self.assertEqual(['LeaseClientManager.list'],
+                         [s.name for s in self.exporter.spans])
+
+    def test_export_failure(self):
+        tracer = tracing.Tracer(mock.Mock())
+        tracer.exporter.export.side_effect = IOError('No such directory')
+        with tracer.span('outer') as outer:
+            result = 'done'
+        self.assertEqual('done', result)
+        tracer.exporter.export.assert_called_once_with(outer)
+
+    def test_disabled(self):
+        tracing.set_tracer(None)
+        with tracing.span('ignored') as span:
+            span.set_attribute('key', 'value')
+        self.assertEqual([], self.exporter.spans)
+
+
+class JSONFileExporterTestCase(tests.TestCase):
+
+    def test_export(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        tracer = tracing.Tracer(tracing.JSONFileExporter(path))
+        with tracer.span('outer'):
+            with tracer.span('inner'):
+                pass
+        with open(path) as f:
+            spans = [jsonutils.loads(line) for line in f]
+        self.assertEqual(['inner', 'outer'], [s['name'] for s in spans])
+        self.assertEqual(spans[1]['span_id'], spans[0]['parent_id'])
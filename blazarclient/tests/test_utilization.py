@@ -0,0 +1,78 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+import io
+from unittest import mock
+
+from blazarclient import exception
+from blazarclient import tests
+from blazarclient import utilization
+
+ALLOCATIONS = [
+    {'resource_id': '1', 'reservations': [
+        {'start_date': '2024-05-01T00:30:00.000000',
+         'end_date': '2024-05-01T02:00:00.000000'}]},
+    {'resource_id': '2', 'reservations': [
+        {'start_date': '2024-05-01T01:15:00.000000',
+         'end_date': '2024-05-01T01:45:00.000000'},
+        {'start_date': '2024-05-01T03:00:00.000000',
+         'end_date': '2024-05-02T00:00:00.000000'}]},
+    {'resource_id': '3', 'reservations': []},
+]
+HOSTS = [
+    {'id': '1', 'node_type': 'gpu'},
+    {'id': '2', 'node_type': 'compute'},
+    {'id': '3', 'node_type': 'compute'},
+]
+
+
+class UtilizationTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(UtilizationTestCase, self).setUp()
+        if utilization.numpy is None:
+            self.skipTest('NumPy is not installed')
+        self.usage = utilization.Utilization.from_allocations(
+            ALLOCATIONS, datetime.datetime(2024, 5, 1),
+            datetime.datetime(2024, 5, 1, 4))
+
+    def test_matrix(self):
+        self.assertEqual([[0.5, 1, 0, 0], [0, 0.5, 0, 1], [0, 0, 0, 0]],
+                         self.usage.matrix.tolist())
+
+    def test_per_resource(self):
+        self.assertEqual({'1': 0.375, '2': 0.375, '3': 0},
+                         self.usage.per_resource())
+
+    def test_by_property(self):
+        groups = self.usage.by_property(HOSTS, 'node_type')
+        self.assertEqual({'compute': [0, 0.25, 0, 0.5],
+                          'gpu': [0.5, 1, 0, 0]},
+                         {k: v.tolist() for k, v in groups.items()})
+
+    def test_to_csv(self):
+        stream = io.StringIO()
+        self.usage.to_csv(stream, HOSTS, key='node_type')
+        self.assertEqual(
+            'node_type,2024-05-01T00:00:00,2024-05-01T01:00:00,'
+            '2024-05-01T02:00:00,2024-05-01T03:00:00\r\n'
+            'compute,0,0.25,0,0.5\r\n'
+            'gpu,0.5,1,0,0\r\n', stream.getvalue())
+
+    def test_without_numpy(self):
+        with mock.patch.object(utilization, 'numpy', None):
+            self.assertRaises(exception.BlazarClientException,
+                              utilization.Utilization.from_allocations,
+                              ALLOCATIONS, datetime.datetime(2024, 5, 1),
+                              datetime.datetime(2024, 5, 2))
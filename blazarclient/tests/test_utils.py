@@ -0,0 +1,61 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from blazarclient import tests
+from blazarclient import utils
+
+KEYS = ('min', 'max', 'resource_properties', 'network_description')
+
+
+class SplitKeyValuesTestCase(tests.TestCase):
+
+    def test_simple(self):
+        self.assertEqual([('min', '1'), ('max', '2')],
+                         utils.split_key_values('min=1,max=2', KEYS))
+
+    def test_empty(self):
+        self.assertEqual([], utils.split_key_values('', KEYS))
+
+    def test_commas_in_values(self):
+        self.assertEqual(
+            [('network_description', 'a, b'), ('min', '1')],
+            utils.split_key_values('network_description=a, b,min=1', KEYS))
+
+    def test_keys_inside_json(self):
+        self.assertEqual(
+            [('resource_properties', '["and", ["==", "$a", "x,min=2"], '
+                                     '{"b": "y,max=3"}]'),
+             ('max', '4')],
+            utils.split_key_values(
+                'resource_properties=["and", ["==", "$a", "x,min=2"], '
+                '{"b": "y,max=3"}],max=4', KEYS))
+
+    def test_escaped_quote(self):
+        self.assertEqual(
+            [('resource_properties', '["==", "$a", "\\",min=1"]')],
+            utils.split_key_values(
+                'resource_properties=["==", "$a", "\\",min=1"]', KEYS))
+
+    def test_unbalanced_brackets(self):
+        self.assertEqual(
+            [('network_description', 'a (b'), ('min', '1')],
+            utils.split_key_values('network_description=a (b,min=1', KEYS))
+
+    def test_any_key(self):
+        self.assertEqual(
+            [('foo', '1'), ('bar', '[1,2]')],
+            utils.split_key_values('foo=1,bar=[1,2]', [utils.ANY_KEY]))
+
+    def test_unknown_first_key(self):
+        self.assertRaises(ValueError, utils.split_key_values,
+                          'foo=1,min=1', KEYS)
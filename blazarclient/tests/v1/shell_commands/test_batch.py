@@ -0,0 +1,134 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import io
+import os
+from unittest import mock
+
+import fixtures
+
+from blazarclient import base
+from blazarclient import exception
+from blazarclient import shell
+from blazarclient import tests
+from blazarclient import tracing
+from blazarclient.v1.shell_commands import batch
+
+COMMANDS = '''
+# prolong the workshop leases
+lease-update --prolong-for 1d lease-1
+blazar lease-update --prolong-for 1d "lease 2"
+
+host-update --extra gpu=true host-3
+'''
+
+
+class RunBatchTest(tests.TestCase):
+
+    def setUp(self):
+        super(RunBatchTest, self).setUp()
+        self.path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 'commands.txt')
+        with open(self.path, 'w') as f:
+            f.write(COMMANDS)
+        self.stdout = io.StringIO()
+        self.blazar_shell = shell.BlazarShell(stdout=self.stdout)
+        self.calls = []
+        self.exit_codes = {}
+
+        def run_subcommand(argv):
+            self.calls.append(argv)
+            print('ran %s' % argv[-1], file=self.blazar_shell.stdout)
+            return self.exit_codes.get(argv[-1])
+        self.blazar_shell.run_subcommand = run_subcommand
+        self.run_batch = batch.RunBatch(self.blazar_shell, None)
+
+    def _run(self, parallel=1, continue_on_error=False):
+        return self.run_batch.run(argparse.Namespace(
+            file=self.path, parallel=parallel,
+            continue_on_error=continue_on_error))
+
+    def test_run(self):
+        self.assertEqual(0, self._run())
+        self.assertEqual([
+            ['lease-update', '--prolong-for', '1d', 'lease-1'],
+            ['lease-update', '--prolong-for', '1d', 'lease 2'],
+            ['host-update', '--extra', 'gpu=true', 'host-3'],
+        ], self.calls)
+        output = self.stdout.getvalue()
+        self.assertIn('ran lease-1\nran lease 2\nran host-3\n', output)
+        self.assertIn('| 6    | host-update --extra gpu=true host-3  ', output)
+
+    def test_run_stops_on_error(self):
+        self.exit_codes['lease 2'] = 1
+        self.assertEqual(1, self._run())
+        self.assertEqual(2, len(self.calls))
+        self.assertIn(batch.SKIPPED, self.stdout.getvalue())
+
+    def test_run_continue_on_error(self):
+        self.exit_codes['lease 2'] = 1
+        self.assertEqual(1, self._run(continue_on_error=True))
+        self.assertEqual(3, len(self.calls))
+
+    def test_run_parallel_keeps_output_order(self):
+        self.assertEqual(0, self._run(parallel=3))
+        self.assertEqual(3, len(self.calls))
+        self.assertIn('ran lease-1\nran lease 2\nran host-3\n',
+                      self.stdout.getvalue())
+        self.assertIs(self.stdout, self.blazar_shell.stdout)
+
+    def test_run_usage_error_fails_line(self):
+        def run_subcommand(argv):
+            self.calls.append(argv)
+            if argv[-1] == 'lease 2':
+                raise SystemExit(2)
+        self.blazar_shell.run_subcommand = run_subcommand
+        self.assertEqual(1, self._run(continue_on_error=True))
+        self.assertEqual(3, len(self.calls))
+        self.assertIn('| 2    ', self.stdout.getvalue())
+
+    def _deadlines(self, parallel):
+        deadlines = []
+
+        def run_subcommand(argv):
+            deadlines.append(base.current_deadline())
+        self.blazar_shell.run_subcommand = run_subcommand
+        with base.deadline_scope(30) as deadline:
+            self.assertEqual(0, self._run(parallel=parallel))
+        self.assertEqual([deadline] * 3, deadlines)
+
+    def test_run_shares_deadline(self):
+        self._deadlines(parallel=1)
+
+    def test_run_parallel_shares_deadline(self):
+        self._deadlines(parallel=3)
+
+    def test_run_parallel_keeps_trace(self):
+        tracing.set_tracer(tracing.Tracer(mock.Mock()))
+        self.addCleanup(tracing.set_tracer, None)
+        spans = []
+        self.blazar_shell.run_subcommand = (
+            lambda argv: spans.append(tracing.current_span()))
+        with tracing.span('batch') as parent:
+            self._run(parallel=3)
+        self.assertEqual([parent] * 3, spans)
+
+    def test_invalid_parallel(self):
+        self.assertRaises(exception.BlazarClientException, self._run,
+                          parallel=0)
+
+    def test_invalid_line(self):
+        with open(self.path, 'w') as f:
+            f.write('lease-show "unterminated\n')
+        self.assertRaises(exception.BlazarClientException, self._run)
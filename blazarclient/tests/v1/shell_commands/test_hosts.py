@@ -272,3 +272,48 @@ class DeleteHostTest(tests.TestCase):
         delete_host.run(args)
 
         host_manager.delete.assert_called_once_with('101')
+
+
+class ListHostAvailabilityTest(tests.TestCase):
+
+    def test_take_action(self):
+        host_manager = mock.Mock()
+        host_manager.list.return_value = [
+            {'id': '1', 'hypervisor_hostname': 'host-1'},
+            {'id': '2', 'hypervisor_hostname': 'host-2'},
+        ]
+        host_manager.list_allocations.return_value = [
+            {'resource_id': '1', 'reservations': [
+                {'start_date': '2024-05-01T10:00:00.000000',
+                 'end_date': '2024-05-02T10:00:00.000000'}]},
+        ]
+        blazar_shell = shell.BlazarShell()
+        blazar_shell.client = mock.Mock(host=host_manager)
+        list_availability = hosts.ListHostAvailability(blazar_shell,
+                                                       mock.Mock())
+        args = argparse.Namespace(
+            count=2, duration='1d', resource_properties='',
+            start_after='2024-05-01 00:00', start_before='2024-06-01 00:00',
+            limit=5)
+        columns, data = list_availability.take_action(args)
+        self.assertEqual(('start', 'latest_start', 'hosts'), columns)
+        self.assertEqual([('2024-05-02 10:00', '2024-06-01 00:00',
+                           'host-1\nhost-2')], data)
+
+
+class ListHostsTest(tests.TestCase):
+
+    def test_retrieve_list_with_resource_properties(self):
+        host_manager = mock.Mock()
+        host_manager.list.return_value = [
+            {'id': '1', 'hypervisor_hostname': 'host-1', 'gpu': 'yes'},
+            {'id': '2', 'hypervisor_hostname': 'host-2'},
+        ]
+        blazar_shell = shell.BlazarShell()
+        blazar_shell.client = mock.Mock(host=host_manager)
+        list_hosts = hosts.ListHosts(blazar_shell, mock.Mock())
+        args = argparse.Namespace(sort_by='hypervisor_hostname',
+                                  from_mirror=False,
+                                  resource_properties='["=", "$gpu", "yes"]')
+        self.assertEqual(['1'], [host['id'] for host in
+                                 list_hosts.retrieve_list(args)])
@@ -15,8 +15,14 @@
 
 import argparse
 from datetime import datetime
+import io
+import os
 from unittest import mock
 
+import fixtures
+from oslo_serialization import jsonutils
+
+from blazarclient import bulk
 from blazarclient import exception
 from blazarclient import shell
 from blazarclient import tests
@@ -122,6 +128,26 @@ class CreateLeaseTestCase(tests.TestCase):
                           self.cl.args2body,
                           args)
 
+    def test_args2body_phys_res_params_with_keys_in_json(self):
+        args = argparse.Namespace(
+            start='2020-07-24 20:00',
+            end='2020-08-09 22:30',
+            before_end=None,
+            events=[],
+            name='lease-test',
+            reservations=[],
+            physical_reservations=[
+                'min=1,'
+                'max=2,'
+                'resource_properties='
+                '["==", "$extra_key", "a,max=3"]'
+            ]
+        )
+        reservation = self.cl.args2body(args)['reservations'][0]
+        self.assertEqual(2, reservation['max'])
+        self.assertEqual('["==", "$extra_key", "a,max=3"]',
+                         reservation['resource_properties'])
+
     def test_args2body_correct_instance_res_params(self):
         args = argparse.Namespace(
             start='2020-07-24 20:00',
@@ -224,6 +250,98 @@ class CreateLeaseTestCase(tests.TestCase):
         self.assertDictEqual(self.cl.args2body(args), expected)
 
 
+@mock.patch('blazarclient.v1.shell_commands.leases._utc_now', mock_time)
+class CreateLeasesBulkTestCase(tests.TestCase):
+
+    MANIFEST = """
+- name: lease-1
+  start_date: '2020-07-24 20:00'
+  end_date: '2020-07-25 20:00'
+  physical_reservations:
+    - min: 1
+      max: 2
+      resource_properties: '["==", "$node_type", "gpu"]'
+- name: lease-2
+  end_date: '2020-07-25 20:00'
+  reservations:
+    - resource_type=network,network_name=net-1
+- name: lease-3
+  start_date: '2020-07-26 20:00'
+  end_date: '2020-07-25 20:00'
+"""
+
+    def setUp(self):
+        super(CreateLeasesBulkTestCase, self).setUp()
+        self.directory = self.useFixture(fixtures.TempDir()).path
+        self.manifest = os.path.join(self.directory, 'leases.yaml')
+        with open(self.manifest, 'w') as f:
+            f.write(self.MANIFEST)
+        self.client = mock.Mock()
+        blazar_shell = shell.BlazarShell()
+        blazar_shell.client = self.client
+        self.command = leases.CreateLeasesBulk(blazar_shell, mock.Mock())
+
+    def _args(self, manifest=None):
+        return argparse.Namespace(manifest=manifest or self.manifest,
+                                  parallel=2, rate=None, results=None)
+
+    def _read_results(self):
+        with open(self.manifest + '.results.json') as f:
+            return jsonutils.loads(f.read())['results']
+
+    def test_take_action(self):
+        self.client.lease.create_many.side_effect = lambda bodies, **kw: [
+            bulk.Result(body, {'id': 'id-%s' % body['name']}, None)
+            for body in bodies]
+
+        columns, rows = self.command.take_action(self._args())
+
+        self.assertEqual(('index', 'name', 'status', 'id', 'error'),
+                         columns)
+        self.assertEqual([(0, 'lease-1', 'created', 'id-lease-1', None),
+                          (1, 'lease-2', 'created', 'id-lease-2', None)],
+                         rows[:2])
+        self.assertEqual('invalid', rows[2][2])
+        bodies = self.client.lease.create_many.call_args[0][0]
+        self.assertEqual(2, len(bodies))
+        self.assertEqual('2020-07-24 20:00', bodies[0]['start'])
+        self.assertEqual(
+            {'min': 1, 'max': 2, 'hypervisor_properties': '',
+             'resource_properties': '["==", "$node_type", "gpu"]',
+             'resource_type': 'physical:host'},
+            bodies[0]['reservations'][0])
+        self.assertEqual('now', bodies[1]['start'])
+        self.assertEqual(1, self.command.failed)
+        self.assertEqual(['created', 'created', 'invalid'],
+                         [r['status'] for r in self._read_results()])
+
+    def test_retry_from_results(self):
+        self.client.lease.create_many.side_effect = lambda bodies, **kw: [
+            bulk.Result(bodies[0], {'id': 'id-1'}, None),
+            bulk.Result(bodies[1], None,
+                        exception.BlazarClientException('Conflict'))]
+        self.command.take_action(self._args())
+        results = self._read_results()
+        self.assertEqual('Conflict', results[1]['error'])
+
+        self.client.lease.create_many.side_effect = lambda bodies, **kw: [
+            bulk.Result(body, {'id': 'id-2'}, None) for body in bodies]
+        columns, rows = self.command.take_action(
+            self._args(self.manifest + '.results.json'))
+
+        self.assertEqual(['lease-2'], [
+            body['name'] for body
+            in self.client.lease.create_many.call_args[0][0]])
+        self.assertEqual([(0, 'lease-1', 'created', 'id-1'),
+                          (1, 'lease-2', 'created', 'id-2'),
+                          (2, 'lease-3', 'invalid', None)],
+                         [row[:4] for row in rows])
+        self.assertEqual(['created', 'created', 'invalid'],
+                         [r['status'] for r in self._read_results()])
+        self.assertEqual(['leases.yaml', 'leases.yaml.results.json'],
+                         sorted(os.listdir(self.directory)))
+
+
 class UpdateLeaseTestCase(tests.TestCase):
 
     def setUp(self):
@@ -313,6 +431,79 @@ class UpdateLeaseTestCase(tests.TestCase):
         self.assertDictEqual(self.cl.args2body(args), expected)
 
 
+class UpdateLeaseAllMatchingTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(UpdateLeaseAllMatchingTestCase, self).setUp()
+        self.client = mock.Mock()
+        self.client.lease.query.return_value.where.return_value.all\
+            .return_value = [{'id': FIRST_LEASE}, {'id': SECOND_LEASE}]
+        blazar_shell = shell.BlazarShell()
+        blazar_shell.client = self.client
+        blazar_shell.stdout = io.StringIO()
+        blazar_shell.stderr = io.StringIO()
+        self.command = leases.UpdateLease(blazar_shell, mock.Mock())
+        self.parser = self.command.get_parser('lease-update')
+
+    def test_all_matching_key_values(self):
+        self.client.lease.update_many.return_value = [
+            bulk.Result({'id': FIRST_LEASE}, {'id': FIRST_LEASE}, None),
+            bulk.Result({'id': SECOND_LEASE}, None,
+                        exception.BlazarClientException('Conflict'))]
+        args = self.parser.parse_args(
+            ['--all-matching', 'status=ACTIVE,project_id=p1',
+             '--prolong-for', '1d', '--parallel', '2'])
+
+        self.assertEqual(1, self.command.run(args))
+        self.client.lease.query.return_value.where.assert_called_once_with(
+            status='ACTIVE', project_id='p1')
+        self.client.lease.update_many.assert_called_once_with(
+            [{'id': FIRST_LEASE}, {'id': SECOND_LEASE}], max_workers=2,
+            prolong_for='1d')
+        self.assertEqual('Updated lease: %s\n' % FIRST_LEASE,
+                         self.command.app.stdout.getvalue())
+        self.assertIn(SECOND_LEASE, self.command.app.stderr.getvalue())
+
+    def test_all_matching_expression(self):
+        self.client.lease.update_many.return_value = []
+        expression = '["==", "$status", "ACTIVE"]'
+        args = self.parser.parse_args(
+            ['--all-matching', expression, '--end-date', '2030-06-12 10:00'])
+
+        self.assertEqual(0, self.command.run(args))
+        self.client.lease.query.return_value.where.assert_called_once_with(
+            expression)
+
+    def test_all_matching_empty_filter(self):
+        for filter_str in ('', '  '):
+            args = self.parser.parse_args(
+                ['--all-matching', filter_str, '--prolong-for', '1d'])
+            self.assertRaises(exception.CommandError,
+                              self.command.run, args)
+        self.client.lease.query.assert_not_called()
+        self.client.lease.list.assert_not_called()
+        self.client.lease.update_many.assert_not_called()
+
+    def test_all_matching_with_lease(self):
+        args = self.parser.parse_args(
+            [FIRST_LEASE, '--all-matching', 'status=ACTIVE',
+             '--prolong-for', '1d'])
+        self.assertRaises(exception.BlazarClientException,
+                          self.command.run, args)
+
+    def test_all_matching_with_name(self):
+        args = self.parser.parse_args(
+            ['--all-matching', 'status=ACTIVE', '--name', 'lease'])
+        self.assertRaises(exception.BlazarClientException,
+                          self.command.run, args)
+
+    def test_no_lease(self):
+        args = self.parser.parse_args(['--prolong-for', '1d'])
+        self.assertRaises(exception.BlazarClientException,
+                          self.command.run, args)
+        self.client.lease.update.assert_not_called()
+
+
 class ShowLeaseTestCase(tests.TestCase):
 
     def create_show_command(self):
@@ -356,6 +547,26 @@ class ShowLeaseTestCase(tests.TestCase):
         lease_manager.list.assert_called_once_with()
         lease_manager.get.assert_called_once_with(SECOND_LEASE)
 
+    def test_show_lease_resources(self):
+        show_lease, lease_manager = self.create_show_command()
+        lease_manager.list.return_value = [
+            {'id': FIRST_LEASE, 'name': 'first-lease'},
+        ]
+        lease_manager.get.return_value = {'id': FIRST_LEASE}
+        client = show_lease.app.client
+        client.host.list_allocations.return_value = [
+            {'resource_id': '1', 'reservations': [
+                {'id': 'r1', 'lease_id': FIRST_LEASE}]}]
+        client.host.list.return_value = [
+            {'id': '1', 'hypervisor_hostname': 'node-1'}]
+
+        args = argparse.Namespace(id=FIRST_LEASE, resources=True)
+        columns, data = show_lease.get_data(args)
+
+        self.assertEqual(('id', 'resources'), columns)
+        self.assertIn('"hypervisor_hostname": "node-1"', data[1])
+        client.host.get.assert_not_called()
+
 
 class DeleteLeaseTestCase(tests.TestCase):
 
@@ -394,3 +605,84 @@ class DeleteLeaseTestCase(tests.TestCase):
 
         lease_manager.list.assert_called_once_with()
         lease_manager.delete.assert_called_once_with(SECOND_LEASE)
+
+
+@mock.patch('blazarclient.v1.shell_commands.leases._utc_now', mock_time)
+class ListLeasesTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(ListLeasesTestCase, self).setUp()
+        client = mock.Mock()
+        client.lease.list.return_value = [
+            {'id': FIRST_LEASE, 'name': 'first-lease',
+             'start_date': '2020-06-07T00:00:00.000000',
+             'end_date': '2020-06-08T01:00:00.000000'},
+            {'id': SECOND_LEASE, 'name': 'second-lease',
+             'start_date': '2020-06-09T00:00:00.000000',
+             'end_date': '2020-06-10T00:00:00.000000'},
+        ]
+        blazar_shell = shell.BlazarShell()
+        blazar_shell.client = client
+        self.list_leases = leases.ListLeases(blazar_shell, mock.Mock())
+
+    def _ids(self, **kwargs):
+        args = dict(sort_by='name', active_at=None, overlaps=None,
+                    ending_within=None)
+        args.update(kwargs)
+        return [lease['id'] for lease in self.list_leases.retrieve_list(
+            argparse.Namespace(**args))]
+
+    def test_no_date_filter(self):
+        self.assertEqual([FIRST_LEASE, SECOND_LEASE], self._ids())
+
+    def test_active_at(self):
+        self.assertEqual([FIRST_LEASE], self._ids(active_at='now'))
+        self.assertEqual([SECOND_LEASE],
+                         self._ids(active_at='2020-06-09 12:00'))
+
+    def test_overlaps(self):
+        self.assertEqual([FIRST_LEASE, SECOND_LEASE], self._ids(
+            overlaps=['2020-06-08 00:00', '2020-06-09 12:00']))
+
+    def test_ending_within(self):
+        self.assertEqual([FIRST_LEASE], self._ids(ending_within='2h'))
+        self.assertEqual([], self._ids(ending_within='2h',
+                                       active_at='2020-06-09 12:00'))
+
+    def test_invalid_date(self):
+        self.assertRaises(exception.BlazarClientException,
+                          self._ids, active_at='tomorrow')
+
+
+class ListLeaseResourcesTestCase(tests.TestCase):
+
+    def test_take_action(self):
+        client = mock.Mock()
+        client.lease.list.return_value = [{'id': FIRST_LEASE,
+                                           'name': 'first-lease'}]
+        client.lease.get.return_value = {
+            'id': FIRST_LEASE,
+            'reservations': [{'id': 'r1', 'resource_type': 'physical:host'},
+                             {'id': 'r2', 'resource_type': 'network'}]}
+        client.host.list_allocations.return_value = [
+            {'resource_id': '2', 'reservations': [
+                {'id': 'r1', 'lease_id': FIRST_LEASE}]},
+            {'resource_id': '1', 'reservations': [
+                {'id': 'r1', 'lease_id': FIRST_LEASE},
+                {'id': 'r3', 'lease_id': SECOND_LEASE}]},
+        ]
+        client.network.list_allocations.return_value = [
+            {'resource_id': 'net-1', 'reservations': [
+                {'id': 'r2', 'lease_id': FIRST_LEASE}]},
+        ]
+        blazar_shell = shell.BlazarShell()
+        blazar_shell.client = client
+        list_resources = leases.ListLeaseResources(blazar_shell, mock.Mock())
+        columns, data = list_resources.take_action(
+            argparse.Namespace(id=FIRST_LEASE))
+
+        self.assertEqual(('resource_type', 'resource_id', 'reservation_id'),
+                         columns)
+        self.assertEqual([('host', '1', 'r1'), ('host', '2', 'r1'),
+                          ('network', 'net-1', 'r2')], data)
+        client.device.list_allocations.assert_not_called()
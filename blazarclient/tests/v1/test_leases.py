@@ -0,0 +1,193 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from unittest import mock
+
+from blazarclient import base
+from blazarclient import exception
+from blazarclient import tests
+from blazarclient.v1 import leases
+
+LEASE = {
+    'id': 'd1e43d6d-8f6f-4c2e-b0a9-2982b39dc698',
+    'name': 'lease-1',
+    'start_date': '2030-06-08T10:00:00.000000',
+    'end_date': '2030-06-09T10:00:00.000000',
+}
+
+
+class LeaseClientManagerTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(LeaseClientManagerTestCase, self).setUp()
+        self.manager = leases.LeaseClientManager(
+            blazar_url=None, auth_token=None, session=mock.MagicMock())
+        self.request_manager = self.patch(self.manager, 'request_manager')
+        self.request_manager.get.return_value = (None, {'lease': LEASE})
+        self.request_manager.put.return_value = (None, {'lease': LEASE})
+
+    def test_update_prolong_for(self):
+        self.manager.update(LEASE['id'], prolong_for='1d')
+        self.request_manager.get.assert_called_once_with(
+            '/leases/%s' % LEASE['id'])
+        self.request_manager.put.assert_called_once_with(
+            '/leases/%s' % LEASE['id'],
+            body={'end_date': '2030-06-10 10:00'})
+
+    def test_update_with_deadline(self):
+        deadlines = []
+
+        def put(url, body):
+            deadlines.append(base.current_deadline())
+            return None, {'lease': LEASE}
+        self.request_manager.put.side_effect = put
+        self.manager.update(LEASE['id'], prolong_for='1d', deadline=30)
+        self.assertIsNotNone(deadlines[0])
+        self.assertLessEqual(deadlines[0].remaining(), 30)
+        self.assertIsNone(base.current_deadline())
+
+    def test_update_deadline_exceeded(self):
+        def slow_get(url):
+            base.current_deadline().expires_at = 0
+            return None, {'lease': LEASE}
+        self.request_manager.get.side_effect = slow_get
+        self.request_manager.put.side_effect = (
+            lambda *args, **kwargs: base.current_deadline().request_timeout())
+        self.assertRaises(exception.DeadlineExceeded, self.manager.update,
+                          LEASE['id'], prolong_for='1d', deadline=30)
+
+    def test_update_with_lease(self):
+        self.manager.update(LEASE['id'], prolong_for='1d', lease=LEASE)
+        self.request_manager.get.assert_not_called()
+        self.request_manager.put.assert_called_once_with(
+            '/leases/%s' % LEASE['id'],
+            body={'end_date': '2030-06-10 10:00'})
+
+    def test_update_with_version(self):
+        self.manager.update(LEASE['id'], defer_by='1h', lease=LEASE,
+                            version='"v1"')
+        self.request_manager.get.assert_not_called()
+        self.request_manager.put.assert_called_once_with(
+            '/leases/%s' % LEASE['id'],
+            body={'start_date': '2030-06-08 11:00'},
+            headers={'If-Match': '"v1"'})
+
+    def test_update_sends_fetched_version(self):
+        resp = mock.Mock(headers={'ETag': '"v2"'})
+        self.request_manager.get.return_value = (resp, {'lease': LEASE})
+        self.manager.update(LEASE['id'], prolong_for='1d')
+        self.request_manager.put.assert_called_once_with(
+            '/leases/%s' % LEASE['id'],
+            body={'end_date': '2030-06-10 10:00'},
+            headers={'If-Match': '"v2"'})
+
+    def test_update_conflict_retried(self):
+        current = dict(LEASE, end_date='2030-06-12T10:00:00.000000')
+        resp = mock.Mock(headers={'ETag': '"v2"'})
+        self.request_manager.get.return_value = (resp, {'lease': current})
+        self.request_manager.put.side_effect = [
+            exception.BlazarClientException('Precondition failed', code=412),
+            (None, {'lease': current})]
+
+        self.manager.update(LEASE['id'], prolong_for='1d', lease=LEASE,
+                            version='"v1"')
+
+        self.request_manager.get.assert_called_once_with(
+            '/leases/%s' % LEASE['id'])
+        self.assertEqual(
+            mock.call('/leases/%s' % LEASE['id'],
+                      body={'end_date': '2030-06-13 10:00'},
+                      headers={'If-Match': '"v2"'}),
+            self.request_manager.put.call_args)
+
+    def test_update_conflict_not_retried_for_absolute_dates(self):
+        self.request_manager.put.side_effect = exception.BlazarClientException(
+            'Precondition failed', code=412)
+        self.assertRaises(exception.BlazarClientException,
+                          self.manager.update, LEASE['id'],
+                          end_date='2030-06-12 10:00', version='"v1"')
+        self.request_manager.get.assert_not_called()
+        self.assertEqual(1, self.request_manager.put.call_count)
+
+    def test_update_many_from_leases(self):
+        second = dict(LEASE, id='424d21c3-45a2-448a-81ad-32eddc888375',
+                      end_date='2030-06-10T10:00:00.000000')
+        results = self.manager.update_many([LEASE, second], prolong_for='1d',
+                                           max_workers=2)
+
+        self.assertEqual([LEASE, second], [r.item for r in results])
+        self.request_manager.get.assert_not_called()
+        self.request_manager.put.assert_has_calls(
+            [mock.call('/leases/%s' % LEASE['id'],
+                       body={'end_date': '2030-06-10 10:00'}),
+             mock.call('/leases/%s' % second['id'],
+                       body={'end_date': '2030-06-11 10:00'})],
+            any_order=True)
+
+    def test_update_many_from_ids(self):
+        self.request_manager.get.return_value = (None, {'leases': [LEASE]})
+
+        def put(url, body):
+            if url.endswith('unknown'):
+                raise exception.BlazarClientException('Not found')
+            return None, {'lease': LEASE}
+        self.request_manager.put.side_effect = put
+        self.patch(self.manager, 'get_with_version').side_effect = (
+            exception.BlazarClientException('Not found'))
+
+        results = self.manager.update_many([LEASE['id'], 'unknown'],
+                                           reduce_by='1h')
+
+        self.request_manager.get.assert_called_once_with('/leases')
+        self.request_manager.put.assert_called_once_with(
+            '/leases/%s' % LEASE['id'], body={'end_date': '2030-06-09 09:00'})
+        self.assertEqual(LEASE, results[0].value)
+        self.assertEqual('Not found', str(results[1].error))
+
+    def test_update_many_absolute_date(self):
+        self.manager.update_many([LEASE['id']], end_date='2030-06-12 10:00')
+        self.request_manager.get.assert_not_called()
+        self.request_manager.put.assert_called_once_with(
+            '/leases/%s' % LEASE['id'], body={'end_date': '2030-06-12 10:00'})
+
+    def test_list_with_filters(self):
+        self.request_manager.get.return_value = (None, {'leases': [LEASE]})
+        self.manager.list(project_id='p1')
+        self.request_manager.get.assert_called_once_with(
+            '/leases?project_id=p1')
+
+    def test_query(self):
+        lease = dict(LEASE, project_id='p1')
+        self.request_manager.get.return_value = (None, {'leases': [lease]})
+        query = self.manager.query().where(project_id='p1', name='lease-1')
+        self.assertEqual([lease], query.all())
+        self.request_manager.get.assert_called_once_with(
+            '/leases?project_id=p1')
+
+    def test_create_many(self):
+        def post(url, body):
+            if body['name'] == 'bad':
+                raise exception.BlazarClientException('Conflict')
+            return None, {'lease': dict(LEASE, name=body['name'])}
+        self.request_manager.post.side_effect = post
+
+        results = self.manager.create_many(
+            [{'name': 'good', 'start': 'now', 'end': '2030-06-09 10:00',
+              'reservations': [], 'events': []},
+             {'name': 'bad', 'start': 'now', 'end': '2030-06-09 10:00',
+              'reservations': [], 'events': []}], max_workers=2)
+
+        self.assertEqual('good', results[0].value['name'])
+        self.assertIsNone(results[0].error)
+        self.assertIsNone(results[1].value)
+        self.assertEqual('Conflict', str(results[1].error))
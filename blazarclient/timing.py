@@ -0,0 +1,58 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import prettytable
+
+
+class TimingCollector(object):
+    """Request hook recording every request made by a client.
+
+    **Examples**
+        collector = TimingCollector()
+        client = Client(session=sess, request_hooks=[collector])
+        client.lease.list()
+        print(collector.format_table())
+    """
+
+    columns = ('Method', 'URL', 'Status', 'Bytes', 'Seconds')
+
+    def __init__(self):
+        self.records = []
+
+    def __call__(self, record):
+        self.records.append(record)
+
+    def reset(self):
+        self.records = []
+
+    @property
+    def total_elapsed(self):
+        return sum(r.elapsed for r in self.records)
+
+    @property
+    def total_bytes(self):
+        return sum(r.bytes for r in self.records)
+
+    def format_table(self):
+        """Return the recorded requests and their totals as a text table."""
+        table = prettytable.PrettyTable(self.columns)
+        table.align = 'l'
+        table.align['Bytes'] = 'r'
+        table.align['Seconds'] = 'r'
+        for r in self.records:
+            table.add_row([r.method, r.url_template,
+                           r.status_code if r.status_code is not None else '-',
+                           r.bytes, '%.3f' % r.elapsed])
+        table.add_row(['Total', '%d request(s)' % len(self.records), '',
+                       self.total_bytes, '%.3f' % self.total_elapsed])
+        return table.get_string()
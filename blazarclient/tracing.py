@@ -0,0 +1,197 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Hierarchical tracing of commands, manager methods and HTTP requests.
+
+Tracing is disabled until a tracer is installed with :func:`set_tracer`::
+
+    tracing.set_tracer(tracing.Tracer(tracing.JSONFileExporter('trace.json')))
+
+Spans opened while another span is active on the same thread become its
+children, so a CLI command produces a tree of command, manager method and
+HTTP request spans sharing one trace ID.
+"""
+
+import contextlib
+import functools
+import logging
+import threading
+import time
+import uuid
+
+from oslo_serialization import jsonutils
+
+LOG = logging.getLogger(__name__)
+
+_tracer = None
+
+
+class Span(object):
+    """A timed operation, possibly nested in a parent span."""
+
+    def __init__(self, name, trace_id, parent_id=None, attributes=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = dict(attributes or {})
+        self.start_time = time.time()
+        self.duration = None
+        self.error = None
+        self._started = time.monotonic()
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def finish(self, error=None):
+        self.duration = time.monotonic() - self._started
+        if error is not None:
+            self.error = '%s: %s' % (type(error).__name__, error)
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'start_time': self.start_time,
+            'duration': self.duration,
+            'attributes': self.attributes,
+            'error': self.error,
+        }
+
+
+class JSONFileExporter(object):
+    """Appends finished spans to a file, one JSON object per line."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span):
+        line = jsonutils.dumps(span.to_dict())
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(line + '\n')
+
+
+class Tracer(object):
+    """Creates spans and hands them to an exporter once finished.
+
+    An exporter is any object with an ``export(span)`` method.
+    """
+
+    def __init__(self, exporter):
+        self.exporter = exporter
+        self._local = threading.local()
+
+    @property
+    def current_span(self):
+        stack = getattr(self._local, 'stack', None)
+        return stack[-1] if stack else None
+
+    @contextlib.contextmanager
+    def span(self, name, **attributes):
+        parent = self.current_span
+        if parent is not None:
+            span = Span(name, parent.trace_id, parent.span_id, attributes)
+        else:
+            span = Span(name, uuid.uuid4().hex, attributes=attributes)
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        self._local.stack.append(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.finish(error=e)
+            raise
+        else:
+            span.finish()
+        finally:
+            self._local.stack.pop()
+            try:
+                self.exporter.export(span)
+            except Exception:
+                # NOTE: tracing must never break the traced call itself.
+                LOG.exception('Failed to export span %s', span.name)
+
+    @contextlib.contextmanager
+    def activate(self, span):
+        """Make span the parent of the spans opened in the block.
+
+        The span is neither finished nor exported when the block exits,
+        which allows work done in another thread to join its trace.
+        """
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        self._local.stack.append(span)
+        try:
+            yield span
+        finally:
+            self._local.stack.pop()
+
+
+class _NoopSpan(object):
+
+    def set_attribute(self, key, value):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+@contextlib.contextmanager
+def _noop_span():
+    yield _NOOP_SPAN
+
+
+def set_tracer(tracer):
+    """Install the tracer used by the client, or disable tracing if None."""
+    global _tracer
+    _tracer = tracer
+
+
+def get_tracer():
+    return _tracer
+
+
+def span(name, **attributes):
+    """Return a context manager timing the enclosed block as a span."""
+    if _tracer is None:
+        return _noop_span()
+    return _tracer.span(name, **attributes)
+
+
+def current_span():
+    """Return the innermost span active on this thread, if any."""
+    if _tracer is None:
+        return None
+    return _tracer.current_span
+
+
+def activate(span):
+    """Return a context manager making span the parent of new spans."""
+    if _tracer is None or span is None:
+        return _noop_span()
+    return _tracer.activate(span)
+
+
+def traced(func):
+    """Decorator recording each call of a manager method as a span."""
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if _tracer is None:
+            return func(self, *args, **kwargs)
+        with _tracer.span('%s.%s' % (type(self).__name__, func.__name__)):
+            return func(self, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,138 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Utilization of resources over time, computed from their allocations.
+
+This module requires NumPy, installed with the ``analytics`` extra of
+python-blazarclient.
+"""
+
+import csv
+import datetime
+
+from oslo_utils import importutils
+
+from blazarclient import dates
+from blazarclient import exception
+
+numpy = importutils.try_import('numpy')
+
+
+def _require_numpy():
+    if numpy is None:
+        raise exception.BlazarClientException(
+            'Utilization reports require NumPy, install it with '
+            '"pip install python-blazarclient[analytics]"')
+
+
+class Utilization(object):
+    """Occupancy matrix of resources × time buckets.
+
+    Each cell is the fraction of the bucket during which the resource was
+    reserved, from 0 to 1.
+
+    **Examples**
+        usage = Utilization.from_allocations(
+            client.host.list_allocations(),
+            datetime.datetime(2024, 1, 1), datetime.datetime(2025, 1, 1))
+        usage.by_property(client.host.list(), 'node_type')
+    """
+
+    def __init__(self, resource_ids, start, step, matrix):
+        self.resource_ids = resource_ids
+        self.start = start
+        self.step = step
+        self.matrix = matrix
+
+    @classmethod
+    def from_allocations(cls, allocations, start, end,
+                         step=datetime.timedelta(hours=1)):
+        """Build the matrix of the allocations between start and end.
+
+        The reservations of all resources are painted at once: each one adds
+        1 to a difference array at its first bucket and removes 1 after its
+        last one, so that a cumulative sum gives the buckets it covers. The
+        first and last buckets are then corrected for partial coverage.
+        """
+        _require_numpy()
+        step_seconds = step.total_seconds()
+        buckets = int(-(-(end - start).total_seconds() // step_seconds))
+        resource_ids = [allocation['resource_id'] for allocation in
+                        allocations]
+
+        rows, starts, ends = [], [], []
+        for row, allocation in enumerate(allocations):
+            for reservation in allocation.get('reservations') or ():
+                rows.append(row)
+                starts.append((dates.parse(reservation['start_date']) -
+                               start).total_seconds())
+                ends.append((dates.parse(reservation['end_date']) -
+                             start).total_seconds())
+        rows = numpy.asarray(rows, dtype=numpy.intp)
+        first = numpy.clip(numpy.asarray(starts) / step_seconds, 0, buckets)
+        last = numpy.clip(numpy.asarray(ends) / step_seconds, 0, buckets)
+        first_bucket = numpy.floor(first).astype(numpy.intp)
+        last_bucket = numpy.floor(last).astype(numpy.intp)
+
+        # NOTE: one extra column receives the bounds falling on the end.
+        diff = numpy.zeros((len(resource_ids), buckets + 1))
+        numpy.add.at(diff, (rows, first_bucket), 1)
+        numpy.add.at(diff, (rows, last_bucket), -1)
+        matrix = numpy.cumsum(diff, axis=1)
+        numpy.add.at(matrix, (rows, first_bucket), first_bucket - first)
+        numpy.add.at(matrix, (rows, last_bucket), last - last_bucket)
+        matrix = numpy.clip(matrix[:, :buckets], 0, 1)
+        return cls(resource_ids, start, step, matrix)
+
+    @property
+    def bucket_starts(self):
+        return [self.start + i * self.step
+                for i in range(self.matrix.shape[1])]
+
+    def per_resource(self):
+        """Return the mean utilization of each resource."""
+        return dict(zip(self.resource_ids, self.matrix.mean(axis=1)))
+
+    def per_bucket(self):
+        """Return the mean utilization of all resources in each bucket."""
+        return self.matrix.mean(axis=0)
+
+    def by_property(self, resources, key):
+        """Return the utilization in each bucket, grouped by a property.
+
+        :param resources: resources, as returned by the manager list()
+        :param key: property grouping the resources, e.g. 'node_type'
+        :returns: a dict mapping each value of the property to the mean
+                  utilization of its resources in each bucket.
+        """
+        values = {str(resource['id']): resource.get(key)
+                  for resource in resources}
+        groups = numpy.asarray([values.get(str(rid))
+                                for rid in self.resource_ids], dtype=object)
+        return {value: self.matrix[groups == value].mean(axis=0)
+                for value in sorted(set(groups), key=str)}
+
+    def to_csv(self, stream, resources=None, key=None):
+        """Write the utilization as CSV, one row per resource or group.
+
+        If key is given, the rows are the groups of by_property().
+        """
+        if key is not None:
+            rows = self.by_property(resources or [], key).items()
+        else:
+            rows = zip(self.resource_ids, self.matrix)
+        writer = csv.writer(stream)
+        writer.writerow([key or 'resource_id'] +
+                        [b.isoformat() for b in self.bucket_starts])
+        for name, values in rows:
+            writer.writerow([name] + ['%.4g' % v for v in values.tolist()])
@@ -14,13 +14,16 @@
 # limitations under the License.
 
 import datetime
+import functools
 import os
 import re
 
 from oslo_serialization import jsonutils as json
 
+from blazarclient import cache as response_cache
 from blazarclient import exception
 from blazarclient.i18n import _
+from blazarclient import tracing
 
 ELAPSED_TIME_REGEX = '^(\d+)([s|m|h|d])$' # noqa W605
 
@@ -105,6 +108,15 @@ def get_item_properties(item, fields, mixed_case_fields=None, formatters=None):
 
 def find_resource_id_by_name_or_id(client, resource_type, name_or_id,
                                    name_key, id_pattern):
+    with tracing.span('find_resource_id_by_name_or_id',
+                      resource_type=resource_type):
+        return _find_resource_id_by_name_or_id(client, resource_type,
+                                               name_or_id, name_key,
+                                               id_pattern)
+
+
+def _find_resource_id_by_name_or_id(client, resource_type, name_or_id,
+                                    name_key, id_pattern):
     try:
         # Since IDs and Hypervisor Hostnames can both be UUIDs, we'll first
         # try to look up by Hypervisor Hostname
@@ -119,16 +131,27 @@ def find_resource_id_by_name_or_id(client, resource_type, name_or_id,
             raise e
 
 
+def _build_name_index(resource_manager, key):
+    index = {}
+    for resource in resource_manager.list():
+        index.setdefault(resource.get(key), []).append(resource['id'])
+    return index
+
+
 def _find_resource_id_by_name(client, resource_type, name, name_key):
     resource_manager = getattr(client, resource_type)
-    resources = resource_manager.list()
-
-    named_resources = []
     key = name_key if name_key else 'name'
 
-    for resource in resources:
-        if resource.get(key) == name:
-            named_resources.append(resource['id'])
+    cache = getattr(getattr(resource_manager, 'request_manager', None),
+                    'cache', None)
+    if isinstance(cache, response_cache.ResponseCache):
+        index = cache.get_or_build(
+            ('name-index', resource_type, key),
+            lambda: _build_name_index(resource_manager, key))
+    else:
+        index = _build_name_index(resource_manager, key)
+
+    named_resources = index.get(name, [])
     if len(named_resources) > 1:
         raise exception.NoUniqueMatch(message="There are more than one "
                                               "appropriate resources for the "
@@ -181,3 +204,102 @@ def from_elapsed_time_to_delta(elapsed_time, pos_sign=True):
     """
     seconds = from_elapsed_time_to_seconds(elapsed_time, pos_sign=pos_sign)
     return datetime.timedelta(seconds=seconds)
+
+
+# Complete double-quoted string, and end of a string started earlier
+_QUOTED = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_QUOTED_END = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+# Key accepting any key=value pair
+ANY_KEY = '.*'
+
+
+@functools.lru_cache(maxsize=32)
+def _key_value_patterns(keys):
+    """Return the patterns matching a key and a comma followed by a key."""
+    if ANY_KEY in keys:
+        key = '[^,=]+'
+    else:
+        key = '|'.join(re.escape(k)
+                       for k in sorted(keys, key=len, reverse=True))
+    return re.compile('(%s)=' % key), re.compile(',(?=(?:%s)=)' % key)
+
+
+def _scan_nesting(text, depth, in_string):
+    """Return the bracket depth and string state at the end of text."""
+    if '\\' not in text:
+        # NOTE: without escapes, every quote starts or ends a string.
+        parts = text.split('"')
+        outside = ''.join(parts[1::2] if in_string else parts[::2])
+        in_string ^= len(parts) % 2 == 0
+    else:
+        if in_string:
+            match = _QUOTED_END.match(text)
+            if match is None:
+                return depth, True
+            text = text[match.end():]
+            in_string = False
+        outside = _QUOTED.sub('', text)
+        quote = outside.find('"')
+        if quote >= 0:
+            outside = outside[:quote]
+            in_string = True
+    depth += (outside.count('[') + outside.count('{') + outside.count('(') -
+              outside.count(']') - outside.count('}') - outside.count(')'))
+    return depth, in_string
+
+
+def _top_level_separators(value, separators):
+    """Return the separators outside of brackets and strings."""
+    cuts = []
+    depth, in_string, scanned = 0, False, 0
+    for separator in separators:
+        depth, in_string = _scan_nesting(value[scanned:separator], depth,
+                                         in_string)
+        scanned = separator
+        if depth < 0:
+            break
+        if depth == 0 and not in_string:
+            cuts.append(separator)
+    # NOTE: if no comma was skipped, the end of the string cannot change
+    # the result and is not read.
+    if len(cuts) < len(separators):
+        depth, in_string = _scan_nesting(value[scanned:], depth, in_string)
+        if depth or in_string:
+            return separators
+    return cuts
+
+
+def split_key_values(value, keys):
+    """Split a 'key1=value1,key2=value2' string into (key, value) pairs.
+
+    The string is split at the commas followed by one of the keys and an
+    equal sign, so that values can contain commas. Commas inside brackets
+    or double quotes, as in JSON values, never split the string. If the
+    brackets or quotes of the string are unbalanced, every comma followed
+    by a key splits it.
+
+    Only the commas followed by a key are visited: the nesting of the text
+    between two of them is computed at once, so the string is read in a
+    single pass.
+
+    :param keys: accepted keys, ANY_KEY accepting all of them
+    :returns: a list of (key, value) tuples, in the order of the string
+    :raises: ValueError if the string does not start with a key.
+    """
+    if not value:
+        return []
+    key_pattern, separator_pattern = _key_value_patterns(frozenset(keys))
+    if not key_pattern.match(value):
+        raise ValueError('%r does not start with a key=value pair' % value)
+    separators = [match.start()
+                  for match in separator_pattern.finditer(value)]
+    if any(char in value for char in '"[{('):
+        cuts = _top_level_separators(value, separators)
+    else:
+        cuts = separators
+    pairs = []
+    for start, end in zip([0] + [cut + 1 for cut in cuts],
+                          cuts + [len(value)]):
+        match = key_pattern.match(value, start, end)
+        pairs.append((match.group(1), value[match.end():end]))
+    return pairs
@@ -14,17 +14,21 @@
 # limitations under the License.
 
 from blazarclient import base
+from blazarclient import query
+from blazarclient import tracing
 
 
 class AllocationClientManager(base.BaseClientManager):
     """Manager for the ComputeHost connected requests."""
 
+    @tracing.traced
     def get(self, resource, resource_id):
         """Get allocation for resource identified by type and ID."""
         resp, body = self.request_manager.get(
             '/%s/%s/allocation' % (resource, resource_id))
         return body['allocation']
 
+    @tracing.traced
     def list(self, resource, sort_by=None):
         """List allocations for all resources of a type."""
         resp, body = self.request_manager.get('/%s/allocations' % resource)
@@ -32,3 +36,11 @@ class AllocationClientManager(base.BaseClientManager):
         if sort_by:
             allocations = sorted(allocations, key=lambda l: l[sort_by])
         return allocations
+
+    def query(self, resource):
+        """Return a query over the allocations of a type of resource.
+
+        **Examples**
+            client.allocation.query('os-hosts').where(resource_id=1).first()
+        """
+        return query.Query(self, {'resource': resource})
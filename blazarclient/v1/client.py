@@ -34,15 +34,19 @@ class Client(object):
         client.lease.list()
         client.event.list(<lease_id>)
         ...
+
+    If a blazarclient.cache.ResponseCache is given as cache, GET responses
+    are served from it until they expire or a write request is sent.
     """
 
     version = '1'
 
     def __init__(self, blazar_url=None, auth_token=None, session=None,
-                 **kwargs):
+                 cache=None, **kwargs):
         self.blazar_url = blazar_url
         self.auth_token = auth_token
         self.session = session
+        self.cache = cache
 
         if not self.session:
             logging.warning('Use a keystoneauth session object for the '
@@ -53,33 +57,39 @@ class Client(object):
                                                auth_token=self.auth_token,
                                                session=self.session,
                                                version=self.version,
+                                               cache=self.cache,
                                                **kwargs)
         self.host = hosts.ComputeHostClientManager(blazar_url=self.blazar_url,
                                                    auth_token=self.auth_token,
                                                    session=self.session,
                                                    version=self.version,
+                                                   cache=self.cache,
                                                    **kwargs)
         self.floatingip = floatingips.FloatingIPClientManager(
             blazar_url=self.blazar_url,
             auth_token=self.auth_token,
             session=self.session,
             version=self.version,
+            cache=self.cache,
             **kwargs)
         self.network = networks.NetworkClientManager(
             blazar_url=self.blazar_url,
             auth_token=self.auth_token,
             session=self.session,
             version=self.version,
+            cache=self.cache,
             **kwargs)
         self.device = devices.DeviceClientManager(
             blazar_url=self.blazar_url,
             auth_token=self.auth_token,
             session=self.session,
             version=self.version,
+            cache=self.cache,
             **kwargs)
         self.allocation = allocations.AllocationClientManager(
             blazar_url=self.blazar_url,
             auth_token=self.auth_token,
             session=self.session,
             version=self.version,
+            cache=self.cache,
             **kwargs)
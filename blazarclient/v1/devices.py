@@ -15,36 +15,47 @@
 
 from blazarclient import base
 from blazarclient.i18n import _
+from blazarclient import property_index
+from blazarclient import tracing
 
 
-class DeviceClientManager(base.BaseClientManager):
+class DeviceClientManager(property_index.PropertyIndexMixin,
+                          base.BaseClientManager):
     """Manager for the Device connected requests."""
 
+    @tracing.traced
     def create(self, name, **kwargs):
         """Creates device from values passed."""
+        self.invalidate_property_index()
         values = {'name': name}
         values.update(**kwargs)
         resp, body = self.request_manager.post('/devices', body=values)
         return body['device']
 
+    @tracing.traced
     def get(self, device_id):
         """Describe device specifications such as name and details."""
         resp, body = self.request_manager.get('/devices/%s' % device_id)
         return body['device']
 
+    @tracing.traced
     def update(self, device_id, values):
         """Update attributes of the device."""
         if not values:
             return _('No values to update passed.')
+        self.invalidate_property_index()
         resp, body = self.request_manager.put(
             '/devices/%s' % device_id, body=values
         )
         return body['device']
 
+    @tracing.traced
     def delete(self, device_id):
         """Delete device with specified ID."""
+        self.invalidate_property_index()
         resp, body = self.request_manager.delete('/devices/%s' % device_id)
 
+    @tracing.traced
     def list(self, sort_by=None):
         """List all devices."""
         resp, body = self.request_manager.get('/devices')
@@ -53,12 +64,14 @@ class DeviceClientManager(base.BaseClientManager):
             devices = sorted(devices, key=lambda l: l[sort_by])
         return devices
 
+    @tracing.traced
     def get_allocation(self, device_id):
         """Get allocation for device."""
         resp, body = self.request_manager.get(
             '/devices/%s/allocation' % device_id)
         return body['allocation']
 
+    @tracing.traced
     def list_allocations(self, sort_by=None):
         """List allocations for all devices."""
         resp, body = self.request_manager.get('/devices/allocations')
@@ -67,12 +80,15 @@ class DeviceClientManager(base.BaseClientManager):
             allocations = sorted(allocations, key=lambda l: l[sort_by])
         return allocations
 
+    @tracing.traced
     def reallocate(self, device_id, values):
         """Reallocate device from leases."""
+        self.invalidate_property_index()
         resp, body = self.request_manager.put(
             '/devices/%s/allocation' % device_id, body=values)
         return body['allocation']
 
+    @tracing.traced
     def list_properties(self, detail=False, all=False, sort_by=None):
         url = '/devices/properties'
 
@@ -93,15 +109,15 @@ class DeviceClientManager(base.BaseClientManager):
                                          key=lambda l: l[sort_by])
         return resource_properties
 
+    @tracing.traced
     def get_property(self, property_name):
-        resource_property = [
-            x for x in self.list_properties(detail=True)
-            if x['property'] == property_name]
-
-        return {} if not resource_property else resource_property[0]
+        resource_property = self.property_index().get_property(property_name)
+        return dict(resource_property or {})
 
+    @tracing.traced
     def set_property(self, property_name, private):
         data = {'private': private}
+        self.invalidate_property_index()
         resp, body = self.request_manager.patch(
             '/devices/properties/%s' % property_name, body=data)
 
@@ -14,11 +14,13 @@
 # limitations under the License.
 
 from blazarclient import base
+from blazarclient import tracing
 
 
 class FloatingIPClientManager(base.BaseClientManager):
     """Manager for floating IP requests."""
 
+    @tracing.traced
     def create(self, network_id, floating_ip_address, **kwargs):
         """Creates a floating IP from values passed."""
         values = {'floating_network_id': network_id,
@@ -27,17 +29,20 @@ class FloatingIPClientManager(base.BaseClientManager):
         resp, body = self.request_manager.post('/floatingips', body=values)
         return body['floatingip']
 
+    @tracing.traced
     def get(self, floatingip_id):
         """Show floating IP details."""
         resp, body = self.request_manager.get(
             '/floatingips/%s' % floatingip_id)
         return body['floatingip']
 
+    @tracing.traced
     def delete(self, floatingip_id):
         """Deletes floating IP with specified ID."""
         resp, body = self.request_manager.delete(
             '/floatingips/%s' % floatingip_id)
 
+    @tracing.traced
     def list(self, sort_by=None):
         """List all floating IPs."""
         resp, body = self.request_manager.get('/floatingips')
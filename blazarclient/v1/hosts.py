@@ -16,36 +16,47 @@
 from blazarclient import base
 from blazarclient import exception
 from blazarclient.i18n import _
+from blazarclient import property_index
+from blazarclient import tracing
 
 
-class ComputeHostClientManager(base.BaseClientManager):
+class ComputeHostClientManager(property_index.PropertyIndexMixin,
+                               base.BaseClientManager):
     """Manager for the ComputeHost connected requests."""
 
+    @tracing.traced
     def create(self, name, **kwargs):
         """Creates host from values passed."""
+        self.invalidate_property_index()
         values = {'name': name}
         values.update(**kwargs)
         resp, body = self.request_manager.post('/os-hosts', body=values)
         return body['host']
 
+    @tracing.traced
     def get(self, host_id):
         """Describe host specifications such as name and details."""
         resp, body = self.request_manager.get('/os-hosts/%s' % host_id)
         return body['host']
 
+    @tracing.traced
     def update(self, host_id, values):
         """Update attributes of the host."""
         if not values:
             return _('No values to update passed.')
+        self.invalidate_property_index()
         resp, body = self.request_manager.put(
             '/os-hosts/%s' % host_id, body=values
         )
         return body['host']
 
+    @tracing.traced
     def delete(self, host_id):
         """Delete host with specified ID."""
+        self.invalidate_property_index()
         resp, body = self.request_manager.delete('/os-hosts/%s' % host_id)
 
+    @tracing.traced
     def list(self, sort_by=None):
         """List all hosts."""
         resp, body = self.request_manager.get('/os-hosts')
@@ -54,12 +65,14 @@ class ComputeHostClientManager(base.BaseClientManager):
             hosts = sorted(hosts, key=lambda l: l[sort_by])
         return hosts
 
+    @tracing.traced
     def get_allocation(self, host_id):
         """Get allocation for host."""
         resp, body = self.request_manager.get(
             '/os-hosts/%s/allocation' % host_id)
         return body['allocation']
 
+    @tracing.traced
     def list_allocations(self, sort_by=None):
         """List allocations for all hosts."""
         resp, body = self.request_manager.get('/os-hosts/allocations')
@@ -68,12 +81,15 @@ class ComputeHostClientManager(base.BaseClientManager):
             allocations = sorted(allocations, key=lambda l: l[sort_by])
         return allocations
 
+    @tracing.traced
     def reallocate(self, host_id, values):
         """Reallocate host from leases."""
+        self.invalidate_property_index()
         resp, body = self.request_manager.put(
             '/os-hosts/%s/allocation' % host_id, body=values)
         return body['allocation']
 
+    @tracing.traced
     def list_properties(self, detail=False, all=False, sort_by=None):
         url = '/os-hosts/properties'
 
@@ -99,16 +115,17 @@ class ComputeHostClientManager(base.BaseClientManager):
                                          key=lambda l: l[sort_by])
         return resource_properties
 
+    @tracing.traced
     def get_property(self, property_name):
-        resource_property = [
-            x for x in self.list_properties(detail=True)
-            if x['property'] == property_name]
-        if not resource_property:
+        resource_property = self.property_index().get_property(property_name)
+        if resource_property is None:
             raise exception.ResourcePropertyNotFound()
-        return resource_property[0]
+        return dict(resource_property)
 
+    @tracing.traced
     def set_property(self, property_name, private):
         data = {'private': private}
+        self.invalidate_property_index()
         resp, body = self.request_manager.patch(
             '/os-hosts/properties/%s' % property_name, body=data)
 
@@ -13,16 +13,29 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from oslo_utils import timeutils
+import logging
+from urllib import parse
 
 from blazarclient import base
+from blazarclient import bulk
+from blazarclient import dates
+from blazarclient import exception
 from blazarclient.i18n import _
+from blazarclient import tracing
 from blazarclient import utils
 
+LOG = logging.getLogger(__name__)
+
+# Status codes of an update refused because the lease changed
+CONFLICT_CODES = (409, 412)
+
 
 class LeaseClientManager(base.BaseClientManager):
     """Manager for the lease connected requests."""
 
+    query_filters = ('project_id',)
+
+    @tracing.traced
     def create(self, name, start, end, reservations, events, before_end=None):
         """Creates lease from values passed."""
         values = {'name': name, 'start_date': start, 'end_date': end,
@@ -32,6 +45,22 @@ class LeaseClientManager(base.BaseClientManager):
         resp, body = self.request_manager.post('/leases', body=values)
         return body['lease']
 
+    @tracing.traced
+    def create_many(self, leases, max_workers=4, rate=None, deadline=None):
+        """Create many leases concurrently.
+
+        :param leases: dicts of the arguments of create() for each lease
+        :param max_workers: maximum number of concurrent requests
+        :param rate: maximum number of requests sent per second, if any
+        :param deadline: bound of the total time of all requests, in seconds
+        :returns: a list of bulk.Result, in the order of the leases, holding
+                  either the lease created or the error raised.
+        """
+        return bulk.run_many(lambda values: self.create(**values), leases,
+                             max_workers=max_workers, rate=rate,
+                             deadline=deadline)
+
+    @tracing.traced
     def get(self, lease_id):
         """Describes lease specifications such as name, status and locked
         condition.
@@ -39,56 +68,157 @@ class LeaseClientManager(base.BaseClientManager):
         resp, body = self.request_manager.get('/leases/%s' % lease_id)
         return body['lease']
 
+    @tracing.traced
+    def get_with_version(self, lease_id):
+        """Return the lease and its version token, None if not provided.
+
+        The version token is the ETag of the response, to pass to update()
+        along with the lease.
+        """
+        resp, body = self.request_manager.get('/leases/%s' % lease_id)
+        return body['lease'], self._version_of(resp)
+
+    @tracing.traced
     def update(self, lease_id, name=None, prolong_for=None, reduce_by=None,
                end_date=None, advance_by=None, defer_by=None, start_date=None,
-               reservations=None):
-        """Update attributes of the lease."""
+               reservations=None, deadline=None, lease=None, version=None):
+        """Update attributes of the lease.
+
+        Relative date changes need the current lease. Unless it is given as
+        ``lease``, it is fetched first, so the update may take two requests.
+        ``deadline`` bounds the total time of all requests, in seconds.
+
+        ``version`` is sent as an If-Match header, so that the update is
+        refused if the lease changed since. When relative date changes were
+        computed from a lease given or fetched with a version, a refused
+        update is retried once with the current lease.
+
+        **Examples**
+            client.lease.update(lease['id'], prolong_for='1d', lease=lease)
+            lease, version = client.lease.get_with_version(lease_id)
+            client.lease.update(lease_id, defer_by='2h', lease=lease,
+                                version=version)
+        """
+        with base.deadline_scope(deadline):
+            return self._update(lease_id, name=name, prolong_for=prolong_for,
+                                reduce_by=reduce_by, end_date=end_date,
+                                advance_by=advance_by, defer_by=defer_by,
+                                start_date=start_date,
+                                reservations=reservations, lease=lease,
+                                version=version)
+
+    @tracing.traced
+    def update_many(self, leases, max_workers=4, rate=None, deadline=None,
+                    **changes):
+        """Apply the same update to many leases concurrently.
+
+        Relative date changes are computed from the given leases, so that
+        each lease only takes one request. Leases given by ID are read with
+        a single list() request.
+
+        :param leases: leases, as returned by list(), or lease IDs
+        :param max_workers: maximum number of concurrent requests
+        :param rate: maximum number of requests sent per second, if any
+        :param deadline: bound of the total time of all updates, in seconds
+        :param changes: arguments of update(), such as prolong_for='1d'
+        :returns: a list of bulk.Result, in the order of the leases, holding
+                  either the lease updated or the error raised.
+        """
+        with base.deadline_scope(deadline):
+            leases = list(leases)
+            if (self._needs_lease(**changes) and
+                    any(isinstance(lease, str) for lease in leases)):
+                by_id = {lease['id']: lease for lease in self.list()}
+                leases = [by_id.get(lease, lease) for lease in leases]
+
+            def update(lease):
+                if isinstance(lease, str):
+                    return self._update(lease, **changes)
+                return self._update(lease['id'], lease=lease, **changes)
+
+            return bulk.run_many(update, leases, max_workers=max_workers,
+                                 rate=rate)
+
+    @staticmethod
+    def _needs_lease(prolong_for=None, reduce_by=None, advance_by=None,
+                     defer_by=None, **changes):
+        return bool(prolong_for or reduce_by or advance_by or defer_by)
+
+    @staticmethod
+    def _version_of(resp):
+        if resp is None:
+            return None
+        return resp.headers.get('ETag')
+
+    def _update(self, lease_id, lease=None, version=None, **changes):
+        relative = self._needs_lease(**changes)
+        snapshot = lease is not None
+        if relative and not snapshot:
+            lease, version = self.get_with_version(lease_id)
+
+        values = self._update_values(lease, **changes)
+        if not values:
+            return _('No values to update passed.')
+        try:
+            return self._put(lease_id, values, version)
+        except exception.BlazarClientException as e:
+            # NOTE: only relative changes are computed again from the
+            # current lease, absolute ones would overwrite the new changes.
+            if (not relative or not (snapshot or version) or
+                    e.kwargs.get('code') not in CONFLICT_CODES):
+                raise
+            LOG.debug('Lease %s changed since it was read, retrying',
+                      lease_id)
+        lease, version = self.get_with_version(lease_id)
+        return self._put(lease_id, self._update_values(lease, **changes),
+                         version)
+
+    def _put(self, lease_id, values, version):
+        kwargs = {'headers': {'If-Match': version}} if version else {}
+        resp, body = self.request_manager.put('/leases/%s' % lease_id,
+                                              body=values, **kwargs)
+        return body['lease']
+
+    def _update_values(self, lease, name=None, prolong_for=None,
+                       reduce_by=None, end_date=None, advance_by=None,
+                       defer_by=None, start_date=None, reservations=None):
         values = {}
         if name:
             values['name'] = name
 
-        lease_end_date_change = prolong_for or reduce_by or end_date
-        lease_start_date_change = defer_by or advance_by or start_date
-        lease = None
-
-        if lease_end_date_change:
-            lease = self.get(lease_id)
-            if end_date:
-                date = timeutils.parse_strtime(end_date, utils.API_DATE_FORMAT)
-                values['end_date'] = date.strftime(utils.API_DATE_FORMAT)
-            else:
-                self._add_lease_date(values, lease, 'end_date',
-                                     lease_end_date_change,
-                                     prolong_for is not None)
-
-        if lease_start_date_change:
-            if lease is None:
-                lease = self.get(lease_id)
-            if start_date:
-                date = timeutils.parse_strtime(start_date,
-                                               utils.API_DATE_FORMAT)
-                values['start_date'] = date.strftime(utils.API_DATE_FORMAT)
-            else:
-                self._add_lease_date(values, lease, 'start_date',
-                                     lease_start_date_change,
-                                     defer_by is not None)
+        lease_end_date_change = prolong_for or reduce_by
+        if end_date:
+            values['end_date'] = dates.format_api(dates.parse_api(end_date))
+        elif lease_end_date_change:
+            self._add_lease_date(values, lease, 'end_date',
+                                 lease_end_date_change,
+                                 prolong_for is not None)
+
+        lease_start_date_change = defer_by or advance_by
+        if start_date:
+            values['start_date'] = dates.format_api(
+                dates.parse_api(start_date))
+        elif lease_start_date_change:
+            self._add_lease_date(values, lease, 'start_date',
+                                 lease_start_date_change,
+                                 defer_by is not None)
 
         if reservations:
             values['reservations'] = reservations
+        return values
 
-        if not values:
-            return _('No values to update passed.')
-        resp, body = self.request_manager.put('/leases/%s' % lease_id,
-                                              body=values)
-        return body['lease']
-
+    @tracing.traced
     def delete(self, lease_id):
         """Deletes lease with specified ID."""
         resp, body = self.request_manager.delete('/leases/%s' % lease_id)
 
-    def list(self, sort_by=None):
-        """List all leases."""
-        resp, body = self.request_manager.get('/leases')
+    @tracing.traced
+    def list(self, sort_by=None, **filters):
+        """List all leases, or those matching the given query_filters."""
+        url = '/leases'
+        if filters:
+            url += '?' + parse.urlencode(sorted(filters.items()))
+        resp, body = self.request_manager.get(url)
         leases = body['leases']
         if sort_by:
             leases = sorted(leases, key=lambda l: l[sort_by])
@@ -98,6 +228,5 @@ class LeaseClientManager(base.BaseClientManager):
         delta_sec = utils.from_elapsed_time_to_delta(
             delta_date,
             pos_sign=positive_delta)
-        date = timeutils.parse_strtime(lease[key],
-                                       utils.LEASE_DATE_FORMAT)
-        values[key] = (date + delta_sec).strftime(utils.API_DATE_FORMAT)
+        date = dates.parse_lease(lease[key])
+        values[key] = dates.format_api(date + delta_sec)
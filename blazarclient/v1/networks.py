@@ -15,13 +15,18 @@
 
 from blazarclient import base
 from blazarclient.i18n import _
+from blazarclient import property_index
+from blazarclient import tracing
 
 
-class NetworkClientManager(base.BaseClientManager):
+class NetworkClientManager(property_index.PropertyIndexMixin,
+                           base.BaseClientManager):
     """Manager for network segment requests."""
 
+    @tracing.traced
     def create(self, network_type, physical_network, segment_id, **kwargs):
         """Creates a network segment from values passed."""
+        self.invalidate_property_index()
         values = {'network_type': network_type,
                   'physical_network': physical_network,
                   'segment_id': segment_id}
@@ -29,24 +34,30 @@ class NetworkClientManager(base.BaseClientManager):
         resp, body = self.request_manager.post('/networks', body=values)
         return body['network']
 
+    @tracing.traced
     def get(self, network_id):
         """Show network segment details."""
         resp, body = self.request_manager.get('/networks/%s' % network_id)
         return body['network']
 
+    @tracing.traced
     def update(self, network_id, values):
         """Update attributes of the network segment."""
         if not values:
             return _('No values to update passed.')
+        self.invalidate_property_index()
         resp, body = self.request_manager.put(
             '/networks/%s' % network_id, body=values
         )
         return body['network']
 
+    @tracing.traced
     def delete(self, network_id):
         """Delete network segment with specified ID."""
+        self.invalidate_property_index()
         resp, body = self.request_manager.delete('/networks/%s' % network_id)
 
+    @tracing.traced
     def list(self, sort_by=None):
         """List all network segments."""
         resp, body = self.request_manager.get('/networks')
@@ -55,12 +66,14 @@ class NetworkClientManager(base.BaseClientManager):
             networks = sorted(networks, key=lambda l: l[sort_by])
         return networks
 
+    @tracing.traced
     def get_allocation(self, network_id):
         """Get allocation for network."""
         resp, body = self.request_manager.get(
             '/networks/%s/allocation' % network_id)
         return body['allocation']
 
+    @tracing.traced
     def list_allocations(self, sort_by=None):
         """List allocations for all networks."""
         resp, body = self.request_manager.get('/networks/allocations')
@@ -69,6 +82,7 @@ class NetworkClientManager(base.BaseClientManager):
             allocations = sorted(allocations, key=lambda l: l[sort_by])
         return allocations
 
+    @tracing.traced
     def list_properties(self, detail=False, all=False, sort_by=None):
         url = '/networks/properties'
 
@@ -89,15 +103,15 @@ class NetworkClientManager(base.BaseClientManager):
                                          key=lambda l: l[sort_by])
         return resource_properties
 
+    @tracing.traced
     def get_property(self, property_name):
-        resource_property = [
-            x for x in self.list_properties(detail=True)
-            if x['property'] == property_name]
-
-        return {} if not resource_property else resource_property[0]
+        resource_property = self.property_index().get_property(property_name)
+        return dict(resource_property or {})
 
+    @tracing.traced
     def set_property(self, property_name, private):
         data = {'private': private}
+        self.invalidate_property_index()
         resp, body = self.request_manager.patch(
             '/networks/properties/%s' % property_name, body=data)
 
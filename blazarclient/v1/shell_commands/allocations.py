@@ -15,6 +15,7 @@
 
 import logging
 
+from blazarclient import allocation_index
 from blazarclient import command
 from blazarclient import utils
 
@@ -130,15 +131,14 @@ class ListAllocations(command.ListCommand):
         self.log.debug('get_data(%s)' % parsed_args)
         data = self.retrieve_list(parsed_args)
 
-        for resource in data:
-            if parsed_args.lease_id is not None:
-                resource['reservations'] = list(
-                    filter(lambda d: d['lease_id'] == parsed_args.lease_id,
-                           resource['reservations']))
-            if parsed_args.reservation_id is not None:
-                resource['reservations'] = list(
-                    filter(lambda d: d['id'] == parsed_args.reservation_id,
-                           resource['reservations']))
+        if (parsed_args.lease_id is not None or
+                parsed_args.reservation_id is not None):
+            index = allocation_index.AllocationIndex(data)
+            for resource in data:
+                resource['reservations'] = index.reservations_of(
+                    resource['resource_id'],
+                    lease_id=parsed_args.lease_id,
+                    reservation_id=parsed_args.reservation_id)
 
         return self.setup_columns(data, parsed_args)
 
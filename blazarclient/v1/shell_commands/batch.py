@@ -0,0 +1,174 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from concurrent import futures
+import io
+import logging
+import shlex
+import sys
+import threading
+
+import prettytable
+
+from blazarclient import base
+from blazarclient import command
+from blazarclient import exception
+
+SKIPPED = 'skipped'
+
+
+class _ThreadLocalStream(object):
+    """Stream proxy capturing the output of each worker thread separately."""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    def capture(self):
+        self._local.buffer = io.StringIO()
+        return self._local.buffer
+
+    def release(self):
+        self._local.buffer = None
+
+    def __getattr__(self, name):
+        target = getattr(self._local, 'buffer', None) or self._stream
+        return getattr(target, name)
+
+
+class RunBatch(command.BlazarCommand):
+    """Run blazar commands read from a file, one per line.
+
+    All commands share the same authenticated client. Empty lines and lines
+    starting with '#' are ignored. The --deadline global option bounds the
+    whole batch, whether commands run sequentially or concurrently.
+    """
+    log = logging.getLogger(__name__ + '.RunBatch')
+
+    def get_parser(self, prog_name):
+        parser = super(RunBatch, self).get_parser(prog_name)
+        parser.add_argument(
+            'file', metavar='<file>',
+            help='File containing the commands, or - to read standard input'
+        )
+        parser.add_argument(
+            '--parallel', metavar='<count>',
+            type=int,
+            default=1,
+            help='Number of commands to run concurrently (default: 1). The '
+                 'output of each command is still printed in file order.'
+        )
+        parser.add_argument(
+            '--continue-on-error',
+            action='store_true',
+            default=False,
+            help='Run the remaining commands after a command fails'
+        )
+        return parser
+
+    def _read_lines(self, path):
+        if path == '-':
+            content = sys.stdin.read()
+        else:
+            with open(path) as f:
+                content = f.read()
+        lines = []
+        for number, line in enumerate(content.splitlines(), 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                argv = shlex.split(line)
+            except ValueError as e:
+                raise exception.BlazarClientException(
+                    'Invalid command on line %d: %s' % (number, e))
+            if argv and argv[0] == 'blazar':
+                argv = argv[1:]
+            lines.append((number, line, argv))
+        return lines
+
+    def _run_one(self, argv):
+        try:
+            return self.app.run_subcommand(argv) or 0
+        except SystemExit as e:
+            # NOTE: argparse exits on usage errors, which must only fail
+            # this line.
+            if e.code is None or isinstance(e.code, int):
+                return e.code or 0
+            self.log.error('%s', e.code)
+            return 1
+        except Exception as e:
+            self.log.error('%s', e)
+            return 1
+
+    def _run_sequential(self, lines, continue_on_error):
+        results = []
+        failed = False
+        for number, line, argv in lines:
+            if failed and not continue_on_error:
+                results.append(SKIPPED)
+                continue
+            code = self._run_one(argv)
+            failed = failed or code != 0
+            results.append(code)
+        return results
+
+    def _run_parallel(self, lines, parallel, continue_on_error):
+        stdout = self.app.stdout
+        proxy = _ThreadLocalStream(stdout)
+        failed = threading.Event()
+
+        @base.propagate_context
+        def run(argv):
+            if failed.is_set() and not continue_on_error:
+                return SKIPPED, ''
+            buffer = proxy.capture()
+            try:
+                code = self._run_one(argv)
+            finally:
+                proxy.release()
+            if code != 0:
+                failed.set()
+            return code, buffer.getvalue()
+
+        results = []
+        self.app.stdout = proxy
+        try:
+            with futures.ThreadPoolExecutor(max_workers=parallel) as pool:
+                for code, output in pool.map(run, [argv for _n, _l, argv
+                                                   in lines]):
+                    stdout.write(output)
+                    results.append(code)
+        finally:
+            self.app.stdout = stdout
+        return results
+
+    def run(self, parsed_args):
+        self.log.debug('run(%s)' % parsed_args)
+        if parsed_args.parallel < 1:
+            raise exception.BlazarClientException(
+                '--parallel must be greater than or equal to 1')
+        lines = self._read_lines(parsed_args.file)
+        if parsed_args.parallel == 1:
+            results = self._run_sequential(lines,
+                                           parsed_args.continue_on_error)
+        else:
+            results = self._run_parallel(lines, parsed_args.parallel,
+                                         parsed_args.continue_on_error)
+
+        table = prettytable.PrettyTable(['Line', 'Command', 'Exit code'])
+        table.align = 'l'
+        for (number, line, _argv), code in zip(lines, results):
+            table.add_row([number, line, code])
+        print(table.get_string(), file=self.app.stdout)
+        return 0 if all(code == 0 for code in results) else 1
@@ -0,0 +1,52 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+
+from cliff import show
+
+from blazarclient import command
+from blazarclient import exception
+
+
+def _get_cache(app):
+    cache = getattr(app, 'response_cache', None)
+    if cache is None:
+        raise exception.BlazarClientException(
+            'The response cache is only enabled in interactive mode and in '
+            'batch commands, with a --cache-ttl greater than 0')
+    return cache
+
+
+class ShowCacheStats(command.BlazarCommand, show.ShowOne):
+    """Show statistics of the response cache of the shell."""
+    log = logging.getLogger(__name__ + '.ShowCacheStats')
+
+    def take_action(self, parsed_args):
+        self.log.debug('take_action(%s)' % parsed_args)
+        stats = _get_cache(self.app).stats()
+        if stats['hit_rate'] is not None:
+            stats['hit_rate'] = '%.1f%%' % (stats['hit_rate'] * 100)
+        else:
+            stats['hit_rate'] = ''
+        return zip(*sorted(stats.items()))
+
+
+class ClearCache(command.BlazarCommand):
+    """Drop every response held by the response cache of the shell."""
+    log = logging.getLogger(__name__ + '.ClearCache')
+
+    def run(self, parsed_args):
+        self.log.debug('run(%s)' % parsed_args)
+        _get_cache(self.app).clear()
+        print('Cleared the response cache', file=self.app.stdout)
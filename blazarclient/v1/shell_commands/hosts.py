@@ -13,10 +13,18 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import datetime
 import logging
 
+from cliff import lister
+from oslo_utils import timeutils
+
+from blazarclient import availability
 from blazarclient import command
+from blazarclient import dates
 from blazarclient import exception
+from blazarclient import expressions
+from blazarclient import utils
 
 # Matches integers or UUIDs
 HOST_ID_PATTERN = r'^([0-9]+|([0-9a-fA-F]{8}\b-[0-9a-fA-F]{4}\b-[0-9a-fA-F]{4}\b-[0-9a-fA-F]{4}\b-[0-9a-fA-F]{12}))$'
@@ -26,6 +34,7 @@ class ListHosts(command.ListCommand):
     """Print a list of hosts."""
     resource = 'host'
     log = logging.getLogger(__name__ + '.ListHosts')
+    mirror_collection = 'hosts'
     list_columns = ['id', 'hypervisor_hostname', 'vcpus', 'memory_mb',
                     'local_gb']
 
@@ -36,8 +45,22 @@ class ListHosts(command.ListCommand):
             help='column name used to sort result',
             default='hypervisor_hostname'
         )
+        parser.add_argument(
+            '--resource-properties', metavar='<json>',
+            default='',
+            help='Only list the hosts matching these resource properties, '
+                 'e.g. \'["=", "$node_type", "compute"]\'. The filter is '
+                 'evaluated by the client.'
+        )
         return parser
 
+    def retrieve_list(self, parsed_args):
+        data = super(ListHosts, self).retrieve_list(parsed_args)
+        resource_properties = getattr(parsed_args, 'resource_properties', '')
+        if resource_properties:
+            data = expressions.filter_resources(data, resource_properties)
+        return data
+
 
 class ShowHost(command.ShowCommand):
     """Show host details."""
@@ -171,6 +194,7 @@ class ListHostAllocations(command.ListAllocationCommand):
     """List host allocations."""
     resource = 'host'
     log = logging.getLogger(__name__ + '.ListHostAllocations')
+    mirror_collection = 'host_allocations'
     list_columns = ['resource_id', 'reservations']
 
     def get_parser(self, prog_name):
@@ -275,3 +299,86 @@ class UpdateHostProperty(command.UpdatePropertyCommand):
     json_indent = 4
     log = logging.getLogger(__name__ + '.UpdateHostProperty')
     name_key = 'property_name'
+
+
+class ListHostAvailability(command.BlazarCommand, lister.Lister):
+    """List the earliest periods in which enough hosts are free.
+
+    A lease reserving the listed hosts for the given duration can start at
+    any time from the start to the latest start of a period.
+    """
+    log = logging.getLogger(__name__ + '.ListHostAvailability')
+
+    def get_parser(self, prog_name):
+        parser = super(ListHostAvailability, self).get_parser(prog_name)
+        parser.add_argument(
+            '--count', metavar='<count>',
+            type=int,
+            default=1,
+            help='Number of hosts needed (default: 1)'
+        )
+        parser.add_argument(
+            '--duration', metavar='<duration>',
+            required=True,
+            help='Duration of the lease, e.g. 3d, 12h or 30m'
+        )
+        parser.add_argument(
+            '--resource-properties', metavar='<json>',
+            default='',
+            help='Only consider the hosts matching these resource '
+                 'properties, e.g. \'["=", "$node_type", "compute"]\''
+        )
+        parser.add_argument(
+            '--start-after', metavar='<YYYY-MM-DD HH:MM>',
+            default='now',
+            help='Earliest start of the lease (default: now)'
+        )
+        parser.add_argument(
+            '--start-before', metavar='<YYYY-MM-DD HH:MM>',
+            default=None,
+            help='Latest start of the lease (default: no limit)'
+        )
+        parser.add_argument(
+            '--limit', metavar='<count>',
+            type=int,
+            default=5,
+            help='Maximum number of periods to list (default: 5)'
+        )
+        return parser
+
+    @staticmethod
+    def _parse_date(value):
+        try:
+            return dates.parse_api(value)
+        except ValueError:
+            raise exception.BlazarClientException(
+                'Invalid date %s, the format is YYYY-MM-DD HH:MM' % value)
+
+    def take_action(self, parsed_args):
+        self.log.debug('take_action(%s)' % parsed_args)
+        if parsed_args.count < 1:
+            raise exception.BlazarClientException(
+                '--count must be greater than or equal to 1')
+        duration = datetime.timedelta(
+            seconds=utils.from_elapsed_time_to_seconds(parsed_args.duration))
+        if parsed_args.start_after == 'now':
+            not_before = timeutils.utcnow()
+        else:
+            not_before = self._parse_date(parsed_args.start_after)
+        not_after = None
+        if parsed_args.start_before:
+            not_after = self._parse_date(parsed_args.start_before)
+
+        blazar_client = self.get_client()
+        windows = availability.find_windows(
+            blazar_client.host.list(),
+            blazar_client.host.list_allocations(),
+            parsed_args.count, duration, not_before, not_after,
+            resource_properties=parsed_args.resource_properties,
+            limit=parsed_args.limit)
+        return ('start', 'latest_start', 'hosts'), [
+            (dates.format_api(window.start),
+             dates.format_api(window.latest_start)
+             if window.latest_start else '',
+             '\n'.join(window.hosts))
+            for window in windows]
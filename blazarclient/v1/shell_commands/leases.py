@@ -14,14 +14,20 @@
 # limitations under the License.
 
 import datetime
-import re
 
+from cliff import lister
 from oslo_serialization import jsonutils
 from oslo_utils import strutils
+import yaml
 
 import argparse
+from blazarclient import allocation_index
 from blazarclient import command
+from blazarclient import dates
 from blazarclient import exception
+from blazarclient import joins
+from blazarclient import lease_index
+from blazarclient import utils
 import logging
 
 
@@ -86,6 +92,7 @@ class ListLeases(command.ListCommand):
     """Print a list of leases."""
     resource = 'lease'
     log = logging.getLogger(__name__ + '.ListLeases')
+    mirror_collection = 'leases'
     list_columns = ['id', 'name', 'start_date', 'end_date']
 
     def get_parser(self, prog_name):
@@ -95,8 +102,62 @@ class ListLeases(command.ListCommand):
             help='column name used to sort result',
             default='name'
         )
+        parser.add_argument(
+            '--active-at', metavar='<date>',
+            help='Only list the leases active at this time (YYYY-MM-DD '
+                 'HH:MM) UTC TZ, or "now"'
+        )
+        parser.add_argument(
+            '--overlaps', metavar=('<start>', '<end>'), nargs=2,
+            help='Only list the leases overlapping this window, given as '
+                 'two times (YYYY-MM-DD HH:MM) UTC TZ'
+        )
+        parser.add_argument(
+            '--ending-within', metavar='<duration>',
+            help='Only list the leases ending between now and this '
+                 'duration from now. Duration must be in the elapsed time '
+                 'format (e.g. 2h)'
+        )
         return parser
 
+    @staticmethod
+    def _parse_date(value):
+        if value == 'now':
+            return _utc_now()
+        try:
+            return dates.parse_api(value)
+        except ValueError:
+            raise exception.BlazarClientException(
+                'Invalid date %s, the format is YYYY-MM-DD HH:MM' % value)
+
+    def retrieve_list(self, parsed_args):
+        data = super(ListLeases, self).retrieve_list(parsed_args)
+        active_at = getattr(parsed_args, 'active_at', None)
+        overlaps = getattr(parsed_args, 'overlaps', None)
+        ending_within = getattr(parsed_args, 'ending_within', None)
+        if not (active_at or overlaps or ending_within):
+            return data
+        index = lease_index.LeaseDateIndex(data)
+        selected = None
+        if active_at:
+            selected = index.active_at(self._parse_date(active_at))
+        if overlaps:
+            start, end = (self._parse_date(date) for date in overlaps)
+            selected = self._intersect(selected,
+                                       index.overlapping(start, end))
+        if ending_within:
+            delta = utils.from_elapsed_time_to_delta(ending_within)
+            selected = self._intersect(selected,
+                                       index.ending_within(_utc_now(), delta))
+        return selected
+
+    @staticmethod
+    def _intersect(selected, leases):
+        if selected is None:
+            return leases
+        ids = {lease['id'] for lease in leases}
+        return [lease for lease in selected if lease['id'] in ids]
+
 
 class ShowLease(command.ShowCommand):
     """Show details about the given lease."""
@@ -113,8 +174,21 @@ class ShowLease(command.ShowCommand):
             help_str = 'ID of %s to look up'
         parser.add_argument('id', metavar=self.resource.upper(),
                             help=help_str % self.resource)
+        parser.add_argument(
+            '--resources',
+            action='store_true',
+            default=False,
+            help='Also show the hosts allocated to the lease, with their '
+                 'properties'
+        )
         return parser
 
+    def retrieve_data(self, blazar_client, res_id, parsed_args):
+        if getattr(parsed_args, 'resources', False):
+            return joins.leases_with_resources(blazar_client, res_id)[0]
+        return super(ShowLease, self).retrieve_data(blazar_client, res_id,
+                                                    parsed_args)
+
 
 class CreateLeaseBase(command.CreateCommand):
     """Create a lease."""
@@ -186,14 +260,12 @@ class CreateLeaseBase(command.CreateCommand):
         if not isinstance(parsed_args.start, datetime.datetime):
             if parsed_args.start != 'now':
                 try:
-                    parsed_args.start = datetime.datetime.strptime(
-                        parsed_args.start, '%Y-%m-%d %H:%M')
+                    parsed_args.start = dates.parse_api(parsed_args.start)
                 except ValueError:
                     raise exception.IncorrectLease
         if not isinstance(parsed_args.end, datetime.datetime):
             try:
-                parsed_args.end = datetime.datetime.strptime(
-                    parsed_args.end, '%Y-%m-%d %H:%M')
+                parsed_args.end = dates.parse_api(parsed_args.end)
             except ValueError:
                 raise exception.IncorrectLease
 
@@ -207,23 +279,20 @@ class CreateLeaseBase(command.CreateCommand):
 
         if parsed_args.before_end:
             try:
-                parsed_args.before_end = datetime.datetime.strptime(
-                    parsed_args.before_end, '%Y-%m-%d %H:%M')
+                parsed_args.before_end = dates.parse_api(
+                    parsed_args.before_end)
             except ValueError:
                 raise exception.IncorrectLease
             if (parsed_args.before_end < start or
                     parsed_args.end < parsed_args.before_end):
                 raise exception.IncorrectLease
-            params['before_end'] = datetime.datetime.strftime(
-                parsed_args.before_end, '%Y-%m-%d %H:%M')
+            params['before_end'] = dates.format_api(parsed_args.before_end)
 
         if parsed_args.start == 'now':
             params['start'] = parsed_args.start
         else:
-            params['start'] = datetime.datetime.strftime(parsed_args.start,
-                                                         '%Y-%m-%d %H:%M')
-        params['end'] = datetime.datetime.strftime(parsed_args.end,
-                                                   '%Y-%m-%d %H:%M')
+            params['start'] = dates.format_api(parsed_args.start)
+        params['end'] = dates.format_api(parsed_args.end)
 
         params['reservations'] = []
         params['events'] = []
@@ -274,9 +343,8 @@ class CreateLeaseBase(command.CreateCommand):
                 raise exception.IncorrectLease(err_msg)
             event_date = event_info['event_date']
             try:
-                date = datetime.datetime.strptime(event_date, '%Y-%m-%d %H:%M')
-                event_date = datetime.datetime.strftime(date, '%Y-%m-%d %H:%M')
-                event_info['event_date'] = event_date
+                event_info['event_date'] = dates.format_api(
+                    dates.parse_api(event_date))
             except ValueError:
                 raise exception.IncorrectLease
             events.append(event_info)
@@ -287,29 +355,23 @@ class CreateLeaseBase(command.CreateCommand):
 
     def _parse_params(self, str_params, default, err_msg):
         request_params = {}
-        prog = re.compile('^(?:(.*),)?(%s)=(.*)$'
-                          % "|".join(default.keys()))
-
-        while str_params != "":
-            match = prog.search(str_params)
+        try:
+            pairs = utils.split_key_values(str_params, default)
+        except ValueError:
+            raise exception.IncorrectLease(err_msg)
 
-            if match is None:
-                raise exception.IncorrectLease(err_msg)
-
-            self.log.info("Matches: %s", match.groups())
-            k, v = match.group(2, 3)
+        self.log.info("Matches: %s", pairs)
+        for k, v in pairs:
             if k in request_params.keys():
                 raise exception.DuplicatedLeaseParameters(err_msg)
             else:
                 if strutils.is_int_like(v):
                     request_params[k] = int(v)
-                elif isinstance(default[k], list):
+                elif isinstance(default.get(k), list):
                     request_params[k] = jsonutils.loads(v)
                 else:
                     request_params[k] = v
 
-            str_params = match.group(1) if match.group(1) else ""
-
         request_params.update({k: v for k, v in default.items()
                                if k not in request_params.keys() and
                                v is not None})
@@ -390,15 +452,195 @@ class CreateLease(CreateLeaseBase):
         return params
 
 
+class CreateLeasesBulk(command.BlazarCommand, lister.Lister):
+    """Create the leases described in a manifest file.
+
+    The manifest is a YAML or JSON list of leases, each with the name,
+    start_date, end_date, before_end_date, reservations,
+    physical_reservations and events options of lease-create.
+    Reservations and events are given as key=value strings or as mappings.
+    A results file of a previous run can be given instead of a manifest to
+    retry the leases which were not created. The results of the retry are
+    then written back to that file.
+    """
+    resource = 'lease'
+    log = logging.getLogger(__name__ + '.CreateLeasesBulk')
+    columns = ('index', 'name', 'status', 'id', 'error')
+    entry_keys = ('name', 'start_date', 'end_date', 'before_end_date',
+                  'reservations', 'physical_reservations', 'events')
+
+    def get_parser(self, prog_name):
+        parser = super(CreateLeasesBulk, self).get_parser(prog_name)
+        parser.add_argument(
+            'manifest', metavar='<manifest>',
+            help='YAML or JSON file describing the leases'
+        )
+        parser.add_argument(
+            '--parallel', metavar='<count>',
+            type=int,
+            default=4,
+            help='Number of leases to create concurrently (default: 4)'
+        )
+        parser.add_argument(
+            '--rate', metavar='<requests/s>',
+            type=float,
+            default=None,
+            help='Maximum number of leases created per second'
+        )
+        parser.add_argument(
+            '--results', metavar='<file>',
+            default=None,
+            help='File where the result of each lease is written as JSON '
+                 '(default: <manifest>.results.json, or the results file '
+                 'given instead of a manifest)'
+        )
+        return parser
+
+    def _load(self, path):
+        """Return the results of a previous run, if any, and the leases.
+
+        The results of a previous run are given for all its leases, and
+        the leases are those to create, each with its index in the manifest.
+        """
+        with open(path) as f:
+            if path.endswith('.json'):
+                document = jsonutils.loads(f.read())
+            else:
+                document = yaml.safe_load(f)
+        if isinstance(document, dict) and 'results' in document:
+            previous = document['results']
+            return previous, [(result['index'], result['entry'])
+                              for result in previous
+                              if result.get('status') != 'created']
+        if isinstance(document, dict):
+            document = document.get('leases')
+        if not isinstance(document, list):
+            raise exception.BlazarClientException(
+                '%s must contain a list of leases' % path)
+        return None, list(enumerate(document))
+
+    @staticmethod
+    def _to_key_values(value):
+        if not isinstance(value, dict):
+            return value
+        return ','.join(
+            '%s=%s' % (k, v if isinstance(v, str) else jsonutils.dumps(v))
+            for k, v in value.items() if v is not None)
+
+    def _entry_to_body(self, entry, validator):
+        if not isinstance(entry, dict) or not entry.get('name'):
+            raise exception.IncorrectLease('Each lease must have a name')
+        unknown = set(entry) - set(self.entry_keys)
+        if unknown:
+            raise exception.IncorrectLease(
+                'Unknown lease options: %s' % ', '.join(sorted(unknown)))
+        parsed_args = argparse.Namespace(
+            name=entry['name'],
+            start=entry.get('start_date', CreateLeaseBase.default_start),
+            end=entry.get('end_date',
+                          _utc_now() + datetime.timedelta(days=1)),
+            before_end=entry.get('before_end_date'),
+            reservations=[self._to_key_values(r)
+                          for r in entry.get('reservations') or []],
+            physical_reservations=[
+                self._to_key_values(r)
+                for r in entry.get('physical_reservations') or []],
+            events=[self._to_key_values(e)
+                    for e in entry.get('events') or []])
+        return validator.args2body(parsed_args)
+
+    def take_action(self, parsed_args):
+        self.log.debug('take_action(%s)' % parsed_args)
+        if parsed_args.parallel < 1:
+            raise exception.BlazarClientException(
+                '--parallel must be greater than or equal to 1')
+        if parsed_args.rate is not None and parsed_args.rate <= 0:
+            raise exception.BlazarClientException(
+                '--rate must be greater than 0')
+        previous, entries = self._load(parsed_args.manifest)
+
+        # NOTE: every lease is validated before any is submitted.
+        validator = CreateLease(self.app, self.app_args)
+        results = []
+        bodies = []
+        for index, entry in entries:
+            result = {'index': index, 'name': None, 'status': 'invalid',
+                      'id': None, 'error': None, 'entry': entry}
+            if isinstance(entry, dict):
+                result['name'] = entry.get('name')
+            try:
+                bodies.append((result, self._entry_to_body(entry, validator)))
+            except exception.BlazarClientException as e:
+                result['error'] = str(e)
+            results.append(result)
+
+        blazar_client = self.get_client()
+        created = blazar_client.lease.create_many(
+            [body for _result, body in bodies],
+            max_workers=parsed_args.parallel, rate=parsed_args.rate)
+        for (result, _body), outcome in zip(bodies, created):
+            if outcome.error is None:
+                result.update(status='created', id=outcome.value['id'])
+            else:
+                result.update(status='failed', error=str(outcome.error))
+
+        if previous is not None:
+            retried = {result['index']: result for result in results}
+            results = [retried.get(result['index'], result)
+                       for result in previous]
+        # NOTE: a retry writes back to the results file it was given, so
+        # that retrying again does not derive yet another path from it.
+        results_path = parsed_args.results or (
+            parsed_args.manifest if previous is not None
+            else parsed_args.manifest + '.results.json')
+        with open(results_path, 'w') as f:
+            jsonutils.dump({'results': results}, f, indent=2)
+        self.failed = sum(result['status'] != 'created'
+                          for result in results)
+        if self.failed:
+            self.log.warning('%d of %d leases were not created, run this '
+                             'command on %s to retry them', self.failed,
+                             len(results), results_path)
+        return self.columns, [tuple(result[column] for column in self.columns)
+                              for result in results]
+
+    def run(self, parsed_args):
+        self.failed = 0
+        code = super(CreateLeasesBulk, self).run(parsed_args)
+        return 1 if self.failed else code
+
+
 class UpdateLease(command.UpdateCommand):
-    """Update a lease."""
+    """Update a lease.
+
+    With --all-matching, the same update is applied to every lease matching
+    a filter. The leases are listed once, so that relative date changes
+    take a single request per lease, and are updated concurrently.
+    """
     resource = 'lease'
     json_indent = 4
     name_key = 'name'
+    id_optional = True
     log = logging.getLogger(__name__ + '.UpdateLease')
 
     def get_parser(self, prog_name):
         parser = super(UpdateLease, self).get_parser(prog_name)
+        parser.add_argument(
+            '--all-matching',
+            metavar='<filter>',
+            default=None,
+            help='Update every lease matching the filter instead of a '
+                 'single lease. The filter is either key=value pairs, '
+                 'e.g. status=ACTIVE,project_id=<id>, or an expression '
+                 'such as \'["==", "$status", "ACTIVE"]\'.'
+        )
+        parser.add_argument(
+            '--parallel', metavar='<count>',
+            type=int,
+            default=4,
+            help='Number of leases to update concurrently with '
+                 '--all-matching (default: 4)'
+        )
         parser.add_argument(
             '--name',
             help='New name for the lease',
@@ -488,21 +730,17 @@ class UpdateLease(command.UpdateCommand):
                            "Reservation arguments must be of the form "
                            "--reservation <key=value>" % res_str)
                 res_info = {}
-                prog = re.compile('^(?:(.*),)?(%s)=(.*)$' % '|'.join(keys))
-
-                def parse_params(params):
-                    match = prog.search(params)
-                    if match:
-                        k, v = match.group(2, 3)
-                        if k in list_keys:
-                            v = jsonutils.loads(v)
-                        elif strutils.is_int_like(v):
-                            v = int(v)
-                        res_info[k] = v
-                        if match.group(1) is not None:
-                            parse_params(match.group(1))
-
-                parse_params(res_str)
+                try:
+                    pairs = utils.split_key_values(res_str, keys)
+                except ValueError:
+                    raise exception.IncorrectLease(err_msg)
+                # NOTE: the first value given for a key is kept.
+                for k, v in reversed(pairs):
+                    if k in list_keys:
+                        v = jsonutils.loads(v)
+                    elif strutils.is_int_like(v):
+                        v = int(v)
+                    res_info[k] = v
                 if res_info:
                     if 'id' not in res_info:
                         raise exception.IncorrectLease(
@@ -514,9 +752,102 @@ class UpdateLease(command.UpdateCommand):
             params['reservations'] = reservations
         return params
 
+    @staticmethod
+    def _matching(manager, filter_str):
+        """Return the query of the leases matching the filter.
+
+        :raises: CommandError if the filter has no term, which would match
+                 every lease.
+        """
+        if not filter_str.strip():
+            raise exception.CommandError(
+                '--all-matching needs a filter, such as status=ACTIVE')
+        query = manager.query()
+        if filter_str.lstrip().startswith('['):
+            return query.where(filter_str)
+        try:
+            pairs = utils.split_key_values(filter_str, [utils.ANY_KEY])
+        except ValueError:
+            raise exception.BlazarClientException(
+                'Invalid filter %r, it must be key=value pairs or an '
+                'expression' % filter_str)
+        if not pairs:
+            raise exception.CommandError(
+                '--all-matching needs a filter, such as status=ACTIVE')
+        return query.where(**dict(pairs))
+
+    def _update_all_matching(self, parsed_args):
+        if parsed_args.id is not None:
+            raise exception.BlazarClientException(
+                'A lease cannot be given with --all-matching')
+        if parsed_args.name or parsed_args.reservation:
+            raise exception.BlazarClientException(
+                '--name and --reservation cannot be used with '
+                '--all-matching')
+        if parsed_args.parallel < 1:
+            raise exception.BlazarClientException(
+                '--parallel must be greater than or equal to 1')
+        body = self.args2body(parsed_args)
+        if not body:
+            raise exception.BlazarClientException(
+                'No values to update passed.')
+        manager = self.get_client().lease
+        leases = self._matching(manager, parsed_args.all_matching).all()
+        results = manager.update_many(leases,
+                                      max_workers=parsed_args.parallel,
+                                      **body)
+        failed = 0
+        for result in results:
+            if result.error is None:
+                print('Updated %s: %s' % (self.resource, result.item['id']),
+                      file=self.app.stdout)
+            else:
+                failed += 1
+                print('Failed to update %s %s: %s'
+                      % (self.resource, result.item['id'], result.error),
+                      file=self.app.stderr)
+        if not leases:
+            print('No %s matching %s' % (self.resource,
+                                         parsed_args.all_matching),
+                  file=self.app.stdout)
+        return 1 if failed else 0
+
+    def run(self, parsed_args):
+        if parsed_args.all_matching is not None:
+            self.log.debug('run(%s)' % parsed_args)
+            return self._update_all_matching(parsed_args)
+        if parsed_args.id is None:
+            raise exception.BlazarClientException(
+                'A lease or --all-matching must be given')
+        return super(UpdateLease, self).run(parsed_args)
+
 
 class DeleteLease(command.DeleteCommand):
     """Delete a lease."""
     resource = 'lease'
     name_key = 'name'
     log = logging.getLogger(__name__ + '.DeleteLease')
+
+
+class ListLeaseResources(command.BlazarCommand, lister.Lister):
+    """List the hosts, networks and devices allocated to a lease."""
+    resource = 'lease'
+    name_key = 'name'
+    log = logging.getLogger(__name__ + '.ListLeaseResources')
+
+    def get_parser(self, prog_name):
+        parser = super(ListLeaseResources, self).get_parser(prog_name)
+        parser.add_argument('id', metavar=self.resource.upper(),
+                            help='ID or name of lease to look up')
+        return parser
+
+    def take_action(self, parsed_args):
+        self.log.debug('take_action(%s)' % parsed_args)
+        blazar_client = self.get_client()
+        lease_id = utils.find_resource_id_by_name_or_id(
+            blazar_client, self.resource, parsed_args.id, self.name_key,
+            self.id_pattern)
+        resources = allocation_index.lease_resources(
+            blazar_client, blazar_client.lease.get(lease_id))
+        columns = ('resource_type', 'resource_id', 'reservation_id')
+        return columns, [tuple(r[c] for c in columns) for r in resources]
@@ -0,0 +1,51 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+
+from cliff import lister
+
+from blazarclient import command
+from blazarclient import mirror
+
+
+class SyncMirror(command.BlazarCommand, lister.Lister):
+    """Refresh the local mirror used by list commands with --from-mirror.
+
+    The mirror is stored in env[BLAZAR_MIRROR], or in mirror.sqlite in the
+    blazarclient cache directory.
+    """
+    log = logging.getLogger(__name__ + '.SyncMirror')
+
+    def get_parser(self, prog_name):
+        parser = super(SyncMirror, self).get_parser(prog_name)
+        parser.add_argument(
+            '--collection',
+            metavar='<collection>',
+            action='append',
+            choices=sorted(mirror.COLLECTIONS),
+            dest='collections',
+            help='Collection to refresh, can be repeated (default: all). '
+                 'One of: %s' % ', '.join(sorted(mirror.COLLECTIONS))
+        )
+        return parser
+
+    def take_action(self, parsed_args):
+        self.log.debug('take_action(%s)' % parsed_args)
+        with mirror.Mirror() as local_mirror:
+            results = local_mirror.sync(self.get_client(),
+                                        parsed_args.collections)
+        columns = ('collection', 'added', 'updated', 'deleted', 'unchanged')
+        return columns, [
+            (collection,) + tuple(stats[c] for c in columns[1:])
+            for collection, stats in sorted(results.items())]
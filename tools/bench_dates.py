@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compare blazarclient.dates with strptime and strftime.
+
+Usage, with python-blazarclient installed or on PYTHONPATH:
+    python tools/bench_dates.py [--count N] [--distinct N] [--repeat N]
+"""
+
+import argparse
+import datetime
+import timeit
+
+from blazarclient import dates
+from blazarclient import utils
+
+
+def _lease_dates(count, distinct):
+    start = datetime.datetime(2030, 1, 1)
+    return [(start + datetime.timedelta(minutes=i % distinct)).strftime(
+        utils.LEASE_DATE_FORMAT) for i in range(count)]
+
+
+def _run(name, function, values, repeat):
+    best = min(timeit.repeat(lambda: [function(v) for v in values],
+                             number=1, repeat=repeat))
+    print('%-32s %8.1f ns/date' % (name, best / len(values) * 1e9))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=100000)
+    parser.add_argument('--distinct', type=int, default=1000,
+                        help='number of distinct dates among them')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    lease_dates = _lease_dates(args.count, args.distinct)
+    api_dates = [value[:16].replace('T', ' ') for value in lease_dates]
+    parsed = [dates.parse_lease(value) for value in lease_dates]
+
+    def strptime_lease(value):
+        return datetime.datetime.strptime(value, utils.LEASE_DATE_FORMAT)
+
+    def strptime_api(value):
+        return datetime.datetime.strptime(value, utils.API_DATE_FORMAT)
+
+    def uncached_lease(value):
+        return dates.parse_lease.__wrapped__(value)
+
+    def strftime_api(value):
+        return value.strftime(utils.API_DATE_FORMAT)
+
+    _run('strptime (lease format)', strptime_lease, lease_dates, args.repeat)
+    _run('dates.parse_lease, uncached', uncached_lease, lease_dates,
+         args.repeat)
+    _run('dates.parse_lease', dates.parse_lease, lease_dates, args.repeat)
+    _run('strptime (API format)', strptime_api, api_dates, args.repeat)
+    _run('dates.parse_api', dates.parse_api, api_dates, args.repeat)
+    _run('strftime (API format)', strftime_api, parsed, args.repeat)
+    _run('dates.format_api', dates.format_api, parsed, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
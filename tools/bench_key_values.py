@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compare utils.split_key_values with the regular expression it replaced.
+
+Usage, with python-blazarclient installed or on PYTHONPATH:
+    python tools/bench_key_values.py [--terms N] [--pairs N]
+        [--reservations N] [--repeat N]
+"""
+
+import argparse
+import itertools
+import re
+import timeit
+
+from oslo_serialization import jsonutils
+
+from blazarclient import utils
+from blazarclient.v1.shell_commands import leases
+
+KEYS = leases.CREATE_RESERVATION_KEYS['physical:host']
+
+
+def regex_split(value, keys):
+    """Split the string the way lease-create did before split_key_values."""
+    pairs = []
+    prog = re.compile('^(?:(.*),)?(%s)=(.*)$' % '|'.join(keys))
+    while value != '':
+        match = prog.search(value)
+        if match is None:
+            raise ValueError(value)
+        pairs.append(match.group(2, 3))
+        value = match.group(1) or ''
+    return pairs[::-1]
+
+
+def _reservation(terms):
+    expression = ['and'] + [['==', '$property_%d' % i, 'value %d, %d' % (i, i)]
+                            for i in range(terms)]
+    return ('min=1,max=2,hypervisor_properties=,resource_properties=%s,'
+            'before_end=default' % jsonutils.dumps(expression))
+
+
+def _many_pairs(pairs):
+    return ','.join('%s=%s' % (key, 'x' * 20) for key, _i
+                    in zip(itertools.cycle(['min', 'max', 'before_end']),
+                           range(pairs)))
+
+
+def _run(name, function, values, repeat):
+    best = min(timeit.repeat(lambda: [function(v, KEYS) for v in values],
+                             number=1, repeat=repeat))
+    print('%-40s %10.1f us' % (name, best * 1e6))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--terms', type=int, default=200,
+                        help='terms of the resource_properties expression')
+    parser.add_argument('--pairs', type=int, default=500,
+                        help='key=value pairs of the many pairs case')
+    parser.add_argument('--reservations', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    for terms in (10, args.terms):
+        reservations = [_reservation(terms)] * args.reservations
+        assert ([regex_split(r, KEYS) for r in reservations] ==
+                [utils.split_key_values(r, KEYS) for r in reservations])
+        label = '%d reservations, %d terms' % (args.reservations, terms)
+        _run('regex, ' + label, regex_split, reservations, args.repeat)
+        _run('split_key_values, ' + label, utils.split_key_values,
+             reservations, args.repeat)
+
+    for pairs in (10, args.pairs):
+        reservations = [_many_pairs(pairs)] * args.reservations
+        label = '%d reservations, %d pairs' % (args.reservations, pairs)
+        _run('regex, ' + label, regex_split, reservations, args.repeat)
+        _run('split_key_values, ' + label, utils.split_key_values,
+             reservations, args.repeat)
+
+
+if __name__ == '__main__':
+    main()